@@ -0,0 +1,20 @@
+"""
+Comprobaciones compartidas por los endpoints
+"""
+from typing import Optional
+from fastapi import HTTPException
+from ..services.dataset_manager import dataset_manager
+
+
+def require_dataset(dataset_id: Optional[str]) -> None:
+    """
+    404 si el dataset no está registrado (None = dataset por defecto)
+    
+    `data_loader.resolve_path` recurre al CSV por defecto con ids
+    desconocidos, así que comprobar la ruta no basta.
+    
+    Args:
+        dataset_id: ID del dataset
+    """
+    if dataset_id is not None and dataset_manager.get_metadata(dataset_id) is None:
+        raise HTTPException(status_code=404, detail="Dataset no encontrado")
@@ -3,63 +3,76 @@ Endpoints de alertas y detección de amenazas
 """
 from fastapi import APIRouter, HTTPException
 from ...services.threat_detector import ThreatDetector
+from ...services.materialized_views import materialized_views
+from ...services.sql_engine import SQLThreatDetector
 from ...utils.data_loader import data_loader
+from ...services.snapshot_store import snapshot
 from ...api.models.schemas import AlertSummary
+from ...core.config import settings
 
 router = APIRouter()
 
 
+def _get_detector():
+    """Detector según el motor de análisis configurado (None si no hay datos)"""
+    if settings.ANALYTICS_ENGINE == 'sql':
+        if not materialized_views.get('overview')['total']:
+            return None
+        return SQLThreatDetector()
+    
+    df = data_loader.load_data()
+    return None if df.empty else ThreatDetector(df)
+
+
 @router.get("/alerts/summary", response_model=AlertSummary)
+@snapshot("alert-summary")
 async def get_alert_summary():
     """
     Obtiene resumen de alertas del sistema
     """
-    df = data_loader.load_data()
-    
-    if df.empty:
+    if not materialized_views.get('overview')['total']:
         raise HTTPException(status_code=500, detail="No hay datos disponibles")
     
-    detector = ThreatDetector(df)
-    return detector.get_alert_summary()
+    return materialized_views.get('alert_summary')
 
 
 @router.get("/alerts/coordinated-attacks")
+@snapshot("coordinated-attacks")
 async def get_coordinated_attacks():
     """
     Detecta ataques coordinados (múltiples orígenes al mismo objetivo)
     """
-    df = data_loader.load_data()
+    detector = _get_detector()
     
-    if df.empty:
+    if detector is None:
         return []
     
-    detector = ThreatDetector(df)
     return detector.detect_coordinated_attacks()
 
 
 @router.get("/alerts/port-sweeps")
+@snapshot("port-sweeps")
 async def get_port_sweeps():
     """
     Detecta barridos de puertos
     """
-    df = data_loader.load_data()
+    detector = _get_detector()
     
-    if df.empty:
+    if detector is None:
         return []
     
-    detector = ThreatDetector(df)
     return detector.detect_port_sweep()
 
 
 @router.get("/alerts/attack-velocity")
+@snapshot("attack-velocity")
 async def get_attack_velocity():
     """
     Calcula velocidad de ataques (ataques por hora)
     """
-    df = data_loader.load_data()
+    detector = _get_detector()
     
-    if df.empty:
+    if detector is None:
         return {'avg_per_hour': 0, 'max_per_hour': 0, 'min_per_hour': 0}
     
-    detector = ThreatDetector(df)
     return detector.get_attack_velocity()
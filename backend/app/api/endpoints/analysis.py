@@ -3,14 +3,18 @@ Endpoints de análisis de datos IDS
 """
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
-from ...services.data_analyzer import DataAnalyzer
-from ...services.threat_detector import ThreatDetector
+from ...services.partitioned_engine import PartitionedEngine
+from ...services.materialized_views import materialized_views
 from ...utils.data_loader import data_loader
+from ...services.snapshot_store import snapshot
+from ...core.tracing import span
+from ...core.config import settings
 
 router = APIRouter()
 
 
 @router.get("/analysis/dashboard-stats")
+@snapshot("dashboard-stats")
 async def get_dashboard_stats(
     ip_threshold: int = Query(10, description="Umbral mínimo de ataques"),
     dataset_id: Optional[str] = Query(None, description="ID del dataset a analizar")  # ← NUEVO
@@ -18,104 +22,121 @@ async def get_dashboard_stats(
     """
     Obtiene estadísticas completas para el dashboard
     """
-    df = data_loader.load_data(dataset_id)  # ← MODIFICADO
+    overview = materialized_views.get('overview', dataset_id)
     
-    if df.empty:
+    if not overview['total']:
         raise HTTPException(status_code=500, detail="No hay datos para analizar")
     
-    analyzer = DataAnalyzer(df)
-    detector = ThreatDetector(df)
+    # Lecturas de vistas materializadas (refrescadas al cambiar el dataset)
+    threshold = ip_threshold or settings.SUSPICIOUS_IP_THRESHOLD
+    ips = [ip for ip in materialized_views.get('suspicious_ips', dataset_id) if ip.total_ataques >= threshold]
+    distribucion = materialized_views.get('attack_distribution', dataset_id)
+    timeline = materialized_views.get('timeline', dataset_id)['H']
+    puertos = materialized_views.get('port_analysis', dataset_id)[:10]
+    patrones = materialized_views.get('attack_patterns', dataset_id)
+    alert_summary = materialized_views.get('alert_summary', dataset_id)
+    
+    with span('build_response'):
+        return {
+            'dataset_id': dataset_id or 'default',  # ← NUEVO
+            'total_logs': overview['total'],
+            'periodo_analizado': {
+                'inicio': overview['ts_min'].isoformat(),
+                'fin': overview['ts_max'].isoformat()
+            },
+            'ips_sospechosas': [ip.dict() for ip in ips],
+            'distribucion_ataques': distribucion,
+            'ataques_por_hora': {
+                item.timestamp: item.count 
+                for item in timeline
+            },
+            'puertos_mas_atacados': [p.dict() for p in puertos],
+            'patrones_detectados': [p.dict() for p in patrones],
+            'alert_summary': alert_summary.dict()
+        }
+
+
+@router.get("/analysis/partitioned-stats")
+async def get_partitioned_stats(
+    ip_threshold: int = Query(10, description="Umbral mínimo de ataques"),
+    partitions: Optional[int] = Query(None, ge=1, le=256, description="Particiones (por defecto, una por núcleo)"),
+    dataset_id: Optional[str] = Query(None, description="ID del dataset a analizar")
+):
+    """
+    Estadísticas del dashboard calculadas en paralelo: los eventos se
+    particionan por hash de IP de origen entre procesos worker y los
+    resultados parciales se combinan
+    """
+    df = data_loader.load_data(dataset_id)
+    
+    if df.empty:
+        raise HTTPException(status_code=500, detail="No hay datos para analizar")
     
-    # Obtener análisis
-    ips = analyzer.get_suspicious_ips(ip_threshold)
-    distribucion = analyzer.get_attack_distribution()
-    timeline = analyzer.get_timeline_data()
-    puertos = analyzer.get_port_analysis()
-    patrones = analyzer.get_attack_patterns()
-    alert_summary = detector.get_alert_summary()
+    engine = PartitionedEngine(partitions)
+    result = await engine.run(df, ip_threshold)
     
     return {
-        'dataset_id': dataset_id or 'default',  # ← NUEVO
-        'total_logs': len(df),
-        'periodo_analizado': {
-            'inicio': df['timestamp'].min().isoformat(),
-            'fin': df['timestamp'].max().isoformat()
-        },
-        'ips_sospechosas': [ip.dict() for ip in ips],
-        'distribucion_ataques': distribucion,
+        'dataset_id': dataset_id or 'default',
+        'total_logs': result['total_logs'],
+        'periodo_analizado': result['periodo_analizado'],
+        'ips_sospechosas': [ip.dict() for ip in result['ips_sospechosas']],
+        'distribucion_ataques': result['distribucion_ataques'],
         'ataques_por_hora': {
             item.timestamp: item.count 
-            for item in timeline
+            for item in result['timeline']
         },
-        'puertos_mas_atacados': [p.dict() for p in puertos],
-        'patrones_detectados': [p.dict() for p in patrones],
-        'alert_summary': alert_summary.dict()
+        'puertos_mas_atacados': [p.dict() for p in result['puertos_mas_atacados']],
+        'patrones_detectados': [p.dict() for p in result['patrones_detectados']],
+        'alert_summary': result['alert_summary'].dict(),
+        'coordinated_attacks': result['coordinated_attacks'],
+        'port_sweeps': result['port_sweeps'],
+        'execution': result['execution']
     }
 
 
 @router.get("/analysis/suspicious-ips")
+@snapshot("suspicious-ips")
 async def get_suspicious_ips(
     limit: int = Query(10, ge=1, le=100),
     min_attacks: int = Query(5, ge=1),
     dataset_id: Optional[str] = Query(None, description="ID del dataset")  # ← NUEVO
 ):
     """Obtiene lista de IPs sospechosas"""
-    df = data_loader.load_data(dataset_id)  # ← MODIFICADO
-    
-    if df.empty:
-        return []
-    
-    analyzer = DataAnalyzer(df)
-    ips = analyzer.get_suspicious_ips(min_attacks)
+    ips = [ip for ip in materialized_views.get('suspicious_ips', dataset_id) if ip.total_ataques >= min_attacks]
     
     return [ip.dict() for ip in ips[:limit]]
 
 
 @router.get("/analysis/timeline")
+@snapshot("timeline")
 async def get_timeline(
     interval: str = Query('H', regex='^(H|D)$'),
     dataset_id: Optional[str] = Query(None, description="ID del dataset")  # ← NUEVO
 ):
     """Obtiene timeline de ataques"""
-    df = data_loader.load_data(dataset_id)  # ← MODIFICADO
-    
-    if df.empty:
-        return []
-    
-    analyzer = DataAnalyzer(df)
-    timeline = analyzer.get_timeline_data(interval)
+    timeline = materialized_views.get('timeline', dataset_id)[interval]
     
     return [item.dict() for item in timeline]
 
 
 @router.get("/analysis/ports")
+@snapshot("ports")
 async def get_port_analysis(
     top_n: int = Query(15, ge=1, le=50),
     dataset_id: Optional[str] = Query(None, description="ID del dataset")  # ← NUEVO
 ):
     """Análisis de puertos más atacados"""
-    df = data_loader.load_data(dataset_id)  # ← MODIFICADO
-    
-    if df.empty:
-        return []
-    
-    analyzer = DataAnalyzer(df)
-    ports = analyzer.get_port_analysis(top_n)
+    ports = materialized_views.get('port_analysis', dataset_id)[:top_n]
     
     return [p.dict() for p in ports]
 
 
 @router.get("/analysis/patterns")
+@snapshot("patterns")
 async def get_attack_patterns(
     dataset_id: Optional[str] = Query(None, description="ID del dataset")  # ← NUEVO
 ):
     """Obtiene patrones de ataque identificados"""
-    df = data_loader.load_data(dataset_id)  # ← MODIFICADO
-    
-    if df.empty:
-        return []
-    
-    analyzer = DataAnalyzer(df)
-    patterns = analyzer.get_attack_patterns()
+    patterns = materialized_views.get('attack_patterns', dataset_id)
     
     return [p.dict() for p in patterns]
@@ -1,40 +1,185 @@
 """
 Endpoints de respuesta automatizada
 """
-from fastapi import APIRouter, HTTPException, Body
-from typing import List
+from fastapi import APIRouter, HTTPException, Body, Query
+from typing import List, Optional
+from datetime import datetime
 from ...services.auto_response import AutoResponseSystem
-from ...services.data_analyzer import DataAnalyzer
-from ...utils.data_loader import data_loader
-from ...api.models.schemas import SuspiciousIP
+from ...services.ruleset_store import ruleset_store
+from ...services.blocklist_simulator import blocklist_simulator
+from ...services.attack_simulation import attack_simulator
+from ...services.response_journal import response_journal
+from ...services.materialized_views import materialized_views
+from ..dependencies import require_dataset
+from ...api.models.schemas import SuspiciousIP, BlocklistSimulation, PropagationSimulation, RiskLevel
 
 router = APIRouter()
 
 auto_response = AutoResponseSystem()
 
 
+def _risk_index(dataset_id: Optional[str] = None) -> dict:
+    """
+    Índice de IPs sospechosas del dataset (por IP y por nivel de riesgo)
+    
+    Es una vista materializada: se calcula una vez por versión del dataset
+    y lo comparten todos los endpoints de respuesta.
+    """
+    if not materialized_views.get('overview', dataset_id)['total']:
+        raise HTTPException(status_code=500, detail="No hay datos")
+    return materialized_views.get('risk_index', dataset_id)
+
+
+def _firewall_ips(min_risk_level: str, dataset_id: Optional[str] = None) -> List[SuspiciousIP]:
+    """IPs del nivel pedido y críticas, leídas de los grupos por nivel"""
+    index = _risk_index(dataset_id)
+    if not min_risk_level:
+        return index['ips']
+    levels = {min_risk_level, RiskLevel.CRITICAL.value}
+    return [ip for level, ips in index['by_level'].items() if level in levels for ip in ips]
+
+
+def _current_ruleset(min_risk_level: str) -> dict:
+    """Genera el ruleset actual y lo registra como versión si cambió"""
+    ips = _firewall_ips(min_risk_level)
+    
+    rules = auto_response.generate_firewall_rules(ips)
+    networks = rules['networks']
+    entry = ruleset_store.record(networks['v4'], networks['v6'], {'min_risk_level': min_risk_level})
+    rules['version'] = entry['version']
+    
+    response_journal.record(
+        'firewall_rules', [ip.ip for ip in ips],
+        version=entry['version'], min_risk_level=min_risk_level,
+        total_networks=rules['total_networks'], total_rules=rules['total_rules']
+    )
+    return rules
+
+
 @router.get("/response/firewall-rules")
 async def generate_firewall_rules(min_risk_level: str = "Alto"):
     """
     Genera reglas de firewall para múltiples plataformas
     
+    Cada ruleset distinto queda registrado con un número de `version` que
+    luego sirve para pedir solo los cambios (`/response/firewall-rules/diff`).
+    
     - **min_risk_level**: Nivel mínimo de riesgo (Alto, Crítico)
     """
-    df = data_loader.load_data()
+    return _current_ruleset(min_risk_level)
+
+
+@router.get("/response/firewall-rules/versions")
+async def list_firewall_ruleset_versions(
+    min_risk_level: Optional[str] = Query(None, description="Solo el historial de este nivel mínimo de riesgo")
+):
+    """
+    Lista las versiones de ruleset registradas (más recientes primero)
     
-    if df.empty:
-        raise HTTPException(status_code=500, detail="No hay datos")
+    Cada `min_risk_level` tiene su propio historial de versiones.
+    """
+    params = {'min_risk_level': min_risk_level} if min_risk_level is not None else None
+    versions = ruleset_store.list_versions(params)
+    return {'total': len(versions), 'versions': versions}
+
+
+@router.get("/response/firewall-rules/diff")
+async def get_firewall_rules_diff(
+    since: int = Query(..., ge=1, description="Versión aplicada actualmente"),
+    to: Optional[int] = Query(None, ge=1, description="Versión destino (por defecto la actual)"),
+    min_risk_level: Optional[str] = Query(None, description="Nivel mínimo de riesgo (por defecto, el de la versión `since`)")
+):
+    """
+    Cambios incrementales entre dos versiones del ruleset
     
-    analyzer = DataAnalyzer(df)
-    ips = analyzer.get_suspicious_ips()
+    Devuelve solo los bloques añadidos y eliminados como operaciones por
+    plataforma (iptables, ipset, nftables, Cisco ASA, pfSense, Windows) y
+    su rollback, en lugar de regenerar y recargar el ruleset completo.
+    Sin `to` se genera y registra el ruleset actual del mismo historial
+    que `since`; ambas versiones deben pertenecer al mismo historial.
     
-    # Filtrar por nivel de riesgo
-    if min_risk_level:
-        ips = [ip for ip in ips if ip.nivel_riesgo in [min_risk_level, 'Crítico']]
+    - **since**: Versión de partida
+    - **to**: Versión de destino
+    - **min_risk_level**: Nivel mínimo de riesgo al generar el ruleset actual
+    """
+    old = ruleset_store.get(since)
+    if old is None:
+        raise HTTPException(status_code=404, detail=f"Versión {since} no disponible; aplique el ruleset completo")
     
-    rules = auto_response.generate_firewall_rules(ips)
+    old_level = old.get('params', {}).get('min_risk_level', 'Alto')
+    if min_risk_level is not None and min_risk_level != old_level:
+        raise HTTPException(
+            status_code=409,
+            detail=f"La versión {since} es del historial min_risk_level={old_level}, no {min_risk_level}"
+        )
     
-    return rules
+    if to is None:
+        to = _current_ruleset(old_level)['version']
+    new = ruleset_store.get(to)
+    if new is None:
+        raise HTTPException(status_code=404, detail=f"Versión {to} no disponible")
+    if new.get('params', {}) != old.get('params', {}):
+        raise HTTPException(status_code=409, detail=f"Las versiones {since} y {to} son de historiales distintos")
+    
+    diff = auto_response.generate_ruleset_diff(old, new)
+    diff['generated_at'] = datetime.now().isoformat()
+    
+    response_journal.record(
+        'firewall_diff', from_version=since, to_version=to,
+        added=len(diff['added']), removed=len(diff['removed'])
+    )
+    return diff
+
+
+@router.post("/response/simulate-blocklist")
+async def simulate_blocklist(
+    simulation: BlocklistSimulation = Body(...),
+    dataset_id: Optional[str] = Query(None, description="ID del dataset a reproducir")
+):
+    """
+    Reproduce los eventos de un dataset contra un ruleset propuesto
+    
+    Indica cuántos eventos (y cuántos a puertos SCADA) habría bloqueado,
+    por tipo de alerta y por intervalo de tiempo, antes de aplicar las
+    reglas. El ruleset combina IPs/CIDRs explícitos, una versión registrada
+    (`version`) y las IPs de las reglas actuales (`source`: firewall o fail2ban).
+    """
+    require_dataset(dataset_id)
+    
+    entries = simulation.ips + simulation.cidrs
+    
+    if simulation.version is not None:
+        stored = ruleset_store.get(simulation.version)
+        if stored is None:
+            raise HTTPException(status_code=404, detail=f"Versión {simulation.version} no disponible")
+        entries += stored['v4'] + stored['v6']
+    
+    if simulation.source == 'fail2ban':
+        entries += [ip.ip for ip in _risk_index(dataset_id)['ips'][:20]]
+    elif simulation.source == 'firewall':
+        # Mismo criterio que /response/firewall-rules
+        ips = [
+            ip for ip in _firewall_ips(simulation.min_risk_level, dataset_id)
+            if ip.nivel_riesgo in [RiskLevel.HIGH, RiskLevel.CRITICAL]
+        ]
+        entries += [ip.ip for ip in ips]
+    
+    if not entries:
+        raise HTTPException(status_code=400, detail="El ruleset está vacío")
+    
+    try:
+        result = blocklist_simulator.simulate(
+            entries, ports=simulation.ports, bucket=simulation.bucket, dataset_id=dataset_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    response_journal.record(
+        'blocklist_simulation', entries,
+        dataset_id=dataset_id, version=simulation.version, source=simulation.source,
+        ports=simulation.ports, **result['summary']
+    )
+    return result
 
 
 @router.get("/response/fail2ban-config")
@@ -42,15 +187,10 @@ async def get_fail2ban_config():
     """
     Genera configuración de Fail2Ban lista para usar
     """
-    df = data_loader.load_data()
-    
-    if df.empty:
-        raise HTTPException(status_code=500, detail="No hay datos")
-    
-    analyzer = DataAnalyzer(df)
-    ips = analyzer.get_suspicious_ips()
+    ips = _risk_index()['ips']
     
     config = auto_response.generate_fail2ban_config(ips[:20])
+    response_journal.record('fail2ban_config', [ip.ip for ip in ips[:20]])
     
     return {
         'config_file': '/etc/fail2ban/jail.d/ids-scada.conf',
@@ -71,20 +211,16 @@ async def get_remediation_playbook(ip: str):
     
     - **ip**: Dirección IP maliciosa
     """
-    df = data_loader.load_data()
-    
-    if df.empty:
-        raise HTTPException(status_code=500, detail="No hay datos")
-    
-    analyzer = DataAnalyzer(df)
-    ips = analyzer.get_suspicious_ips()
-    
-    target_ip = next((i for i in ips if i.ip == ip), None)
+    target_ip = _risk_index()['by_ip'].get(ip)
     
     if not target_ip:
         raise HTTPException(status_code=404, detail=f"IP {ip} no está en la lista de sospechosas")
     
     playbook = auto_response.generate_remediation_playbook(target_ip)
+    response_journal.record(
+        'remediation_playbook', [ip],
+        incident_id=playbook['incident_id'], severity=playbook['severity']
+    )
     
     return playbook
 
@@ -101,25 +237,61 @@ async def simulate_attack_scenario(
     - **target**: Sistema objetivo
     """
     scenario = auto_response.simulate_attack_scenario(attack_type, target)
+    response_journal.record('attack_scenario', attack_type=attack_type, target=target)
     
     return scenario
 
 
+@router.post("/response/simulate-propagation")
+async def simulate_attack_propagation(
+    simulation: PropagationSimulation = Body(...),
+    dataset_id: Optional[str] = Query(None, description="ID del dataset")
+):
+    """
+    Simulación Monte Carlo de la propagación sobre el grafo de ataques
+    
+    Las aristas son los pares origen -> destino observados y su probabilidad
+    por paso crece con la frecuencia de ataques; los destinos de puertos
+    SCADA son activos de alto valor. Devuelve la probabilidad de alcanzar
+    cada activo y los pasos esperados hasta comprometerlo y, con `blocked`,
+    cómo cambian respecto a no bloquear nada.
+    """
+    require_dataset(dataset_id)
+    try:
+        result = await attack_simulator.simulate(
+            trials=simulation.trials,
+            max_steps=simulation.max_steps,
+            entry_points=simulation.entry_points,
+            blocked=simulation.blocked,
+            attack_types=simulation.attack_types,
+            seed=simulation.seed,
+            top_n=simulation.top_n,
+            dataset_id=dataset_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    response_journal.record(
+        'propagation_simulation', simulation.blocked + simulation.entry_points,
+        dataset_id=dataset_id, trials=result['trials'], blocked=result['blocked'],
+        prob_any_scada=result['prob_any_scada'], expected_compromised=result['expected_compromised']
+    )
+    return result
+
+
 @router.get("/response/quick-actions")
 async def get_quick_actions():
     """
     Obtiene acciones rápidas recomendadas para el estado actual
     """
-    df = data_loader.load_data()
+    overview = materialized_views.get('overview')
     
-    if df.empty:
+    if not overview['total']:
         return {'actions': []}
     
-    analyzer = DataAnalyzer(df)
-    ips = analyzer.get_suspicious_ips()
-    
-    critical_ips = [ip for ip in ips if ip.nivel_riesgo == 'Crítico']
-    high_ips = [ip for ip in ips if ip.nivel_riesgo == 'Alto']
+    by_level = materialized_views.get('risk_index')['by_level']
+    critical_ips = by_level[RiskLevel.CRITICAL.value]
+    high_ips = by_level[RiskLevel.HIGH.value]
     
     actions = []
     
@@ -152,5 +324,22 @@ async def get_quick_actions():
     return {
         'total_actions': len(actions),
         'actions': actions,
-        'generated_at': df['timestamp'].max().isoformat() if not df.empty else None
+        'generated_at': overview['ts_max'].isoformat()
     }
+
+
+@router.get("/response/journal")
+async def get_response_journal(
+    ip: Optional[str] = Query(None, description="IP afectada"),
+    action: Optional[str] = Query(None, description="Tipo de acción (firewall_rules, remediation_playbook...)"),
+    start: Optional[datetime] = Query(None, description="Desde (incluido)"),
+    end: Optional[datetime] = Query(None, description="Hasta (excluido)"),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    Consulta el diario de acciones de respuesta (más recientes primero)
+    
+    Cada regla, playbook y simulación generados queda registrado; la
+    consulta usa los índices por IP y por tipo de acción del buffer.
+    """
+    return response_journal.query(ip=ip, action=action, start=start, end=end, limit=limit)
@@ -1,13 +1,15 @@
 """
 Endpoints para gestión de datasets
 """
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Body
 from fastapi.responses import JSONResponse
-from typing import Optional
+from typing import Optional, List
 import os
 import shutil
 from datetime import datetime
 from ...services.dataset_manager import dataset_manager
+from ...services.dataset_summary import public_summary
+from ...services.batch_analyzer import analyze_dataset, analyze_datasets_parallel
 from ...core.config import settings
 
 router = APIRouter()
@@ -33,7 +35,7 @@ async def upload_dataset(
     chunk_size = 1024 * 1024  # 1MB chunks
     
     # Generar nombre único
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
     safe_filename = f"dataset_{timestamp}_{file.filename}"
     filepath = os.path.join(settings.UPLOAD_PATH, safe_filename)
     
@@ -77,6 +79,43 @@ async def upload_dataset(
         raise HTTPException(status_code=500, detail=f"Error procesando archivo: {str(e)}")
 
 
+@router.post("/datasets/{dataset_id}/append")
+async def append_to_dataset(
+    dataset_id: str,
+    file: UploadFile = File(...)
+):
+    """
+    Añade eventos a un dataset existente
+    
+    Las vistas de análisis se actualizan de forma incremental con las filas
+    nuevas (sin recalcular todo el dataset).
+    
+    - **file**: CSV con las mismas columnas requeridas que en la subida
+    """
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="Solo se permiten archivos CSV")
+    
+    content = await file.read(settings.MAX_UPLOAD_SIZE + 1)
+    if len(content) > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Archivo muy grande. Máximo: {settings.MAX_UPLOAD_SIZE / (1024*1024)}MB"
+        )
+    
+    try:
+        dataset_info = dataset_manager.append_rows(dataset_id, content)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not dataset_info:
+        raise HTTPException(status_code=404, detail="Dataset no encontrado")
+    
+    return {
+        "message": "Eventos añadidos exitosamente",
+        "dataset": dataset_info
+    }
+
+
 @router.get("/datasets/list")
 async def list_datasets():
     """
@@ -97,13 +136,17 @@ async def get_dataset_info(dataset_id: str):
     
     - **dataset_id**: ID del dataset
     """
-    datasets = dataset_manager.list_datasets()
-    dataset = next((d for d in datasets if d['id'] == dataset_id), None)
+    dataset = dataset_manager.get_metadata(dataset_id)
     
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset no encontrado")
     
-    return dataset
+    summary = dataset_manager.get_summary(dataset_id)
+    
+    return {
+        **dataset,
+        'summary': public_summary(summary) if summary else None
+    }
 
 
 @router.delete("/datasets/{dataset_id}")
@@ -140,6 +183,55 @@ async def compare_datasets(dataset_id1: str, dataset_id2: str):
     return comparison
 
 
+@router.post("/datasets/compare-many")
+async def compare_many_datasets(
+    dataset_ids: List[str] = Body(..., embed=True, min_length=2, description="IDs de los datasets a comparar")
+):
+    """
+    Comparación N-way entre datasets a partir de sus resúmenes precalculados
+    
+    - **dataset_ids**: Lista de IDs (mínimo 2)
+    """
+    comparison = dataset_manager.compare_many(dataset_ids)
+    
+    if not comparison:
+        raise HTTPException(status_code=404, detail="Uno o más datasets no encontrados")
+    
+    return comparison
+
+
+@router.post("/datasets/analyze-batch")
+async def analyze_datasets_batch(
+    dataset_ids: List[str] = Body([], embed=True, description="IDs a analizar (vacío = todos)"),
+    include_details: bool = Query(False, description="Incluir el análisis completo de cada dataset")
+):
+    """
+    Ejecuta el análisis completo sobre varios datasets en paralelo
+    (un proceso por dataset) y combina los resultados
+    
+    - **dataset_ids**: Lista de IDs; si se omite se analizan todos los registrados
+    - **include_details**: Incluir el resultado individual de cada dataset
+    """
+    if not dataset_ids:
+        dataset_ids = [d['id'] for d in dataset_manager.list_datasets()]
+    
+    if not dataset_ids:
+        raise HTTPException(status_code=404, detail="No hay datasets registrados")
+    
+    batch = await analyze_datasets_parallel(dataset_ids)
+    
+    response = {
+        'total_datasets': len(dataset_ids),
+        'analyzed': len(batch['results']),
+        'errors': batch['errors'],
+        'merged': batch['merged']
+    }
+    if include_details:
+        response['results'] = batch['results']
+    
+    return response
+
+
 @router.post("/datasets/{dataset_id}/analyze")
 async def analyze_specific_dataset(dataset_id: str):
     """
@@ -147,62 +239,15 @@ async def analyze_specific_dataset(dataset_id: str):
     
     - **dataset_id**: ID del dataset a analizar
     """
-    from ...services.data_analyzer import DataAnalyzer
-    from ...services.threat_detector import ThreatDetector
-    from ...services.professional_recommender import professional_recommender
-    
-    df = dataset_manager.get_dataset(dataset_id)
+    try:
+        result = analyze_dataset(dataset_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    if df is None:
+    if result is None:
         raise HTTPException(status_code=404, detail="Dataset no encontrado")
     
-    if df.empty:
-        raise HTTPException(status_code=400, detail="Dataset vacío")
-    
-    # Ejecutar análisis
-    analyzer = DataAnalyzer(df)
-    detector = ThreatDetector(df)
-    
-    ips_sospechosas = analyzer.get_suspicious_ips()
-    distribucion = analyzer.get_attack_distribution()
-    timeline = analyzer.get_timeline_data()
-    puertos = analyzer.get_port_analysis()
-    patrones = analyzer.get_attack_patterns()
-    alert_summary = detector.get_alert_summary()
-    
-    # Detectar si hay ataques SCADA
-    scada_targeted = any(
-        ip.nivel_riesgo in ['Alto', 'Crítico'] and 
-        any(p in settings.SCADA_CRITICAL_PORTS for p in ip.puertos_afectados)
-        for ip in ips_sospechosas
-    )
-    
-    # Generar recomendaciones profesionales
-    recommendations = professional_recommender.generate_recommendations(
-        ips_sospechosas=ips_sospechosas,
-        attack_distribution=distribucion,
-        scada_targeted=scada_targeted
-    )
-    
-    return {
-        'dataset_id': dataset_id,
-        'total_logs': len(df),
-        'periodo_analizado': {
-            'inicio': df['timestamp'].min().isoformat(),
-            'fin': df['timestamp'].max().isoformat()
-        },
-        'ips_sospechosas': [ip.dict() for ip in ips_sospechosas],
-        'distribucion_ataques': distribucion,
-        'ataques_por_hora': {
-            item.timestamp: item.count 
-            for item in timeline
-        },
-        'puertos_mas_atacados': [p.dict() for p in puertos],
-        'patrones_detectados': [p.dict() for p in patrones],
-        'alert_summary': alert_summary.dict(),
-        'professional_recommendations': [r.dict() for r in recommendations],
-        'scada_targeted': scada_targeted
-    }
+    return result
 
 
 @router.get("/datasets/current")
@@ -0,0 +1,79 @@
+"""
+Endpoints de acceso a eventos IDS en bruto
+"""
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Body
+from fastapi.responses import StreamingResponse
+from typing import Optional, List
+from ...services.event_export import EventFilter, EXPORT_FORMATS, stream_events, arrow_available
+from ...services.event_index import event_indexes
+from ...api.models.schemas import EventQuery
+from ..dependencies import require_dataset
+
+router = APIRouter()
+
+
+@router.get("/events/export")
+async def export_events(
+    format: str = Query("csv", pattern="^(csv|ndjson|arrow)$", description="Formato: csv, ndjson o arrow"),
+    start: Optional[datetime] = Query(None, description="Inicio del rango (incluido)"),
+    end: Optional[datetime] = Query(None, description="Fin del rango (excluido)"),
+    ip: Optional[List[str]] = Query(None, description="IP de origen o destino"),
+    ip_origen: Optional[List[str]] = Query(None, description="IP de origen"),
+    ip_destino: Optional[List[str]] = Query(None, description="IP de destino"),
+    puerto: Optional[List[int]] = Query(None, description="Puerto de destino"),
+    protocolo: Optional[List[str]] = Query(None, description="Protocolo (TCP, UDP...)"),
+    alerta: Optional[List[str]] = Query(None, description="Tipo de alerta"),
+    limit: Optional[int] = Query(None, ge=1, description="Máximo de eventos"),
+    gzip: bool = Query(False, description="Comprimir la salida con gzip"),
+    dataset_id: Optional[str] = Query(None, description="ID del dataset a exportar")
+):
+    """
+    Exporta en streaming los eventos que cumplen los filtros
+    
+    El CSV se lee y se escribe por bloques, así que la memoria del servidor
+    no crece con el tamaño de la exportación. Los filtros de lista se pueden
+    repetir (`?puerto=502&puerto=102`).
+    """
+    if format == 'arrow' and not arrow_available():
+        raise HTTPException(status_code=501, detail="Formato Arrow no disponible: instale pyarrow")
+    
+    require_dataset(dataset_id)
+    
+    event_filter = EventFilter(
+        start=start, end=end, ip=ip, ip_origen=ip_origen, ip_destino=ip_destino,
+        puerto=puerto, protocolo=protocolo, alerta=alerta
+    )
+    
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"eventos_{dataset_id or 'default'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    if gzip:
+        media_type = 'application/gzip'
+        filename += '.gz'
+    
+    return StreamingResponse(
+        stream_events(format, dataset_id, event_filter, limit=limit, gzip=gzip),
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post("/events/query")
+async def query_events(
+    query: EventQuery = Body(...),
+    dataset_id: Optional[str] = Query(None, description="ID del dataset a consultar")
+):
+    """
+    Consulta ad-hoc de eventos sobre índices por columna
+    
+    Las condiciones se combinan con AND: `eq` e `in` sobre cualquier columna
+    indexada, `cidr` sobre IPs y `range` sobre puerto. Devuelve el total de
+    coincidencias, los primeros `limit` eventos en orden temporal y, con
+    `group_by`, los `top_k` grupos con más eventos.
+    """
+    require_dataset(dataset_id)
+    
+    try:
+        return event_indexes.query(query, dataset_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
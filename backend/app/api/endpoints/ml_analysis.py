@@ -5,11 +5,13 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
 from ...services.ml_detector import MLAnomalyDetector
 from ...utils.data_loader import data_loader
+from ...services.snapshot_store import snapshot
 
 router = APIRouter()
 
 
 @router.get("/ml/anomalies")
+@snapshot("ml-anomalies")
 async def detect_ml_anomalies(contamination: float = Query(0.1, ge=0.01, le=0.5)):
     """
     Detecta anomalías usando Machine Learning (Isolation Forest)
@@ -2,30 +2,28 @@
 Endpoints para grafo de red de ataques
 """
 from fastapi import APIRouter, HTTPException
-from ...services.network_graph import NetworkGraphGenerator
+from ...services.materialized_views import materialized_views
 from ...utils.data_loader import data_loader
+from ...services.snapshot_store import snapshot
 
 router = APIRouter()
 
 
 @router.get("/graph/attack-network")
+@snapshot("attack-network")
 async def get_attack_network_graph():
     """
     Obtiene estructura de grafo de red de ataques
     para visualización (compatible con D3.js, Cytoscape, etc.)
     """
-    df = data_loader.load_data()
-    
-    if df.empty:
+    if not materialized_views.get('overview')['total']:
         raise HTTPException(status_code=500, detail="No hay datos para generar grafo")
     
-    generator = NetworkGraphGenerator(df)
-    graph = generator.generate_attack_graph()
-    
-    return graph
+    return materialized_views.get('attack_graph')
 
 
 @router.get("/graph/attack-paths")
+@snapshot("attack-paths")
 async def get_attack_paths():
     """
     Identifica rutas de ataque más comunes
@@ -69,33 +67,15 @@ async def get_attack_paths():
 
 
 @router.get("/graph/hotspots")
+@snapshot("hotspots")
 async def get_attack_hotspots():
     """
     Identifica IPs más atacadas (hotspots)
     """
-    df = data_loader.load_data()
-    
-    if df.empty:
+    if not materialized_views.get('overview')['total']:
         return {'hotspots': []}
     
-    target_stats = df.groupby('ip_destino').agg({
-        'ip_origen': 'nunique',
-        'alerta': 'count',
-        'puerto': lambda x: list(x.unique())
-    }).reset_index()
-    
-    target_stats.columns = ['ip', 'unique_attackers', 'total_attacks', 'ports_targeted']
-    target_stats = target_stats.sort_values('total_attacks', ascending=False)
-    
-    hotspots = []
-    for _, row in target_stats.head(10).iterrows():
-        hotspots.append({
-            'ip': row['ip'],
-            'total_attacks': int(row['total_attacks']),
-            'unique_attackers': int(row['unique_attackers']),
-            'ports_targeted': [int(p) for p in row['ports_targeted'][:10]],
-            'severity': 'Crítico' if row['unique_attackers'] > 3 else 'Alto' if row['unique_attackers'] > 1 else 'Medio'
-        })
+    hotspots = materialized_views.get('hotspots')
     
     return {
         'total_hotspots': len(hotspots),
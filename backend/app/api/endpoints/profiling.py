@@ -0,0 +1,52 @@
+"""
+Endpoints de administración para perfiles de peticiones
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse, PlainTextResponse
+from ...core.config import settings
+from ...core.profiling import profile_store
+from ...core.security import require_admin
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/admin/profiles")
+async def list_profiles():
+    """
+    Lista los perfiles capturados
+    
+    Para capturar uno, repetir la petición con `?profile=1` (o la cabecera
+    `X-Profile: 1`) y la cabecera `X-Admin-Token`; la respuesta incluye
+    `X-Profile-Id`.
+    """
+    return {
+        'profiling_enabled': settings.PROFILING_ENABLED,
+        'profiles': profile_store.list_profiles()
+    }
+
+
+@router.get("/admin/profiles/{profile_id}")
+async def download_profile(profile_id: str):
+    """
+    Descarga el perfil en formato pstats
+    
+    Se puede abrir con `python -m pstats`, snakeviz o speedscope (flame graph).
+    """
+    path = profile_store.stats_path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+
+
+@router.get("/admin/profiles/{profile_id}/summary", response_class=PlainTextResponse)
+async def get_profile_summary(profile_id: str):
+    """
+    Resumen en texto: funciones ordenadas por tiempo acumulado y propio
+    """
+    path = profile_store.summary_path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    
+    with open(path, 'r') as f:
+        return PlainTextResponse(f.read())
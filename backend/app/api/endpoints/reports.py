@@ -1,47 +1,156 @@
 """
 Endpoints de reportes y recomendaciones
 """
+import json
+from datetime import datetime
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse, JSONResponse, Response
 from typing import Optional
-from ...services.data_analyzer import DataAnalyzer
-from ...services.report_generator import ReportGenerator
+from ..models.schemas import ReportJobRequest
 from ...services.professional_recommender import professional_recommender
-from ...utils.data_loader import data_loader
-from ...core.config import settings
+from ...services.materialized_views import materialized_views
+from ...services.report_jobs import report_jobs, REPORT_FORMATS, REPORT_TYPES
+from ...services.period_comparison import period_comparison, COMPARISON_PERIODS, MAX_COMPARISON_HOURS
+from ..dependencies import require_dataset
 
 router = APIRouter()
 
 
+async def _executive_report(dataset_id: Optional[str]) -> bytes:
+    """JSON del reporte ejecutivo (artefacto cacheado o renderizado al momento)"""
+    require_dataset(dataset_id)
+    try:
+        return await report_jobs.fetch('executive', 'json', dataset_id)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/reports/executive")
 @router.get("/reports/executive-summary")
-async def get_executive_summary():
+async def get_executive_summary(
+    dataset_id: Optional[str] = Query(None, description="ID del dataset")
+):
     """
     Obtiene resumen ejecutivo del análisis
+    
+    Se sirve el artefacto renderizado para la versión actual del dataset;
+    si no existe se renderiza (y queda cacheado para las siguientes).
+    """
+    return Response(content=await _executive_report(dataset_id), media_type='application/json')
+
+
+@router.get("/reports/recommendations")
+async def get_recommendations(
+    dataset_id: Optional[str] = Query(None, description="ID del dataset")
+):
+    """
+    Obtiene recomendaciones de seguridad básicas
     """
-    df = data_loader.load_data()
+    require_dataset(dataset_id)
+    if not materialized_views.get('overview', dataset_id)['total']:
+        return []
     
-    if df.empty:
-        raise HTTPException(status_code=500, detail="No hay datos para generar reporte")
+    return json.loads(await _executive_report(dataset_id))['recomendaciones']
+
+
+@router.get("/reports/comparison")
+async def get_period_comparison(
+    period: str = Query("week", pattern="^(day|week)$", description="day (día sobre día) o week (semana sobre semana)"),
+    hours: Optional[int] = Query(None, ge=1, le=24 * 366 * 5, description="Duración del periodo en horas (sustituye a period)"),
+    periods: int = Query(2, ge=2, le=104, description="Periodos consecutivos (el último es el actual)"),
+    end: Optional[datetime] = Query(None, description="Fin del periodo actual (por defecto, tras el último evento)"),
+    dataset_id: Optional[str] = Query(None, description="ID del dataset")
+):
+    """
+    Compara métricas clave entre periodos consecutivos
     
-    analyzer = DataAnalyzer(df)
-    generator = ReportGenerator(df)
+    Total de ataques, atacantes únicos, ataques a puertos SCADA, IPs
+    sospechosas, vectores principales y riesgo general de cada periodo,
+    agregados desde el rollup horario sin recorrer los eventos.
+    """
+    require_dataset(dataset_id)
+    if (hours or COMPARISON_PERIODS[period]) * periods > MAX_COMPARISON_HOURS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"hours x periods no puede superar {MAX_COMPARISON_HOURS} horas"
+        )
+    try:
+        return period_comparison.compare(
+            period=period, hours=hours, periods=periods, end=end, dataset_id=dataset_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/reports/jobs", status_code=202)
+async def create_report_job(request: ReportJobRequest):
+    """
+    Encola el renderizado de un reporte (JSON, HTML y CSV en zip)
     
-    return generator.generate_executive_summary(analyzer)
+    Si el reporte ya está renderizado para la versión actual del dataset,
+    el trabajo se devuelve terminado (`cached: true`).
+    """
+    require_dataset(request.dataset_id)
+    return report_jobs.submit(request.report_type, request.dataset_id)
 
 
-@router.get("/reports/recommendations")
-async def get_recommendations():
+@router.get("/reports/jobs")
+async def list_report_jobs(limit: int = Query(50, ge=1, le=500)):
     """
-    Obtiene recomendaciones de seguridad básicas
+    Trabajos de renderizado recientes (incluidos los programados)
     """
-    df = data_loader.load_data()
+    return report_jobs.list_jobs(limit)
+
+
+@router.get("/reports/jobs/{job_id}")
+async def get_report_job(job_id: str):
+    """
+    Estado de un trabajo de renderizado
+    """
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Trabajo {job_id} no encontrado")
+    return job
+
+
+@router.get("/reports/artifacts")
+async def list_report_artifacts(
+    dataset_id: Optional[str] = Query(None, description="ID del dataset")
+):
+    """
+    Reportes renderizados para la versión actual del dataset
+    """
+    require_dataset(dataset_id)
+    return {
+        'report_types': list(REPORT_TYPES),
+        'formats': list(REPORT_FORMATS),
+        'artifacts': report_jobs.list_artifacts(dataset_id)
+    }
+
+
+@router.get("/reports/artifacts/{report_type}")
+async def download_report(
+    report_type: str,
+    format: str = Query("html", pattern="^(json|html|csv)$", description="json, html o csv (zip)"),
+    dataset_id: Optional[str] = Query(None, description="ID del dataset")
+):
+    """
+    Descarga un reporte renderizado
     
-    if df.empty:
-        return []
+    Si aún no existe para la versión actual del dataset, encola su
+    renderizado y responde 202 con el trabajo para consultar su estado.
+    """
+    if report_type not in REPORT_TYPES:
+        raise HTTPException(status_code=404, detail=f"Tipo de reporte desconocido: {report_type}")
+    require_dataset(dataset_id)
     
-    analyzer = DataAnalyzer(df)
-    generator = ReportGenerator(df)
+    path = report_jobs.artifact_path(report_type, format, dataset_id)
+    if path is None:
+        return JSONResponse(report_jobs.submit(report_type, dataset_id), status_code=202)
     
-    return generator.generate_recommendations(analyzer)
+    extension, media_type = REPORT_FORMATS[format]
+    filename = f"reporte-{report_type}-{datetime.now().strftime('%Y%m%d')}.{extension}"
+    return FileResponse(path, media_type=media_type, filename=filename)
 
 
 @router.get("/reports/professional-recommendations")
@@ -51,10 +160,11 @@ async def get_professional_recommendations(
     """
     Obtiene recomendaciones profesionales basadas en frameworks internacionales
     (NIST, ISO 27001, IEC 62443, CIS Controls)
-    """
-    df = data_loader.load_data(dataset_id)
     
-    if df.empty:
+    La respuesta se sirve ya serializada desde la memoria del recomendador.
+    """
+    require_dataset(dataset_id)
+    if not materialized_views.get('overview', dataset_id)['total']:
         return {
             'total_recommendations': 0,
             'frameworks_applied': [],
@@ -62,31 +172,11 @@ async def get_professional_recommendations(
             'recommendations': []
         }
     
-    analyzer = DataAnalyzer(df)
-    ips = analyzer.get_suspicious_ips()
-    distribution = analyzer.get_attack_distribution()
-    
-    # Detectar si hay ataques SCADA
-    scada_targeted = any(
-        ip.nivel_riesgo in ['Alto', 'Crítico'] and 
-        any(p in settings.SCADA_CRITICAL_PORTS for p in ip.puertos_afectados)
-        for ip in ips
-    )
-    
-    recommendations = professional_recommender.generate_recommendations(
-        ips_sospechosas=ips,
-        attack_distribution=distribution,
-        scada_targeted=scada_targeted
+    risk_index = materialized_views.get('risk_index', dataset_id)
+    body = professional_recommender.render_response(
+        ips_sospechosas=risk_index['ips'],
+        attack_distribution=materialized_views.get('attack_distribution', dataset_id),
+        scada_targeted=risk_index['scada_targeted']
     )
     
-    return {
-        'total_recommendations': len(recommendations),
-        'frameworks_applied': [
-            'NIST Cybersecurity Framework',
-            'ISO/IEC 27001:2022',
-            'IEC 62443 (Industrial Security)',
-            'CIS Critical Security Controls'
-        ],
-        'scada_specific': scada_targeted,
-        'recommendations': [r.dict() for r in recommendations]
-    }
+    return Response(content=body, media_type='application/json')
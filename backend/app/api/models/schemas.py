@@ -136,3 +136,110 @@ class ReportData(BaseModel):
     ips_bloqueadas_sugeridas: List[SuspiciousIP]
     recomendaciones: List[Recommendation]
     metricas_clave: Dict[str, Any]  # ← CAMBIADO de 'any' a 'Any'
+    comparacion_periodo: Optional[Dict[str, Any]] = None  # Reportes diario/semanal
+
+
+class QueryField(str, Enum):
+    """Columnas indexadas de eventos"""
+    IP_ORIGEN = "ip_origen"
+    IP_DESTINO = "ip_destino"
+    PUERTO = "puerto"
+    PROTOCOLO = "protocolo"
+    ALERTA = "alerta"
+
+
+class QueryOperator(str, Enum):
+    """Operadores de condición"""
+    EQ = "eq"        # valor único
+    IN = "in"        # lista de valores
+    CIDR = "cidr"    # subred (solo IPs)
+    RANGE = "range"  # [mínimo, máximo] inclusivo (solo puerto)
+
+
+class QueryCondition(BaseModel):
+    """Condición sobre una columna indexada"""
+    field: QueryField
+    op: QueryOperator = QueryOperator.EQ
+    value: Any
+
+
+class EventQuery(BaseModel):
+    """Consulta de eventos: condiciones (AND), rango temporal, agrupación y top-k"""
+    conditions: List[QueryCondition] = []
+    start: Optional[datetime] = Field(None, description="Inicio del rango (incluido)")
+    end: Optional[datetime] = Field(None, description="Fin del rango (excluido)")
+    group_by: List[QueryField] = []
+    top_k: int = Field(10, ge=1, le=1000, description="Grupos devueltos (mayor conteo primero)")
+    limit: int = Field(100, ge=0, le=10000, description="Eventos devueltos (orden temporal)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "conditions": [
+                    {"field": "ip_destino", "op": "cidr", "value": "10.0.0.0/24"},
+                    {"field": "puerto", "op": "eq", "value": 502},
+                    {"field": "protocolo", "op": "eq", "value": "TCP"}
+                ],
+                "start": "2025-07-01T00:00:00",
+                "end": "2025-07-02T00:00:00",
+                "group_by": ["ip_origen"],
+                "top_k": 10,
+                "limit": 50
+            }
+        }
+
+
+class BlocklistSimulation(BaseModel):
+    """Ruleset a simular: IPs/CIDRs explícitos, una versión registrada o las reglas actuales"""
+    ips: List[str] = []
+    cidrs: List[str] = []
+    ports: List[int] = Field([], description="Puertos de destino bloqueados (vacío = todos)")
+    version: Optional[int] = Field(None, ge=1, description="Versión registrada de /response/firewall-rules")
+    source: Optional[str] = Field(None, pattern="^(firewall|fail2ban)$", description="Añadir las IPs que bloquearían las reglas actuales")
+    min_risk_level: str = "Alto"
+    bucket: str = Field("hour", pattern="^(hour|day)$", description="Granularidad de la línea temporal")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "ips": ["192.168.1.100"],
+                "cidrs": ["10.0.0.0/24"],
+                "ports": [],
+                "source": "firewall",
+                "bucket": "hour"
+            }
+        }
+
+
+class ReportJobRequest(BaseModel):
+    """Reporte a renderizar en segundo plano"""
+    report_type: str = Field("executive", pattern="^(executive|daily|weekly)$", description="Dataset completo, último día o última semana")
+    dataset_id: Optional[str] = None
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "report_type": "weekly"
+            }
+        }
+
+
+class PropagationSimulation(BaseModel):
+    """Parámetros de la simulación Monte Carlo de propagación"""
+    trials: Optional[int] = Field(None, ge=100, le=100000, description="Ensayos (por defecto SIMULATION_TRIALS)")
+    max_steps: Optional[int] = Field(None, ge=1, le=500, description="Pasos de propagación por ensayo")
+    entry_points: List[str] = Field([], description="IPs comprometidas al inicio (vacío = IPs que solo atacan)")
+    blocked: List[str] = Field([], description="IPs bloqueadas para comparar con la línea base")
+    attack_types: List[str] = Field([], description="Limitar a aristas con estos tipos de alerta")
+    seed: Optional[int] = None
+    top_n: int = Field(20, ge=1, le=500)
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "trials": 2000,
+                "max_steps": 24,
+                "blocked": ["192.168.1.100"],
+                "seed": 42
+            }
+        }
@@ -2,7 +2,7 @@
 Configuración centralizada de la aplicación
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 import os
 
 
@@ -30,11 +30,79 @@ class Settings(BaseSettings):
     CSV_FILENAME: str = "cbs_6_dataset_1_ids.csv"
     MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50MB ← NUEVO
     
+    # Procesamiento paralelo (0 = un worker por núcleo)
+    ANALYSIS_WORKERS: int = 0
+    
+    # Compartir el dataset decodificado entre workers de uvicorn
+    SHARED_MEMORY_DATASETS: bool = False
+    
+    # Trazas por petición (cabecera Server-Timing y log estructurado)
+    SERVER_TIMING_ENABLED: bool = True
+    TRACE_LOG_ENABLED: bool = False
+    TRACE_LOG_MIN_MS: float = 0.0
+    
+    # Perfilado bajo demanda (?profile=1 o X-Profile: 1 + X-Admin-Token)
+    PROFILING_ENABLED: bool = False
+    ADMIN_TOKEN: str = ""
+    PROFILES_PATH: str = os.path.join(os.path.dirname(__file__), "../profiles")
+    PROFILES_MAX: int = 50
+    
+    # Snapshots de resultados por versión de dataset y de código
+    SNAPSHOTS_ENABLED: bool = True
+    SNAPSHOT_PATH: str = os.path.join(os.path.dirname(__file__), "../snapshots")
+    SNAPSHOT_MEMORY_ITEMS: int = 256
+    
+    # Motor de análisis: 'pandas' o 'sql' (motor SQL embebido)
+    ANALYTICS_ENGINE: str = "pandas"
+    SQL_ENGINE_BACKEND: str = "auto"  # auto (DuckDB si está instalado), duckdb o sqlite
+    SQL_ENGINE_PATH: str = os.path.join(os.path.dirname(__file__), "../sql_engine")
+    SQL_ENGINE_THREADS: int = 0  # 0 = un hilo por núcleo (DuckDB)
+    SQL_ENGINE_MEMORY_LIMIT: str = ""  # p. ej. '2GB'; por encima se vuelca a disco (DuckDB)
+    
+    # Versiones de rulesets de firewall (diferencias incrementales)
+    RULESETS_PATH: str = os.path.join(os.path.dirname(__file__), "../rulesets")
+    RULESETS_MAX: int = 200
+    
+    # Firmas de recomendaciones profesionales memorizadas (LRU)
+    RECOMMENDATION_CACHE_SIZE: int = 256
+    
+    # Reportes ejecutivos renderizados en segundo plano (JSON, HTML, CSV en zip)
+    REPORTS_PATH: str = os.path.join(os.path.dirname(__file__), "../reports")
+    REPORT_WORKERS: int = 1
+    REPORT_JOBS_MAX: int = 200  # trabajos recordados en memoria
+    REPORT_SCHEDULED_TYPES: List[str] = ["executive", "daily", "weekly"]
+    REPORT_SCHEDULE_INTERVAL: float = 300.0  # segundos entre comprobaciones (0 = desactivado)
+    
+    # Diario de acciones de respuesta (buffer en memoria + segmentos NDJSON)
+    JOURNAL_PATH: str = os.path.join(os.path.dirname(__file__), "../journal")
+    JOURNAL_BUFFER_SIZE: int = 10_000
+    JOURNAL_SEGMENT_BYTES: int = 8 * 1024 * 1024
+    JOURNAL_MAX_SEGMENTS: int = 20
+    JOURNAL_FLUSH_INTERVAL: float = 1.0  # segundos entre escrituras agrupadas
+    JOURNAL_MAX_IPS_PER_ENTRY: int = 1000
+    
+    # Simulación Monte Carlo de propagación de ataques
+    SIMULATION_TRIALS: int = 2000
+    SIMULATION_MAX_STEPS: int = 24
+    SIMULATION_BATCH_TRIALS: int = 250  # ensayos por tarea del pool
+    SIMULATION_EDGE_RATE: float = 0.05  # probabilidad de éxito por evento observado
+    
+    # Exportación de eventos en streaming (filas leídas por bloque)
+    EXPORT_CHUNK_ROWS: int = 100_000
+    
     # Umbrales de detección
     SUSPICIOUS_IP_THRESHOLD: int = 10
     HIGH_RISK_THRESHOLD: int = 20
     MEDIUM_RISK_THRESHOLD: int = 10
     
+    # Zonas de red por bloque CIDR IPv4 (gana el prefijo más largo)
+    SUBNET_ZONES: Dict[str, str] = {
+        "192.168.0.0/16": "Red Interna - Administración",
+        "10.0.0.0/16": "Red Interna - SCADA/Control",
+        "172.16.0.0/16": "Red Interna - DMZ",
+    }
+    SUBNET_DEFAULT_ZONE: str = "Red Externa/Desconocida"
+    
     # Puertos críticos SCADA
     SCADA_CRITICAL_PORTS: List[int] = [
         502,   # Modbus
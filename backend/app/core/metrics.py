@@ -0,0 +1,205 @@
+"""
+Métricas de la aplicación en formato de texto Prometheus
+"""
+import time
+import threading
+from typing import Dict, List, Tuple
+from fastapi import FastAPI
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class _Metric:
+    """Base común: nombre, ayuda, etiquetas y lock"""
+    
+    kind = ''
+    
+    def __init__(self, name: str, documentation: str, labelnames: List[str] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames or [])
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(labels.get(name, '') for name in self.labelnames)
+    
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Contador monótono"""
+    
+    kind = 'counter'
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Valor que sube y baja"""
+    
+    kind = 'gauge'
+    
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+    
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Histograma de buckets acumulativos (permite calcular p50/p95/p99)"""
+    
+    kind = 'histogram'
+    
+    def __init__(self, name: str, documentation: str, labelnames: List[str] = None, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, list] = {}
+    
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [conteos por bucket..., suma, total]
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        
+        lines = self.header()
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Registro de métricas del proceso"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+    
+    def counter(self, name: str, documentation: str, labelnames: List[str] = None) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: List[str] = None) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: List[str] = None, buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def render(self) -> str:
+        """Exposición completa en formato de texto Prometheus 0.0.4"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Instancia global
+metrics = MetricsRegistry()
+
+HTTP_REQUESTS = metrics.counter(
+    'http_requests_total', 'Peticiones HTTP atendidas', ['method', 'route', 'status']
+)
+HTTP_ERRORS = metrics.counter(
+    'http_request_errors_total', 'Peticiones HTTP con error (5xx o excepción)', ['method', 'route']
+)
+HTTP_LATENCY = metrics.histogram(
+    'http_request_duration_seconds', 'Latencia de las peticiones HTTP', ['method', 'route']
+)
+HTTP_IN_FLIGHT = metrics.gauge(
+    'http_requests_in_flight', 'Peticiones HTTP en curso', ['method']
+)
+ROWS_PROCESSED = metrics.counter(
+    'ids_rows_processed_total', 'Filas de eventos procesadas por servicio', ['service']
+)
+CACHE_HITS = metrics.counter(
+    'ids_cache_hits_total', 'Aciertos de caché', ['cache']
+)
+CACHE_MISSES = metrics.counter(
+    'ids_cache_misses_total', 'Fallos de caché', ['cache']
+)
+MODEL_FITS = metrics.counter(
+    'ids_model_fits_total', 'Entrenamientos de modelos ML', ['model']
+)
+
+
+def setup_metrics(app: FastAPI) -> None:
+    """
+    Registra el middleware que mide latencia, errores y peticiones en curso
+    
+    Args:
+        app: Instancia de FastAPI
+    """
+    @app.middleware("http")
+    async def record_request_metrics(request, call_next):
+        method = request.method
+        HTTP_IN_FLIGHT.inc(method=method)
+        start = time.perf_counter()
+        status = 500
+        
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec(method=method)
+            
+            # Plantilla de la ruta (p. ej. /datasets/{dataset_id}) para acotar cardinalidad
+            route = request.scope.get('route')
+            route_path = getattr(route, 'path', 'unmatched')
+            
+            HTTP_REQUESTS.inc(method=method, route=route_path, status=str(status))
+            HTTP_LATENCY.observe(elapsed, method=method, route=route_path)
+            if status >= 500:
+                HTTP_ERRORS.inc(method=method, route=route_path)
@@ -0,0 +1,146 @@
+"""
+Perfilado bajo demanda de peticiones individuales (cProfile)
+"""
+import io
+import os
+import re
+import time
+import pstats
+import cProfile
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi import FastAPI
+from .config import settings
+from .security import is_admin_token
+
+
+_PROFILE_ID = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+
+class ProfileStore:
+    """Guarda los perfiles (.prof de pstats + resumen .txt) en PROFILES_PATH"""
+    
+    def __init__(self, path: str = None):
+        self.path = path or settings.PROFILES_PATH
+    
+    def _resolve(self, profile_id: str, extension: str) -> Optional[str]:
+        if not _PROFILE_ID.match(profile_id) or '..' in profile_id:
+            return None
+        path = os.path.join(self.path, f"{profile_id}{extension}")
+        return path if os.path.exists(path) else None
+    
+    def stats_path(self, profile_id: str) -> Optional[str]:
+        """Ruta del archivo pstats de un perfil"""
+        return self._resolve(profile_id, '.prof')
+    
+    def summary_path(self, profile_id: str) -> Optional[str]:
+        """Ruta del resumen en texto de un perfil"""
+        return self._resolve(profile_id, '.txt')
+    
+    def save(self, profiler: cProfile.Profile, method: str, route: str, elapsed_ms: float) -> str:
+        """
+        Guarda un perfil y elimina los más antiguos por encima de PROFILES_MAX
+        
+        Returns:
+            ID del perfil
+        """
+        os.makedirs(self.path, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', route).strip('-') or 'root'
+        profile_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{method.lower()}_{slug}"[:120]
+        
+        profiler.dump_stats(os.path.join(self.path, f"{profile_id}.prof"))
+        
+        buffer = io.StringIO()
+        buffer.write(f"{method} {route} - {elapsed_ms:.1f} ms\n\n")
+        stats = pstats.Stats(profiler, stream=buffer)
+        stats.sort_stats('cumulative').print_stats(40)
+        stats.sort_stats('tottime').print_stats(20)
+        with open(os.path.join(self.path, f"{profile_id}.txt"), 'w') as f:
+            f.write(buffer.getvalue())
+        
+        self._prune()
+        return profile_id
+    
+    def _prune(self) -> None:
+        profiles = sorted(p[:-5] for p in os.listdir(self.path) if p.endswith('.prof'))
+        for profile_id in profiles[:-settings.PROFILES_MAX] if settings.PROFILES_MAX > 0 else []:
+            for extension in ('.prof', '.txt'):
+                try:
+                    os.remove(os.path.join(self.path, f"{profile_id}{extension}"))
+                except FileNotFoundError:
+                    pass
+    
+    def list_profiles(self) -> List[Dict]:
+        """Lista los perfiles guardados (más recientes primero)"""
+        if not os.path.isdir(self.path):
+            return []
+        
+        profiles = []
+        for name in sorted(os.listdir(self.path), reverse=True):
+            if not name.endswith('.prof'):
+                continue
+            path = os.path.join(self.path, name)
+            profiles.append({
+                'id': name[:-5],
+                'size_bytes': os.path.getsize(path),
+                'created_at': datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+            })
+        return profiles
+
+
+def _profile_requested(request) -> bool:
+    flag = request.query_params.get('profile') or request.headers.get('x-profile')
+    return flag in ('1', 'true', 'yes')
+
+
+def setup_profiling(app: FastAPI) -> None:
+    """
+    Registra el middleware de perfilado bajo demanda
+    
+    Solo actúa con PROFILING_ENABLED y cuando la petición trae `?profile=1`
+    (o la cabecera `X-Profile: 1`) junto a un `X-Admin-Token` válido. Se
+    perfila una petición a la vez; cProfile mide el hilo del event loop, así
+    que el perfil puede incluir trabajo de otras peticiones concurrentes.
+    
+    Args:
+        app: Instancia de FastAPI
+    """
+    lock = threading.Lock()
+    
+    @app.middleware("http")
+    async def profile_request(request, call_next):
+        if not settings.PROFILING_ENABLED or not _profile_requested(request):
+            return await call_next(request)
+        
+        if not is_admin_token(request.headers.get('x-admin-token')):
+            return await call_next(request)
+        
+        if not lock.acquire(blocking=False):
+            response = await call_next(request)
+            response.headers['X-Profile-Status'] = 'busy'
+            return response
+        
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = await call_next(request)
+            finally:
+                profiler.disable()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            
+            route = request.scope.get('route')
+            profile_id = profile_store.save(
+                profiler, request.method, getattr(route, 'path', request.url.path), elapsed_ms
+            )
+        finally:
+            lock.release()
+        
+        response.headers['X-Profile-Id'] = profile_id
+        return response
+
+
+# Instancia global
+profile_store = ProfileStore()
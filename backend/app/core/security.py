@@ -1,7 +1,9 @@
 """
 Configuración de seguridad y CORS
 """
-from fastapi import FastAPI
+import hmac
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
 
@@ -36,3 +38,23 @@ def setup_security_headers(app: FastAPI) -> None:
         response.headers["X-Frame-Options"] = "DENY"
         response.headers["X-XSS-Protection"] = "1; mode=block"
         return response
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """
+    Verifica el token de administración (comparación en tiempo constante)
+    
+    Args:
+        token: Valor recibido en la cabecera X-Admin-Token
+    """
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode('utf-8'), settings.ADMIN_TOKEN.encode('utf-8'))
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Dependencia para endpoints de administración"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Administración deshabilitada (ADMIN_TOKEN no configurado)")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=401, detail="Token de administración inválido")
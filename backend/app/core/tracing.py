@@ -0,0 +1,148 @@
+"""
+Spans internos por petición y cabecera Server-Timing
+"""
+import json
+import time
+import inspect
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+from fastapi import FastAPI
+from .config import settings
+
+
+class Trace:
+    """Spans registrados durante una petición"""
+    
+    def __init__(self):
+        self.spans: List[Dict] = []
+        self.depth = 0
+    
+    def record(self, name: str, duration: float, depth: int) -> None:
+        self.spans.append({'name': name, 'dur_ms': round(duration * 1000, 3), 'depth': depth})
+    
+    def aggregate(self) -> List[Dict]:
+        """Agrupa spans repetidos (mismo nombre) sumando duraciones"""
+        totals: Dict[str, Dict] = {}
+        for s in self.spans:
+            entry = totals.setdefault(s['name'], {'name': s['name'], 'dur_ms': 0.0, 'count': 0, 'depth': s['depth']})
+            entry['dur_ms'] += s['dur_ms']
+            entry['count'] += 1
+            entry['depth'] = min(entry['depth'], s['depth'])
+        return list(totals.values())
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar('ids_trace', default=None)
+
+
+@contextmanager
+def span(name: str):
+    """
+    Mide una etapa dentro de la petición en curso
+    
+    Fuera de una petición (scripts, workers de procesos) no registra nada.
+    
+    Args:
+        name: Nombre de la etapa (p. ej. 'DataAnalyzer.get_timeline_data')
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    
+    depth = trace.depth
+    trace.depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.depth = depth
+        trace.record(name, time.perf_counter() - start, depth)
+
+
+def traced(name: str = None) -> Callable:
+    """
+    Decorador que registra la función como span
+    
+    Args:
+        name: Nombre del span (por defecto, Clase.método)
+    """
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+        
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+        
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return fn(*args, **kwargs)
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    
+    return decorator
+
+
+def _server_timing(spans: List[Dict], total_ms: float) -> str:
+    """Formatea los spans como valor de la cabecera Server-Timing"""
+    top_level = sum(s['dur_ms'] for s in spans if s['depth'] == 0)
+    entries = [
+        f'{s["name"]};dur={s["dur_ms"]:.1f}' + (f';desc="x{s["count"]}"' if s['count'] > 1 else '')
+        for s in spans
+    ]
+    entries.append(f'other;dur={max(total_ms - top_level, 0):.1f};desc="serialization/middleware"')
+    entries.append(f'total;dur={total_ms:.1f}')
+    return ', '.join(entries)
+
+
+def setup_tracing(app: FastAPI) -> None:
+    """
+    Registra el middleware que recoge los spans de cada petición
+    
+    Las duraciones se devuelven en la cabecera Server-Timing (visible en la
+    pestaña Network de las devtools) y, si TRACE_LOG_ENABLED está activo, se
+    imprimen como registro JSON para las peticiones más lentas que
+    TRACE_LOG_MIN_MS.
+    
+    Args:
+        app: Instancia de FastAPI
+    """
+    @app.middleware("http")
+    async def collect_spans(request, call_next):
+        if not settings.SERVER_TIMING_ENABLED and not settings.TRACE_LOG_ENABLED:
+            return await call_next(request)
+        
+        # El endpoint se ejecuta en otra tarea con una copia del contexto:
+        # comparte el mismo objeto Trace, por lo que sus spans llegan aquí
+        trace = Trace()
+        token = _current_trace.set(trace)
+        start = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            _current_trace.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+        
+        spans = trace.aggregate()
+        if settings.SERVER_TIMING_ENABLED:
+            response.headers['Server-Timing'] = _server_timing(spans, total_ms)
+            response.headers['Timing-Allow-Origin'] = ', '.join(settings.BACKEND_CORS_ORIGINS)
+        
+        if settings.TRACE_LOG_ENABLED and total_ms >= settings.TRACE_LOG_MIN_MS:
+            route = request.scope.get('route')
+            print(json.dumps({
+                'event': 'trace',
+                'method': request.method,
+                'route': getattr(route, 'path', request.url.path),
+                'status': response.status_code,
+                'total_ms': round(total_ms, 3),
+                'spans': trace.spans
+            }))
+        
+        return response
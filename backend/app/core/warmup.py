@@ -0,0 +1,134 @@
+"""
+Precalentamiento en segundo plano y estado de readiness
+"""
+import time
+import asyncio
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class Warmup:
+    """
+    Ejecuta las etapas de precalentamiento fuera del arranque
+    
+    La API acepta tráfico (liveness) en cuanto se importa; las etapas
+    pesadas se ejecutan en un hilo y `/ready` informa cuándo terminaron.
+    """
+    
+    def __init__(self):
+        self.steps: List[Tuple[str, Callable[[Dict], Optional[Dict]]]] = []
+        self.status = 'pending'
+        self.results: Dict[str, Dict] = {}
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self._lock = threading.Lock()
+    
+    def step(self, name: str) -> Callable:
+        """
+        Decorador para registrar una etapa (se ejecutan en orden de registro)
+        
+        Cada etapa recibe un dict de contexto compartido y puede devolver
+        detalles para el estado de readiness.
+        """
+        def decorator(fn: Callable) -> Callable:
+            self.steps.append((name, fn))
+            return fn
+        return decorator
+    
+    @property
+    def ready(self) -> bool:
+        return self.status == 'ready'
+    
+    def run(self) -> None:
+        """Ejecuta todas las etapas; un fallo no impide servir peticiones"""
+        with self._lock:
+            if self.status == 'running':
+                return
+            self.status = 'running'
+            self.started_at = datetime.now().isoformat()
+            self.results = {name: {'status': 'pending'} for name, _ in self.steps}
+        
+        failed = False
+        context: Dict = {}
+        for name, fn in self.steps:
+            self.results[name] = {'status': 'running'}
+            start = time.perf_counter()
+            try:
+                detail = fn(context) or {}
+                self.results[name] = {'status': 'done', **detail}
+            except Exception as e:
+                failed = True
+                self.results[name] = {'status': 'failed', 'error': str(e)}
+                print(f" Warm-up '{name}' falló: {e}")
+            self.results[name]['duration_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        
+        self.finished_at = datetime.now().isoformat()
+        self.status = 'failed' if failed else 'ready'
+        print(f"✓ Warm-up {'con errores' if failed else 'completado'}: "
+              + ", ".join(f"{n} {r['duration_ms']}ms" for n, r in self.results.items()))
+    
+    def start(self) -> asyncio.Future:
+        """Lanza el precalentamiento en el executor por defecto del event loop"""
+        return asyncio.get_running_loop().run_in_executor(None, self.run)
+    
+    def snapshot(self) -> Dict:
+        """Estado actual para el endpoint de readiness"""
+        return {
+            'status': self.status,
+            'ready': self.ready,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'steps': dict(self.results)
+        }
+
+
+# Instancia global
+warmup = Warmup()
+
+
+@warmup.step('snapshots')
+def _load_snapshots(context: Dict) -> Dict:
+    from ..services.snapshot_store import snapshot_store
+    
+    return snapshot_store.load_all()
+
+
+@warmup.step('journal')
+def _load_journal(context: Dict) -> Dict:
+    from ..services.response_journal import response_journal
+    
+    # Recupera la cola del diario fuera de los endpoints de respuesta
+    return {'entries': response_journal.load()}
+
+
+@warmup.step('dataset')
+def _load_dataset(context: Dict) -> Dict:
+    from ..utils.data_loader import data_loader
+    
+    df = data_loader.load_data()
+    if df.empty:
+        raise RuntimeError("No se pudieron cargar los datos")
+    
+    return {
+        'records': len(df),
+        'period': [df['timestamp'].min().isoformat(), df['timestamp'].max().isoformat()]
+    }
+
+
+@warmup.step('precompute')
+def _precompute_snapshots(context: Dict) -> Dict:
+    from ..services.snapshot_store import warm_snapshots
+    
+    # Tras un deploy (nueva versión de código) recalcula los artefactos
+    # principales antes de marcar la instancia como lista; el de
+    # `ml-anomalies` entrena el Isolation Forest (e importa scikit-learn)
+    return warm_snapshots()
+
+
+@warmup.step('reports')
+def _schedule_reports(context: Dict) -> Dict:
+    from ..services.report_jobs import report_jobs
+    
+    # Solo encola: los reportes programados se renderizan en segundo plano
+    return report_jobs.start_scheduler()
@@ -2,13 +2,21 @@
 FastAPI Application Principal - IDS SCADA Dashboard
 """
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .core.config import settings
 from .core.security import setup_cors, setup_security_headers
+from .core.metrics import metrics, setup_metrics
+from .core.tracing import setup_tracing
+from .core.profiling import setup_profiling
 from .api.endpoints import analysis, alerts, reports
 from .api.endpoints import ml_analysis, auto_response, network_graph
 from .api.endpoints import datasets  # ← NUEVO
-from .utils.data_loader import data_loader
+from .api.endpoints import profiling, events
+from .core.warmup import warmup
+from .utils.workers import shutdown_process_pool
+from .services.response_journal import response_journal
+from .services.report_jobs import report_jobs
 
 # Crear instancia de FastAPI
 app = FastAPI(
@@ -22,6 +30,9 @@ app = FastAPI(
 # Configurar seguridad
 setup_cors(app)
 setup_security_headers(app)
+setup_metrics(app)
+setup_tracing(app)
+setup_profiling(app)
 
 # Registrar routers
 app.include_router(
@@ -59,23 +70,28 @@ app.include_router(  # ← NUEVO
     prefix=f"{settings.API_V1_PREFIX}",
     tags=[" Dataset Management"]
 )
+app.include_router(
+    events.router,
+    prefix=f"{settings.API_V1_PREFIX}",
+    tags=[" Events"]
+)
+app.include_router(
+    profiling.router,
+    prefix=f"{settings.API_V1_PREFIX}",
+    tags=[" Admin"]
+)
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Evento de inicio - Precarga de datos"""
+    """Evento de inicio - Lanza la precarga en segundo plano"""
     print("=" * 60)
     print(" Iniciando IDS SCADA Dashboard API v2.0...")
     print("=" * 60)
     
-    # Precargar datos
-    df = data_loader.load_data()
-    if not df.empty:
-        print(f"✓ Dataset cargado: {len(df)} registros")
-        fecha_inicio, fecha_fin = data_loader.get_date_range()
-        print(f"✓ Período: {fecha_inicio} - {fecha_fin}")
-    else:
-        print("  Advertencia: No se pudieron cargar los datos")
+    # Carga de datos y modelo fuera del arranque: /health responde de
+    # inmediato y /ready indica cuándo termina
+    warmup.start()
     
     print("=" * 60)
     print(f" API disponible en: http://localhost:8000")
@@ -87,6 +103,14 @@ async def startup_event():
     print("=" * 60)
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Evento de cierre - Libera los pools, vacía el diario de respuesta y detiene los reportes"""
+    shutdown_process_pool()
+    response_journal.close()
+    report_jobs.shutdown()
+
+
 @app.get("/")
 async def root():
     """Endpoint raíz - Health check"""
@@ -108,16 +132,37 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    df = data_loader.load_data()
+    """Liveness: responde sin tocar datos ni modelos"""
+    dataset = warmup.results.get('dataset', {})
     
     return {
         "status": "healthy",
         "version": "2.0.0",
-        "data_loaded": not df.empty,
-        "records_count": len(df) if not df.empty else 0,
+        "ready": warmup.ready,
+        "data_loaded": dataset.get('status') == 'done',
+        "records_count": dataset.get('records', 0),
         "ml_enabled": True,
         "auto_response_enabled": True,
         "multi_dataset_enabled": True,
         "professional_recommendations": True
     }
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 200 cuando el precalentamiento terminó, 503 mientras tanto"""
+    state = warmup.snapshot()
+    return JSONResponse(state, status_code=200 if state['status'] == 'ready' else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """
+    Métricas en formato de texto Prometheus
+    
+    Latencia por ruta (histograma, p50/p95/p99 vía histogram_quantile),
+    errores, peticiones en curso, filas procesadas, aciertos de caché y
+    entrenamientos de modelos. Los valores son por proceso: con varios
+    workers de uvicorn, Prometheus debe agregar por instancia.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,277 @@
+"""
+Simulación Monte Carlo de propagación de ataques sobre el grafo observado
+"""
+import time
+import asyncio
+from concurrent.futures import Executor
+from typing import Dict, List, Optional
+import numpy as np
+from ..core.config import settings
+from ..core.tracing import span
+from ..utils.workers import get_process_pool, get_worker_count
+from .materialized_views import materialized_views
+
+
+def run_trials(
+    src: np.ndarray,
+    dst: np.ndarray,
+    prob: np.ndarray,
+    entry: np.ndarray,
+    scada: np.ndarray,
+    trials: int,
+    max_steps: int,
+    seed
+) -> Dict[str, np.ndarray]:
+    """
+    Ejecuta un lote de ensayos de propagación (función de worker)
+    
+    En cada paso, cada nodo comprometido intenta todas sus aristas hacia
+    nodos aún no comprometidos con la probabilidad de la arista. Los
+    ensayos del lote avanzan a la vez: el estado es una matriz
+    ensayos x nodos y solo se sortean las aristas activas.
+    
+    Args:
+        src: Nodo origen de cada arista
+        dst: Nodo destino de cada arista
+        prob: Probabilidad de éxito por paso de cada arista
+        entry: Máscara de nodos comprometidos al inicio
+        scada: Máscara de activos de alto valor (puertos SCADA)
+        trials: Ensayos del lote
+        max_steps: Pasos de propagación por ensayo
+        seed: Semilla (o SeedSequence) del lote
+    
+    Returns:
+        Dict con conteos agregados del lote (sumables entre lotes)
+    """
+    rng = np.random.default_rng(seed)
+    n_nodes = len(entry)
+    compromised = np.repeat(entry[None, :], trials, axis=0)
+    steps = np.where(compromised, 0, -1).astype(np.int32)
+    
+    for step in range(1, max_steps + 1):
+        active = compromised[:, src] & ~compromised[:, dst]
+        trial_idx, edge_idx = np.nonzero(active)
+        if len(edge_idx) == 0:
+            break
+        hit = rng.random(len(edge_idx)) < prob[edge_idx]
+        newly = np.zeros((trials, n_nodes), dtype=bool)
+        newly[trial_idx[hit], dst[edge_idx[hit]]] = True
+        steps[newly] = step
+        compromised |= newly
+    
+    reached = compromised & ~entry[None, :]
+    return {
+        'trials': trials,
+        'reached': reached.sum(axis=0),
+        'step_sum': np.where(reached, steps, 0).sum(axis=0),
+        'any_scada': int((reached & scada[None, :]).any(axis=1).sum()),
+        'compromised': int(reached.sum())
+    }
+
+
+class AttackGraphModel:
+    """
+    Grafo de ataques en forma de arrays para la simulación
+    
+    Los nodos son IPs y las aristas los pares origen -> destino observados.
+    La probabilidad por paso de una arista crece con su frecuencia:
+    `1 - (1 - edge_rate) ** eventos`, como si cada evento observado fuera un
+    intento independiente. Un destino es activo de alto valor si recibió
+    tráfico a algún puerto SCADA.
+    """
+    
+    def __init__(self, graph_stats: Dict, attack_types: Optional[List[str]] = None, edge_rate: float = None):
+        edge_rate = edge_rate or settings.SIMULATION_EDGE_RATE
+        scada_ports = set(settings.SCADA_CRITICAL_PORTS)
+        wanted = set(attack_types or [])
+        
+        self.nodes: List[str] = list(graph_stats['sent']) + [
+            ip for ip in graph_stats['received'] if ip not in graph_stats['sent']
+        ]
+        self.position = {ip: i for i, ip in enumerate(self.nodes)}
+        
+        src, dst, weight = [], [], []
+        self.scada = np.zeros(len(self.nodes), dtype=bool)
+        for (source, target), edge in graph_stats['edges'].items():
+            if wanted and not wanted.intersection(edge['attacks']):
+                continue
+            src.append(self.position[source])
+            dst.append(self.position[target])
+            weight.append(edge['weight'])
+            if scada_ports.intersection(edge['ports']):
+                self.scada[self.position[target]] = True
+        
+        self.src = np.array(src, dtype=np.int64)
+        self.dst = np.array(dst, dtype=np.int64)
+        self.weight = np.array(weight, dtype=np.int64)
+        self.prob = 1.0 - (1.0 - edge_rate) ** self.weight
+        
+        self.received = np.zeros(len(self.nodes), dtype=bool)
+        self.received[self.dst] = True
+    
+    def default_entry(self) -> np.ndarray:
+        """IPs que solo atacan o, si todas reciben tráfico, todas las que atacan"""
+        senders = np.zeros(len(self.nodes), dtype=bool)
+        senders[self.src] = True
+        pure = senders & ~self.received
+        return pure if pure.any() else senders
+    
+    def mask(self, ips: List[str]) -> np.ndarray:
+        """Máscara de nodos para una lista de IPs (las desconocidas se ignoran)"""
+        result = np.zeros(len(self.nodes), dtype=bool)
+        result[[self.position[ip] for ip in ips if ip in self.position]] = True
+        return result
+
+
+class AttackSimulator:
+    """
+    Estima por Monte Carlo la probabilidad de alcanzar cada activo y el
+    tiempo esperado (en pasos de propagación) hasta comprometerlo
+    
+    Los ensayos se reparten en lotes entre los procesos del pool compartido
+    (o cualquier `concurrent.futures.Executor`). Con nodos bloqueados se
+    repite la simulación con las mismas semillas sin sus aristas, de modo
+    que la diferencia con la línea base refleja el efecto del bloqueo.
+    """
+    
+    def __init__(self, executor: Optional[Executor] = None):
+        self.executor = executor
+    
+    def _get_executor(self) -> Executor:
+        return self.executor or get_process_pool()
+    
+    async def _run(self, model: AttackGraphModel, prob: np.ndarray, entry: np.ndarray,
+                   trials: int, max_steps: int, seeds: List) -> Dict:
+        """Reparte los ensayos en lotes y suma sus conteos"""
+        batch = settings.SIMULATION_BATCH_TRIALS
+        sizes = [min(batch, trials - i) for i in range(0, trials, batch)]
+        executor = self._get_executor()
+        futures = [
+            asyncio.wrap_future(executor.submit(
+                run_trials, model.src, model.dst, prob, entry, model.scada, size, max_steps, seed
+            ))
+            for size, seed in zip(sizes, seeds)
+        ]
+        partials = await asyncio.gather(*futures)
+        
+        total = {'trials': 0, 'reached': 0, 'step_sum': 0, 'any_scada': 0, 'compromised': 0}
+        for partial in partials:
+            for key in total:
+                total[key] = total[key] + partial[key]
+        total['batches'] = len(partials)
+        return total
+    
+    @staticmethod
+    def _assets(model: AttackGraphModel, result: Dict) -> Dict[str, Dict]:
+        trials = result['trials']
+        reached = np.asarray(result['reached'])
+        step_sum = np.asarray(result['step_sum'])
+        assets = {}
+        for i in np.flatnonzero(reached):
+            assets[model.nodes[i]] = {
+                'ip': model.nodes[i],
+                'high_value': bool(model.scada[i]),
+                'probability': round(float(reached[i]) / trials, 4),
+                'expected_steps': round(float(step_sum[i]) / float(reached[i]), 2)
+            }
+        return assets
+    
+    async def simulate(
+        self,
+        trials: int = None,
+        max_steps: int = None,
+        entry_points: Optional[List[str]] = None,
+        blocked: Optional[List[str]] = None,
+        attack_types: Optional[List[str]] = None,
+        seed: Optional[int] = None,
+        top_n: int = 20,
+        dataset_id: Optional[str] = None
+    ) -> Dict:
+        """
+        Simula la propagación sobre el grafo de ataques del dataset
+        
+        Args:
+            trials: Número de ensayos (por defecto SIMULATION_TRIALS)
+            max_steps: Pasos por ensayo (por defecto SIMULATION_MAX_STEPS)
+            entry_points: IPs comprometidas al inicio (por defecto, las que solo atacan)
+            blocked: IPs bloqueadas (sin aristas de entrada ni de salida)
+            attack_types: Limitar a aristas con estos tipos de alerta
+            seed: Semilla para resultados reproducibles
+            top_n: Activos devueltos (mayor probabilidad primero)
+            dataset_id: ID del dataset (None = default)
+        
+        Returns:
+            Dict con probabilidad y tiempo esperado por activo, riesgo sobre
+            activos SCADA y, si hay bloqueos, la comparación con la línea base
+        """
+        started = time.perf_counter()
+        trials = trials or settings.SIMULATION_TRIALS
+        max_steps = max_steps or settings.SIMULATION_MAX_STEPS
+        
+        with span('attack_simulation.model'):
+            model = AttackGraphModel(materialized_views.get('graph_stats', dataset_id), attack_types)
+        if len(model.src) == 0:
+            raise ValueError("No hay aristas de ataque que simular")
+        
+        entry = model.mask(entry_points) if entry_points else model.default_entry()
+        if not entry.any():
+            raise ValueError("Ningún punto de entrada está en el grafo de ataques")
+        
+        batches = -(-trials // settings.SIMULATION_BATCH_TRIALS)
+        seeds = np.random.SeedSequence(seed).spawn(batches)
+        
+        with span('attack_simulation.baseline'):
+            baseline = await self._run(model, model.prob, entry, trials, max_steps, seeds)
+        
+        blocked_mask = model.mask(blocked or [])
+        scenario = None
+        if blocked_mask.any():
+            # Un nodo bloqueado no recibe ni emite ataques
+            prob = np.where(blocked_mask[model.src] | blocked_mask[model.dst], 0.0, model.prob)
+            with span('attack_simulation.blocked'):
+                scenario = await self._run(model, prob, entry & ~blocked_mask, trials, max_steps, seeds)
+        
+        final = scenario or baseline
+        assets = self._assets(model, final)
+        baseline_assets = self._assets(model, baseline)
+        if scenario is not None:
+            for ip, base in baseline_assets.items():
+                asset = assets.setdefault(ip, {
+                    'ip': ip, 'high_value': base['high_value'], 'probability': 0.0, 'expected_steps': None
+                })
+                asset['baseline_probability'] = base['probability']
+                asset['probability_delta'] = round(asset['probability'] - base['probability'], 4)
+        
+        ranked = sorted(assets.values(), key=lambda a: (-a['high_value'], -a['probability'], a['ip']))
+        
+        def summary(result: Dict) -> Dict:
+            return {
+                'prob_any_scada': round(result['any_scada'] / result['trials'], 4),
+                'expected_compromised': round(result['compromised'] / result['trials'], 2)
+            }
+        
+        response = {
+            'trials': trials,
+            'max_steps': max_steps,
+            'graph': {
+                'nodes': len(model.nodes),
+                'edges': int(len(model.src)),
+                'high_value_assets': int(model.scada.sum()),
+                'entry_points': int(entry.sum())
+            },
+            'blocked': [model.nodes[i] for i in np.flatnonzero(blocked_mask)],
+            **summary(final),
+            'assets': ranked[:top_n],
+            'execution': {
+                'batches': baseline['batches'],
+                'workers': get_worker_count() if self.executor is None else None,
+                'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+            }
+        }
+        if scenario is not None:
+            response['baseline'] = summary(baseline)
+        return response
+
+
+# Instancia global
+attack_simulator = AttackSimulator()
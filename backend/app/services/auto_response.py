@@ -1,19 +1,110 @@
 """
 Sistema de respuesta automatizada a amenazas
 """
-from typing import List, Dict
+import ipaddress
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Tuple
 from datetime import datetime
 from ..api.models.schemas import SuspiciousIP
+from ..utils.helpers import ipv4_to_int, int_to_ipv4
+
+
+# Nombres de los objetos creados en los firewalls
+BLOCKLIST_SET = 'ids_scada_block'
+NFT_TABLE = 'ids_scada'
+ASA_OBJECT_GROUP = 'IDS_SCADA_BLOCK'
+WINDOWS_RULE_GROUP = 'IDS SCADA Block'
+WINDOWS_ADDRESSES_PER_RULE = 1000
+
+def _range_to_cidrs(low: int, high: int) -> List[str]:
+    """Descompone un rango IPv4 contiguo en el mínimo de bloques CIDR alineados"""
+    cidrs = []
+    while low <= high:
+        # Bloque más grande alineado en `low` que no se pasa de `high`
+        size = low & -low if low else 1 << 32
+        while size > high - low + 1:
+            size >>= 1
+        cidrs.append(f"{int_to_ipv4(low)}/{33 - size.bit_length()}")
+        low += size
+    return cidrs
+
+
+def _asa_network_object(net: str) -> str:
+    """Entrada de object-group de Cisco ASA para un bloque CIDR"""
+    address, prefix = net.split('/')
+    if prefix in ('32', '128'):
+        return f"network-object host {address}"
+    if ':' in address:
+        return f"network-object {net}"
+    return f"network-object {address} {ipaddress.IPv4Network(net).netmask}"
+
+
+def collapse_blocklist(ips: List[str]) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Agrega una lista de IPs en el mínimo conjunto de bloques CIDR
+    
+    Solo se fusionan direcciones contiguas: los bloques cubren exactamente
+    las IPs de entrada, sin bloquear direcciones adicionales. Las IPv4 se
+    procesan vectorizadas (ordenar, detectar rangos contiguos y partirlos
+    en bloques alineados); las IPv6 con ipaddress.collapse_addresses.
+    
+    Args:
+        ips: Direcciones IP (IPv4 o IPv6; se ignoran duplicados)
+    
+    Returns:
+        (bloques IPv4, bloques IPv6, IPs inválidas), bloques en orden ascendente
+    """
+    if not ips:
+        return [], [], []
+    
+    values = pd.Series(ips, dtype=str).str.strip()
+    numeric = ipv4_to_int(values)
+    
+    v4 = []
+    addresses = np.unique(numeric[numeric >= 0])
+    if len(addresses):
+        breaks = np.flatnonzero(np.diff(addresses) != 1) + 1
+        starts = addresses[np.concatenate(([0], breaks))].tolist()
+        ends = addresses[np.concatenate((breaks - 1, [len(addresses) - 1]))].tolist()
+        for low, high in zip(starts, ends):
+            v4 += [f"{int_to_ipv4(low)}/32"] if low == high else _range_to_cidrs(low, high)
+    
+    v6, invalid = [], []
+    for ip in set(values[numeric < 0]):
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            invalid.append(ip)
+            continue
+        if address.version == 6:
+            v6.append(ipaddress.ip_network(address))
+        else:
+            invalid.append(ip)
+    
+    return v4, [str(net) for net in ipaddress.collapse_addresses(v6)], sorted(invalid)
+
+
+def _hashsize(elements: int) -> int:
+    """Tamaño inicial de la tabla hash de ipset (potencia de 2, mínimo 1024)"""
+    size = 1024
+    while size < elements:
+        size *= 2
+    return size
 
 
 class AutoResponseSystem:
     """Sistema de respuesta automática a incidentes"""
     
-    def __init__(self):
-        self.actions_log = []
-    
     def generate_firewall_rules(self, ips: List[SuspiciousIP]) -> Dict:
-        """Genera reglas de firewall listas para aplicar"""
+        """
+        Genera reglas de firewall listas para aplicar
+        
+        Las IPs se agregan en el mínimo conjunto de bloques CIDR y, además de
+        las reglas por plataforma, se generan cargas de conjuntos (ipset
+        hash:net y nftables con intervalos) que el kernel consulta en tiempo
+        constante en lugar de recorrer una regla por IP.
+        """
         
         # Filtrar solo IPs de alto y crítico riesgo
         high_risk_ips = [
@@ -21,43 +112,199 @@ class AutoResponseSystem:
             if ip.nivel_riesgo in ['Alto', 'Crítico']
         ]
         
+        v4, v6, invalid = collapse_blocklist([ip.ip for ip in high_risk_ips])
+        networks = v4 + v6
+        
         rules = {
-            'iptables': [],
-            'cisco_asa': [],
-            'windows_firewall': [],
-            'pfsense': []
+            'iptables': self._iptables_rules(v4, v6),
+            'cisco_asa': self._cisco_asa_rules(networks),
+            'windows_firewall': self._windows_firewall_rules(networks),
+            'pfsense': self._pfsense_rules(networks),
+            'ipset': self._ipset_payload(v4, v6),
+            'nftables': self._nftables_payload(v4, v6)
         }
         
-        for ip_obj in high_risk_ips:
-            ip = ip_obj.ip
-            
-            # iptables (Linux)
-            rules['iptables'].append(
-                f"iptables -A INPUT -s {ip} -j DROP  # Bloquear {ip} - {ip_obj.nivel_riesgo}"
-            )
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'total_ips': len(high_risk_ips),
+            'total_networks': len(networks),
+            'total_rules': len(rules['iptables']),
+            'invalid_ips': invalid,
+            'networks': {'v4': v4, 'v6': v6},
+            'rules': rules,
+            'apply_instructions': self._get_apply_instructions(v4, v6),
+            'rollback_script': self._generate_rollback_script(v4, v6),
+            'rollback': self._generate_platform_rollbacks(v4, v6)
+        }
+    
+    def generate_ruleset_diff(self, old: Dict, new: Dict) -> Dict:
+        """
+        Operaciones para pasar de un ruleset a otro en cada plataforma
+        
+        Solo se emiten los bloques añadidos y eliminados; las altas van antes
+        que las bajas para que un bloque que se fusiona en otro mayor no deje
+        un intervalo sin proteger. El rollback es la operación inversa.
+        
+        Args:
+            old: Ruleset de partida (listas 'v4' y 'v6' de bloques CIDR)
+            new: Ruleset de destino
             
-            # Cisco ASA
-            rules['cisco_asa'].append(
-                f"access-list OUTSIDE_IN deny ip host {ip} any  ! Bloquear {ip}"
+        Returns:
+            Dict con bloques añadidos/eliminados y operaciones por plataforma
+        """
+        old_blocks = set(old['v4']) | set(old['v6'])
+        new_blocks = set(new['v4']) | set(new['v6'])
+        added = [net for net in new['v4'] + new['v6'] if net not in old_blocks]
+        removed = [net for net in old['v4'] + old['v6'] if net not in new_blocks]
+        
+        return {
+            'from_version': old.get('version'),
+            'to_version': new.get('version'),
+            'added': added,
+            'removed': removed,
+            'total_operations': len(added) + len(removed),
+            'operations': self._delta_operations(added, removed, new.get('version')),
+            'rollback': self._delta_operations(removed, added, old.get('version'))
+        }
+    
+    @staticmethod
+    def _delta_operations(added: List[str], removed: List[str], label) -> Dict[str, List[str]]:
+        """Comandos por plataforma que añaden `added` y retiran `removed`"""
+        def family(net: str) -> str:
+            return '6' if ':' in net else ''
+        
+        operations = {
+            'iptables': [f"ip{family(n)}tables -A INPUT -s {n} -j DROP" for n in added]
+                        + [f"ip{family(n)}tables -D INPUT -s {n} -j DROP" for n in removed],
+            'ipset': [f"add {BLOCKLIST_SET}{family(n)} {n} -exist" for n in added]
+                     + [f"del {BLOCKLIST_SET}{family(n)} {n} -exist" for n in removed],
+            'nftables': [f"add element inet {NFT_TABLE} blocklist_v{family(n) or '4'} {{ {n} }}" for n in added]
+                        + [f"delete element inet {NFT_TABLE} blocklist_v{family(n) or '4'} {{ {n} }}" for n in removed],
+            'cisco_asa': [],
+            'pfsense': [],
+            'windows_firewall': []
+        }
+        
+        if added or removed:
+            operations['cisco_asa'] = (
+                [f"object-group network {ASA_OBJECT_GROUP}"]
+                + [f" {_asa_network_object(n)}" for n in added]
+                + [f" no {_asa_network_object(n)}" for n in removed]
             )
-            
-            # Windows Firewall (PowerShell)
-            rules['windows_firewall'].append(
-                f'New-NetFirewallRule -DisplayName "Block {ip}" -Direction Inbound -RemoteAddress {ip} -Action Block'
+        if added:
+            operations['pfsense'].append(f"pfctl -t {BLOCKLIST_SET} -T add {' '.join(added)}")
+        if removed:
+            operations['pfsense'].append(f"pfctl -t {BLOCKLIST_SET} -T delete {' '.join(removed)}")
+        
+        for i in range(0, len(added), WINDOWS_ADDRESSES_PER_RULE):
+            chunk = ','.join(added[i:i + WINDOWS_ADDRESSES_PER_RULE])
+            operations['windows_firewall'].append(
+                f'New-NetFirewallRule -DisplayName "Block IDS SCADA v{label}-{i // WINDOWS_ADDRESSES_PER_RULE + 1}" '
+                f'-Group "{WINDOWS_RULE_GROUP}" -Direction Inbound -RemoteAddress {chunk} -Action Block'
             )
-            
-            # pfSense (FreeBSD)
-            rules['pfsense'].append(
-                f"block in quick on wan from {ip} to any  # {ip_obj.nivel_riesgo}"
+        if removed:
+            # Windows muestra /32 como dirección simple y las redes IPv4 con máscara
+            forms = []
+            for net in removed:
+                address, prefix = net.split('/')
+                forms.append(net)
+                if prefix in ('32', '128'):
+                    forms.append(address)
+                elif ':' not in address:
+                    forms.append(f"{address}/{ipaddress.IPv4Network(net).netmask}")
+            quoted = ','.join(f"'{f}'" for f in forms)
+            operations['windows_firewall'].append(
+                f'$remove = @({quoted}); Get-NetFirewallRule -Group "{WINDOWS_RULE_GROUP}" | ForEach-Object {{ '
+                f'$keep = @(($_ | Get-NetFirewallAddressFilter).RemoteAddress | Where-Object {{ $_ -notin $remove }}); '
+                f'if ($keep.Count) {{ Set-NetFirewallRule -InputObject $_ -RemoteAddress $keep }} '
+                f'else {{ Remove-NetFirewallRule -InputObject $_ }} }}'
             )
         
-        return {
-            'generated_at': datetime.now().isoformat(),
-            'total_rules': len(high_risk_ips),
-            'rules': rules,
-            'apply_instructions': self._get_apply_instructions(),
-            'rollback_script': self._generate_rollback_script(high_risk_ips)
-        }
+        return operations
+    
+    @staticmethod
+    def _iptables_rules(v4: List, v6: List) -> List[str]:
+        rules = [f"iptables -A INPUT -s {net} -j DROP  # Bloquear {net}" for net in v4]
+        rules += [f"ip6tables -A INPUT -s {net} -j DROP  # Bloquear {net}" for net in v6]
+        return rules
+    
+    @staticmethod
+    def _cisco_asa_rules(networks: List) -> List[str]:
+        if not networks:
+            return []
+        rules = [f"object-group network {ASA_OBJECT_GROUP}"]
+        rules += [f" {_asa_network_object(net)}" for net in networks]
+        rules.append(f"access-list OUTSIDE_IN extended deny ip object-group {ASA_OBJECT_GROUP} any  ! Bloquear {len(networks)} redes")
+        return rules
+    
+    @staticmethod
+    def _windows_firewall_rules(networks: List) -> List[str]:
+        # Una regla por bloque de direcciones (RemoteAddress admite listas)
+        rules = []
+        for i in range(0, len(networks), WINDOWS_ADDRESSES_PER_RULE):
+            chunk = ','.join(str(net) for net in networks[i:i + WINDOWS_ADDRESSES_PER_RULE])
+            rules.append(
+                f'New-NetFirewallRule -DisplayName "Block IDS SCADA {i // WINDOWS_ADDRESSES_PER_RULE + 1}" '
+                f'-Group "{WINDOWS_RULE_GROUP}" -Direction Inbound -RemoteAddress {chunk} -Action Block'
+            )
+        return rules
+    
+    @staticmethod
+    def _pfsense_rules(networks: List) -> List[str]:
+        if not networks:
+            return []
+        rules = [f"table <{BLOCKLIST_SET}> persist {{"]
+        rules += [f"    {net}" for net in networks]
+        rules.append("}")
+        rules.append(f"block in quick on wan from <{BLOCKLIST_SET}> to any")
+        return rules
+    
+    @staticmethod
+    def _ipset_payload(v4: List, v6: List) -> List[str]:
+        """
+        Archivo para `ipset restore`: carga en un conjunto temporal y lo
+        intercambia de forma atómica con el activo
+        """
+        payload = []
+        for name, family, nets in ((BLOCKLIST_SET, 'inet', v4), (f"{BLOCKLIST_SET}6", 'inet6', v6)):
+            if not nets:
+                continue
+            options = f"hash:net family {family} hashsize {_hashsize(len(nets))} maxelem {max(65536, len(nets))}"
+            payload.append(f"create {name}-tmp {options}")
+            payload += [f"add {name}-tmp {net}" for net in nets]
+            payload.append(f"create {name} {options} -exist")
+            payload.append(f"swap {name}-tmp {name}")
+            payload.append(f"destroy {name}-tmp")
+        return payload
+    
+    @staticmethod
+    def _nftables_payload(v4: List, v6: List) -> List[str]:
+        """Archivo para `nft -f`: tabla propia con sets de intervalos"""
+        payload = [
+            f"add table inet {NFT_TABLE}",
+            f"delete table inet {NFT_TABLE}",
+            f"table inet {NFT_TABLE} {{"
+        ]
+        rules = []
+        for name, addr_type, match, nets in (
+            ('blocklist_v4', 'ipv4_addr', 'ip saddr', v4),
+            ('blocklist_v6', 'ipv6_addr', 'ip6 saddr', v6)
+        ):
+            payload += [f"    set {name} {{", f"        type {addr_type}", "        flags interval"]
+            if nets:
+                rows = [', '.join(str(net) for net in nets[i:i + 16]) for i in range(0, len(nets), 16)]
+                payload.append("        elements = {")
+                payload += [f"            {row}," for row in rows[:-1]] + [f"            {rows[-1]}", "        }"]
+            payload.append("    }")
+            rules.append(f"        {match} @{name} drop")
+        payload += [
+            "    chain input {",
+            "        type filter hook input priority filter; policy accept;",
+            *rules,
+            "    }",
+            "}"
+        ]
+        return payload
     
     def generate_fail2ban_config(self, ips: List[SuspiciousIP]) -> str:
         """Genera configuración de Fail2Ban"""
@@ -260,8 +507,15 @@ sender = fail2ban@scada-plant.com
         
         return scenario
     
-    def _get_apply_instructions(self) -> Dict:
+    def _get_apply_instructions(self, v4: List, v6: List) -> Dict:
         """Instrucciones para aplicar reglas"""
+        # Cada conjunto cargado necesita su regla de coincidencia en la familia correspondiente
+        ipset_apply = [f'ipset restore < {BLOCKLIST_SET}.ipset']
+        for name, tool, nets in ((BLOCKLIST_SET, 'iptables', v4), (f"{BLOCKLIST_SET}6", 'ip6tables', v6)):
+            if nets:
+                match = f'INPUT -m set --match-set {name} src -j DROP'
+                ipset_apply.append(f'({tool} -C {match} 2>/dev/null || {tool} -I {match})')
+        
         return {
             'iptables': {
                 'apply': 'Ejecutar comandos en terminal con sudo',
@@ -276,19 +530,52 @@ sender = fail2ban@scada-plant.com
             'windows_firewall': {
                 'apply': 'Ejecutar en PowerShell como Administrador',
                 'persist': 'Las reglas persisten automáticamente',
-                'verify': 'Get-NetFirewallRule | Where-Object {$_.DisplayName -like "Block*"}'
+                'verify': f'Get-NetFirewallRule -Group "{WINDOWS_RULE_GROUP}"'
+            },
+            'pfsense': {
+                'apply': 'Agregar a /etc/pf.conf y ejecutar: pfctl -f /etc/pf.conf',
+                'persist': 'La tabla persiste en pf.conf',
+                'verify': f'pfctl -t {BLOCKLIST_SET} -T show'
+            },
+            'ipset': {
+                'apply': ' && '.join(ipset_apply),
+                'persist': 'ipset save > /etc/ipset.conf (cargar antes de iptables/ip6tables al arrancar)',
+                'verify': f'ipset list {BLOCKLIST_SET} -terse'
+            },
+            'nftables': {
+                'apply': f'nft -f {NFT_TABLE}.nft',
+                'persist': f'Incluir {NFT_TABLE}.nft desde /etc/nftables.conf',
+                'verify': f'nft list set inet {NFT_TABLE} blocklist_v4'
             }
         }
     
-    def _generate_rollback_script(self, ips: List[SuspiciousIP]) -> List[str]:
-        """Genera script para revertir cambios"""
-        rollback = []
-        for ip_obj in ips:
-            ip = ip_obj.ip
-            rollback.append(f"iptables -D INPUT -s {ip} -j DROP")
+    def _generate_rollback_script(self, v4: List, v6: List) -> List[str]:
+        """Genera script para revertir cambios (reglas iptables)"""
+        rollback = [f"iptables -D INPUT -s {net} -j DROP" for net in v4]
+        rollback += [f"ip6tables -D INPUT -s {net} -j DROP" for net in v6]
         rollback.append("echo 'Rollback completado'")
         return rollback
     
+    def _generate_platform_rollbacks(self, v4: List, v6: List) -> Dict[str, List[str]]:
+        """Scripts para revertir las reglas de cada plataforma"""
+        ipset_rollback = []
+        for name, tool, nets in ((BLOCKLIST_SET, 'iptables', v4), (f"{BLOCKLIST_SET}6", 'ip6tables', v6)):
+            if nets:
+                ipset_rollback.append(f"{tool} -D INPUT -m set --match-set {name} src -j DROP")
+                ipset_rollback.append(f"ipset destroy {name}")
+        
+        return {
+            'iptables': self._generate_rollback_script(v4, v6),
+            'cisco_asa': [
+                f"no access-list OUTSIDE_IN extended deny ip object-group {ASA_OBJECT_GROUP} any",
+                f"no object-group network {ASA_OBJECT_GROUP}"
+            ] if v4 or v6 else [],
+            'windows_firewall': [f'Remove-NetFirewallRule -Group "{WINDOWS_RULE_GROUP}"'] if v4 or v6 else [],
+            'pfsense': [f"pfctl -t {BLOCKLIST_SET} -T kill"] if v4 or v6 else [],
+            'ipset': ipset_rollback,
+            'nftables': [f"nft delete table inet {NFT_TABLE}"]
+        }
+    
     def _parse_duration(self, duration_str: str) -> int:
         """Parse duration string to minutes"""
         try:
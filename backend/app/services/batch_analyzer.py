@@ -0,0 +1,175 @@
+"""
+Análisis completo de uno o varios datasets (en paralelo sobre un pool de procesos)
+"""
+import asyncio
+from typing import List, Dict, Optional
+from ..core.config import settings
+from ..utils.workers import get_process_pool
+
+
+def analyze_dataset(dataset_id: str) -> Optional[Dict]:
+    """
+    Ejecuta el pipeline completo de análisis sobre un dataset registrado
+    
+    Se ejecuta tanto en el hilo de la petición como dentro de los procesos
+    worker, por lo que solo recibe y devuelve objetos serializables.
+    
+    Args:
+        dataset_id: ID del dataset a analizar
+    
+    Returns:
+        Resultado del análisis o None si el dataset no existe
+    
+    Raises:
+        ValueError: Si el dataset está vacío
+    """
+    from .dataset_manager import dataset_manager
+    from .data_analyzer import DataAnalyzer
+    from .threat_detector import ThreatDetector
+    from .professional_recommender import professional_recommender
+    
+    df = dataset_manager.get_dataset(dataset_id)
+    
+    if df is None:
+        return None
+    
+    if df.empty:
+        raise ValueError("Dataset vacío")
+    
+    # Ejecutar análisis
+    analyzer = DataAnalyzer(df)
+    detector = ThreatDetector(df)
+    
+    ips_sospechosas = analyzer.get_suspicious_ips()
+    distribucion = analyzer.get_attack_distribution()
+    timeline = analyzer.get_timeline_data()
+    puertos = analyzer.get_port_analysis()
+    patrones = analyzer.get_attack_patterns()
+    alert_summary = detector.get_alert_summary()
+    
+    # Detectar si hay ataques SCADA
+    scada_targeted = any(
+        ip.nivel_riesgo in ['Alto', 'Crítico'] and
+        any(p in settings.SCADA_CRITICAL_PORTS for p in ip.puertos_afectados)
+        for ip in ips_sospechosas
+    )
+    
+    # Generar recomendaciones profesionales
+    recommendations = professional_recommender.generate_recommendations(
+        ips_sospechosas=ips_sospechosas,
+        attack_distribution=distribucion,
+        scada_targeted=scada_targeted
+    )
+    
+    return {
+        'dataset_id': dataset_id,
+        'total_logs': len(df),
+        'periodo_analizado': {
+            'inicio': df['timestamp'].min().isoformat(),
+            'fin': df['timestamp'].max().isoformat()
+        },
+        'ips_sospechosas': [ip.dict() for ip in ips_sospechosas],
+        'distribucion_ataques': distribucion,
+        'ataques_por_hora': {
+            item.timestamp: item.count
+            for item in timeline
+        },
+        'puertos_mas_atacados': [p.dict() for p in puertos],
+        'patrones_detectados': [p.dict() for p in patrones],
+        'alert_summary': alert_summary.dict(),
+        'professional_recommendations': [r.dict() for r in recommendations],
+        'scada_targeted': scada_targeted
+    }
+
+
+def _safe_analyze(dataset_id: str) -> Dict:
+    """Envuelve analyze_dataset para que los errores viajen como datos"""
+    try:
+        result = analyze_dataset(dataset_id)
+    except Exception as e:
+        return {'dataset_id': dataset_id, 'error': str(e)}
+    
+    if result is None:
+        return {'dataset_id': dataset_id, 'error': 'Dataset no encontrado'}
+    return result
+
+
+def merge_results(results: List[Dict]) -> Dict:
+    """
+    Combina y compara los análisis de varios datasets
+    
+    Args:
+        results: Resultados exitosos de analyze_dataset
+    
+    Returns:
+        Totales combinados, ranking por sitio y atacantes compartidos
+    """
+    distribucion: Dict[str, int] = {}
+    ip_sites: Dict[str, List[str]] = {}
+    ip_attacks: Dict[str, int] = {}
+    
+    for result in results:
+        for attack, count in result['distribucion_ataques'].items():
+            distribucion[attack] = distribucion.get(attack, 0) + count
+        
+        for ip in result['ips_sospechosas']:
+            ip_sites.setdefault(ip['ip'], []).append(result['dataset_id'])
+            ip_attacks[ip['ip']] = ip_attacks.get(ip['ip'], 0) + ip['total_ataques']
+    
+    # IPs sospechosas en más de un dataset (posible campaña entre plantas)
+    shared_attackers = sorted(
+        (
+            {'ip': ip, 'datasets': sites, 'total_ataques': ip_attacks[ip]}
+            for ip, sites in ip_sites.items() if len(sites) > 1
+        ),
+        key=lambda x: (len(x['datasets']), x['total_ataques']),
+        reverse=True
+    )
+    
+    ranking = sorted(
+        (
+            {
+                'dataset_id': r['dataset_id'],
+                'total_logs': r['total_logs'],
+                'ips_sospechosas': len(r['ips_sospechosas']),
+                'alertas_criticas': r['alert_summary']['alertas_criticas'],
+                'scada_targeted': r['scada_targeted'],
+                'top_attacker': r['ips_sospechosas'][0]['ip'] if r['ips_sospechosas'] else None
+            }
+            for r in results
+        ),
+        key=lambda x: (x['scada_targeted'], x['alertas_criticas'], x['total_logs']),
+        reverse=True
+    )
+    
+    return {
+        'total_logs': sum(r['total_logs'] for r in results),
+        'distribucion_ataques': dict(sorted(distribucion.items(), key=lambda x: x[1], reverse=True)),
+        'datasets_scada_targeted': [r['dataset_id'] for r in results if r['scada_targeted']],
+        'ranking': ranking,
+        'shared_attackers': shared_attackers
+    }
+
+
+async def analyze_datasets_parallel(dataset_ids: List[str]) -> Dict:
+    """
+    Analiza varios datasets concurrentemente en el pool de procesos
+    
+    Args:
+        dataset_ids: IDs de los datasets a analizar
+    
+    Returns:
+        Resultados por dataset, errores y resultado combinado
+    """
+    pool = get_process_pool()
+    futures = [asyncio.wrap_future(pool.submit(_safe_analyze, dataset_id)) for dataset_id in dataset_ids]
+    outcomes = await asyncio.gather(*futures)
+    
+    results = [o for o in outcomes if 'error' not in o]
+    errors = [o for o in outcomes if 'error' in o]
+    
+    return {
+        'results': results,
+        'errors': errors,
+        'merged': merge_results(results)
+    }
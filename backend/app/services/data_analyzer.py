@@ -12,7 +12,10 @@ from ..api.models.schemas import (
     TimelineData
 )
 from ..core.config import settings
-from ..utils.helpers import get_scada_port_info, calculate_trend
+from ..core.metrics import ROWS_PROCESSED
+from ..core.tracing import traced
+from ..utils.helpers import calculate_trend
+from ..utils.classification import is_scada_port, port_services
 
 
 class DataAnalyzer:
@@ -26,7 +29,9 @@ class DataAnalyzer:
             df: DataFrame de pandas con los logs de IDS
         """
         self.df = df
+        ROWS_PROCESSED.inc(len(df), service='data_analyzer')
         
+    @traced()
     def get_suspicious_ips(self, threshold: int = None) -> List[SuspiciousIP]:
         """
         Identifica IPs sospechosas basándose en frecuencia de ataques
@@ -67,7 +72,7 @@ class DataAnalyzer:
                 riesgo = RiskLevel.LOW
             
             # Generar recomendaciones específicas
-            recomendaciones = self._generate_recommendations(
+            recomendaciones = self.generate_ip_recommendations(
                 row['alerta_tipos'],
                 row['puerto_puertos']
             )
@@ -85,6 +90,7 @@ class DataAnalyzer:
         # Ordenar por total de ataques descendente
         return sorted(resultados, key=lambda x: x.total_ataques, reverse=True)
     
+    @traced()
     def get_attack_distribution(self) -> Dict[str, int]:
         """
         Obtiene la distribución de tipos de ataques
@@ -94,6 +100,7 @@ class DataAnalyzer:
         """
         return self.df['alerta'].value_counts().to_dict()
     
+    @traced()
     def get_timeline_data(self, interval: str = 'H') -> List[TimelineData]:
         """
         Genera datos de timeline de ataques
@@ -123,6 +130,7 @@ class DataAnalyzer:
         
         return sorted(timeline, key=lambda x: x.timestamp)
     
+    @traced()
     def get_port_analysis(self, top_n: int = 10) -> List[PortAnalysis]:
         """
         Analiza los puertos más atacados
@@ -145,21 +153,24 @@ class DataAnalyzer:
         port_data.columns = ['puerto', 'ips_origen', 'protocolos', 'total_intentos']
         port_data = port_data.nlargest(top_n, 'total_intentos')
         
+        # Metadatos de todos los puertos en una sola consulta a la tabla
+        es_scada = is_scada_port(port_data['puerto'])
+        servicios = port_services(port_data['puerto'])
+        
         resultados = []
-        for _, row in port_data.iterrows():
-            port_info = get_scada_port_info(row['puerto'])
-            
+        for i, row in enumerate(port_data.itertuples(index=False)):
             resultados.append(PortAnalysis(
-                puerto=row['puerto'],
-                total_intentos=int(row['total_intentos']),
-                ips_origen=row['ips_origen'][:5],  # Limitar a 5 IPs
-                protocolos=row['protocolos'],
-                es_scada_critico=port_info['es_scada'],
-                descripcion_servicio=port_info['servicio']
+                puerto=row.puerto,
+                total_intentos=int(row.total_intentos),
+                ips_origen=row.ips_origen[:5],  # Limitar a 5 IPs
+                protocolos=row.protocolos,
+                es_scada_critico=bool(es_scada[i]),
+                descripcion_servicio=servicios[i]
             ))
         
         return resultados
     
+    @traced()
     def get_attack_patterns(self) -> List[AttackPattern]:
         """
         Detecta patrones de ataque en los datos
@@ -181,28 +192,38 @@ class DataAnalyzer:
             hourly = group.groupby(group['timestamp'].dt.hour).size()
             hora_pico = hourly.idxmax()
             
-            # Clasificar severidad
-            if porcentaje > 40:
-                severidad = RiskLevel.CRITICAL
-            elif porcentaje > 25:
-                severidad = RiskLevel.HIGH
-            elif porcentaje > 15:
-                severidad = RiskLevel.MEDIUM
-            else:
-                severidad = RiskLevel.LOW
-            
             patterns.append(AttackPattern(
                 tipo_ataque=tipo_ataque,
                 frecuencia=frecuencia,
                 porcentaje=round(porcentaje, 2),
                 ips_involucradas=group['ip_origen'].unique().tolist()[:10],
                 horario_pico=f"{hora_pico}:00 - {hora_pico+1}:00",
-                severidad=severidad
+                severidad=self.classify_pattern_severity(porcentaje)
             ))
         
         return sorted(patterns, key=lambda x: x.frecuencia, reverse=True)
     
-    def _generate_recommendations(self, tipos_ataques: List[str], puertos: List[int]) -> List[str]:
+    @staticmethod
+    def classify_pattern_severity(porcentaje: float) -> RiskLevel:
+        """
+        Clasifica la severidad de un patrón según su porcentaje del total
+        
+        Args:
+            porcentaje: Porcentaje de eventos del tipo de ataque
+            
+        Returns:
+            Nivel de severidad
+        """
+        if porcentaje > 40:
+            return RiskLevel.CRITICAL
+        elif porcentaje > 25:
+            return RiskLevel.HIGH
+        elif porcentaje > 15:
+            return RiskLevel.MEDIUM
+        return RiskLevel.LOW
+    
+    @staticmethod
+    def generate_ip_recommendations(tipos_ataques: List[str], puertos: List[int]) -> List[str]:
         """
         Genera recomendaciones específicas basadas en el análisis
         
@@ -228,7 +249,7 @@ class DataAnalyzer:
             recommendations.append("Implementar rate limiting en firewall")
         
         # Recomendaciones específicas SCADA
-        scada_ports = [p for p in puertos if get_scada_port_info(p)['es_scada']]
+        scada_ports = [p for p, scada in zip(puertos, is_scada_port(list(puertos))) if scada] if len(puertos) else []
         if scada_ports:
             recommendations.append(f"⚠️ CRÍTICO: Puertos SCADA comprometidos ({scada_ports})")
             recommendations.append("Segregar red SCADA en VLAN aislada sin acceso a Internet")
@@ -2,11 +2,25 @@
 Gestor de múltiples datasets
 """
 import pandas as pd
+import io
 import os
 import json
+import threading
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Callable
 from ..core.config import settings
+from ..core.metrics import CACHE_HITS, CACHE_MISSES
+from ..utils.storage import file_lock, atomic_write_json
+from .dataset_summary import summary_store, merge_summaries, public_summary
+from .snapshot_store import snapshot_store
+from .report_jobs import report_jobs
+from .materialized_views import materialized_views
+from .event_index import event_indexes
+from .sql_engine import sql_engine
+from ..utils.data_loader import data_loader
+
+
+REQUIRED_COLUMNS = ['timestamp', 'ip_origen', 'ip_destino', 'puerto', 'protocolo', 'alerta']
 
 
 class DatasetManager:
@@ -15,19 +29,73 @@ class DatasetManager:
     def __init__(self):
         self.metadata_file = os.path.join(settings.UPLOAD_PATH, 'datasets_metadata.json')
         self.current_dataset = None
+        # Catálogo indexado por id (mantiene el orden de registro)
+        self._catalog: Dict[str, Dict] = {}
+        self._catalog_stamp = None
+        self._catalog_lock = threading.RLock()
         self.load_metadata()
     
+    def _file_stamp(self) -> Optional[tuple]:
+        """Firma (mtime, tamaño) del archivo de metadata"""
+        try:
+            stat = os.stat(self.metadata_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _refresh_catalog(self, force: bool = False) -> None:
+        """Recarga el catálogo solo si el archivo cambió (p. ej. otro worker escribió)"""
+        stamp = self._file_stamp()
+        with self._catalog_lock:
+            if not force and stamp == self._catalog_stamp:
+                CACHE_HITS.inc(cache='dataset_catalog')
+                return
+            
+            if not force:
+                CACHE_MISSES.inc(cache='dataset_catalog')
+            
+            metadata = []
+            if stamp is not None:
+                with open(self.metadata_file, 'r') as f:
+                    metadata = json.load(f)
+            
+            self._catalog = {d['id']: d for d in metadata}
+            self._catalog_stamp = stamp
+    
+    def _update_catalog(self, mutator: Callable[[Dict[str, Dict]], None]) -> None:
+        """
+        Aplica una modificación al catálogo de forma segura entre procesos
+        
+        Args:
+            mutator: Función que modifica el dict del catálogo in-place
+        """
+        with file_lock(self.metadata_file):
+            with self._catalog_lock:
+                # Releer bajo lock para no perder escrituras de otros workers
+                self._refresh_catalog(force=True)
+                catalog = dict(self._catalog)
+                mutator(catalog)
+                atomic_write_json(self.metadata_file, list(catalog.values()))
+                self._catalog = catalog
+                self._catalog_stamp = self._file_stamp()
+    
     def load_metadata(self) -> List[Dict]:
         """Carga metadata de datasets disponibles"""
-        if os.path.exists(self.metadata_file):
-            with open(self.metadata_file, 'r') as f:
-                return json.load(f)
-        return []
+        self._refresh_catalog()
+        return list(self._catalog.values())
     
     def save_metadata(self, metadata: List[Dict]):
         """Guarda metadata de datasets"""
-        with open(self.metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        def replace(catalog: Dict[str, Dict]) -> None:
+            catalog.clear()
+            catalog.update({d['id']: d for d in metadata})
+        
+        self._update_catalog(replace)
+    
+    def get_metadata(self, dataset_id: str) -> Optional[Dict]:
+        """Obtiene la metadata de un dataset por id (búsqueda O(1))"""
+        self._refresh_catalog()
+        return self._catalog.get(dataset_id)
     
     def add_dataset(
         self, 
@@ -39,8 +107,7 @@ class DatasetManager:
         df = pd.read_csv(os.path.join(settings.UPLOAD_PATH, filename))
         
         # Validar columnas requeridas
-        required_cols = ['timestamp', 'ip_origen', 'ip_destino', 'puerto', 'protocolo', 'alerta']
-        if not all(col in df.columns or col.lower() in [c.lower() for c in df.columns] for col in required_cols):
+        if not all(col in df.columns or col.lower() in [c.lower() for c in df.columns] for col in REQUIRED_COLUMNS):
             # Intentar mapear columnas comunes
             df = self._normalize_columns(df)
         
@@ -65,21 +132,94 @@ class DatasetManager:
             'status': 'active'
         }
         
+        # Resumen precalculado (sidecar) para comparaciones sin releer el CSV
+        summary_store.write(dataset_info['id'], df, os.path.join(settings.UPLOAD_PATH, filename))
+        
         # Guardar metadata
-        metadata = self.load_metadata()
-        metadata.append(dataset_info)
-        self.save_metadata(metadata)
+        self._update_catalog(lambda catalog: catalog.__setitem__(dataset_info['id'], dataset_info))
+        
+        # Vistas materializadas: un único cálculo completo al registrar
+        materialized_views.refresh(dataset_info['id'])
         
         return dataset_info
     
+    def append_rows(self, dataset_id: str, content: bytes) -> Optional[Dict]:
+        """
+        Añade eventos al final de un dataset existente
+        
+        Las vistas materializadas se actualizan solo con las filas nuevas; los
+        snapshots y el dataset en memoria compartida cambian de versión solos.
+        
+        Args:
+            dataset_id: ID del dataset
+            content: CSV (con cabecera) con las filas a añadir
+        
+        Returns:
+            Metadata actualizada o None si el dataset no existe
+        """
+        dataset_meta = self.get_metadata(dataset_id)
+        if not dataset_meta:
+            return None
+        
+        filepath = os.path.join(settings.UPLOAD_PATH, dataset_meta['filename'])
+        if not os.path.exists(filepath):
+            return None
+        
+        delta = self._normalize_columns(pd.read_csv(io.BytesIO(content)))
+        missing = [col for col in REQUIRED_COLUMNS if col not in delta.columns]
+        if missing:
+            raise ValueError(f"Columnas requeridas faltantes: {', '.join(missing)}")
+        delta['timestamp'] = pd.to_datetime(delta['timestamp'])
+        
+        with file_lock(filepath):
+            previous_version = data_loader.get_dataset_version(dataset_id)
+            
+            # Respetar el orden y los nombres de columnas del CSV existente
+            header = pd.read_csv(filepath, nrows=0).columns
+            rows = delta.reindex(columns=self._normalize_columns(pd.DataFrame(columns=header)).columns)
+            rows.columns = header
+            
+            with open(filepath, 'rb+') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        f.write(b'\n')
+            rows.to_csv(filepath, mode='a', header=False, index=False)
+            
+            materialized_views.append(dataset_id, delta, previous_version)
+        
+        # El resumen (sidecar) se regenera al siguiente acceso
+        summary_store.delete(dataset_id)
+        
+        ip_stats = materialized_views.get('ip_stats', dataset_id)
+        target_stats = materialized_views.get('target_stats', dataset_id)
+        overview = materialized_views.get('overview', dataset_id)
+        
+        def update(catalog: Dict[str, Dict]) -> None:
+            meta = catalog.get(dataset_id)
+            if meta is None:
+                return
+            meta['records'] = overview['total']
+            meta['date_range'] = {
+                'start': overview['ts_min'].isoformat(),
+                'end': overview['ts_max'].isoformat()
+            }
+            meta['unique_ips_origen'] = len(ip_stats)
+            meta['unique_ips_destino'] = len(target_stats)
+            meta['attack_types'] = materialized_views.get('attack_distribution', dataset_id)
+            meta['updated_at'] = datetime.now().isoformat()
+        
+        self._update_catalog(update)
+        return self.get_metadata(dataset_id)
+    
     def list_datasets(self) -> List[Dict]:
         """Lista todos los datasets disponibles"""
         return self.load_metadata()
     
     def get_dataset(self, dataset_id: str) -> Optional[pd.DataFrame]:
         """Carga un dataset específico"""
-        metadata = self.load_metadata()
-        dataset_meta = next((d for d in metadata if d['id'] == dataset_id), None)
+        dataset_meta = self.get_metadata(dataset_id)
         
         if not dataset_meta:
             return None
@@ -96,8 +236,7 @@ class DatasetManager:
     
     def delete_dataset(self, dataset_id: str) -> bool:
         """Elimina un dataset"""
-        metadata = self.load_metadata()
-        dataset_meta = next((d for d in metadata if d['id'] == dataset_id), None)
+        dataset_meta = self.get_metadata(dataset_id)
         
         if not dataset_meta:
             return False
@@ -107,43 +246,109 @@ class DatasetManager:
         if os.path.exists(filepath):
             os.remove(filepath)
         
+        summary_store.delete(dataset_id)
+        snapshot_store.invalidate(dataset_id)
+        report_jobs.invalidate(dataset_id)
+        materialized_views.drop(dataset_id)
+        event_indexes.drop(dataset_id)
+        sql_engine.drop(dataset_id)
+        
         # Actualizar metadata
-        metadata = [d for d in metadata if d['id'] != dataset_id]
-        self.save_metadata(metadata)
+        self._update_catalog(lambda catalog: catalog.pop(dataset_id, None))
         
         return True
     
+    def get_summary(self, dataset_id: str) -> Optional[Dict]:
+        """
+        Obtiene el resumen precalculado de un dataset
+        
+        Los datasets registrados antes de existir los sidecars se resumen
+        una única vez al primer acceso y el resultado queda persistido.
+        """
+        dataset_meta = self.get_metadata(dataset_id)
+        if not dataset_meta:
+            return None
+        
+        filepath = os.path.join(settings.UPLOAD_PATH, dataset_meta['filename'])
+        summary = summary_store.read(dataset_id, filepath)
+        if summary is not None:
+            return summary
+        
+        df = self.get_dataset(dataset_id)
+        if df is None:
+            return None
+        return summary_store.write(dataset_id, df, filepath)
+    
     def compare_datasets(self, dataset_id1: str, dataset_id2: str) -> Dict:
         """Compara dos datasets"""
-        df1 = self.get_dataset(dataset_id1)
-        df2 = self.get_dataset(dataset_id2)
+        s1 = self.get_summary(dataset_id1)
+        s2 = self.get_summary(dataset_id2)
         
-        if df1 is None or df2 is None:
+        if s1 is None or s2 is None:
             return {}
         
         comparison = {
             'dataset1': {
                 'id': dataset_id1,
-                'records': len(df1),
-                'unique_attackers': df1['ip_origen'].nunique(),
-                'attack_types': df1['alerta'].value_counts().to_dict()
+                'records': s1['records'],
+                'unique_attackers': s1['unique_attackers'],
+                'attack_types': s1['alert_counts']
             },
             'dataset2': {
                 'id': dataset_id2,
-                'records': len(df2),
-                'unique_attackers': df2['ip_origen'].nunique(),
-                'attack_types': df2['alerta'].value_counts().to_dict()
+                'records': s2['records'],
+                'unique_attackers': s2['unique_attackers'],
+                'attack_types': s2['alert_counts']
             },
             'differences': {
-                'records_delta': len(df2) - len(df1),
-                'attackers_delta': df2['ip_origen'].nunique() - df1['ip_origen'].nunique(),
-                'new_attack_types': list(set(df2['alerta'].unique()) - set(df1['alerta'].unique())),
-                'trend': 'increasing' if len(df2) > len(df1) else 'decreasing' if len(df2) < len(df1) else 'stable'
+                'records_delta': s2['records'] - s1['records'],
+                'attackers_delta': s2['unique_attackers'] - s1['unique_attackers'],
+                'new_attack_types': list(set(s2['alert_counts']) - set(s1['alert_counts'])),
+                'trend': 'increasing' if s2['records'] > s1['records'] else 'decreasing' if s2['records'] < s1['records'] else 'stable'
             }
         }
         
         return comparison
     
+    def compare_many(self, dataset_ids: List[str]) -> Dict:
+        """
+        Comparación N-way entre datasets usando solo los sidecars
+        
+        Args:
+            dataset_ids: IDs de los datasets a comparar
+            
+        Returns:
+            Resumen por dataset, agregado combinado y diferencias de vectores
+        """
+        summaries = []
+        for dataset_id in dataset_ids:
+            summary = self.get_summary(dataset_id)
+            if summary is None:
+                return {}
+            summaries.append(summary)
+        
+        all_types = set().union(*(s['alert_counts'] for s in summaries))
+        
+        return {
+            'datasets': [
+                {
+                    'id': s['dataset_id'],
+                    'records': s['records'],
+                    'unique_attackers': s['unique_attackers'],
+                    'date_range': s['date_range'],
+                    'attack_types': s['alert_counts'],
+                    'top_talkers': s['top_talkers'][:5],
+                    'exclusive_attack_types': sorted(
+                        set(s['alert_counts']) - set().union(*(o['alert_counts'] for o in summaries if o is not s))
+                    )
+                }
+                for s in summaries
+            ],
+            'combined': public_summary(merge_summaries(summaries)),
+            'common_attack_types': sorted(set.intersection(*(set(s['alert_counts']) for s in summaries))),
+            'all_attack_types': sorted(all_types)
+        }
+    
     def _normalize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """Normaliza nombres de columnas comunes"""
         column_mapping = {
@@ -0,0 +1,275 @@
+"""
+Resúmenes precalculados de datasets (sidecars) con agregados combinables
+"""
+import os
+import json
+import base64
+import threading
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Optional, Iterable
+from ..core.config import settings
+from ..core.metrics import CACHE_HITS, CACHE_MISSES
+from ..utils.storage import atomic_write_json
+
+
+SUMMARY_SCHEMA_VERSION = 1
+TOP_TALKERS_SIZE = 50
+
+
+class HyperLogLog:
+    """Sketch HyperLogLog para estimar atacantes distintos de forma combinable"""
+    
+    def __init__(self, p: int = 12, registers: np.ndarray = None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = registers if registers is not None else np.zeros(self.m, dtype=np.uint8)
+    
+    @classmethod
+    def from_values(cls, values: Iterable, p: int = 12) -> 'HyperLogLog':
+        """Construye un sketch a partir de una colección de valores"""
+        sketch = cls(p)
+        sketch.add_values(values)
+        return sketch
+    
+    def add_values(self, values: Iterable) -> None:
+        """Agrega valores al sketch (vectorizado)"""
+        series = pd.Series(list(values), dtype=object).astype(str).drop_duplicates()
+        if series.empty:
+            return
+        
+        hashes = pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        
+        # bit_length exacto sobre uint64 mediante búsqueda binaria de desplazamientos
+        bit_length = np.zeros(len(rest), dtype=np.int64)
+        remaining = rest.copy()
+        for shift in (32, 16, 8, 4, 2, 1):
+            mask = remaining >= np.uint64(1 << shift)
+            bit_length[mask] += shift
+            remaining[mask] >>= np.uint64(shift)
+        bit_length += (remaining > 0).astype(np.int64)
+        
+        ranks = ((64 - self.p) - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, ranks)
+    
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Unión de dos sketches (máximo por registro)"""
+        if other.p != self.p:
+            raise ValueError("No se pueden combinar sketches con distinta precisión")
+        return HyperLogLog(self.p, np.maximum(self.registers, other.registers))
+    
+    def count(self) -> int:
+        """Estimación de cardinalidad"""
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m ** 2 / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        
+        # Corrección de rango pequeño (linear counting)
+        if estimate <= 2.5 * self.m and zeros > 0:
+            estimate = self.m * np.log(self.m / zeros)
+        
+        return int(round(estimate))
+    
+    def to_dict(self) -> Dict:
+        """Serializa el sketch para JSON"""
+        return {
+            'p': self.p,
+            'registers': base64.b64encode(self.registers.tobytes()).decode('ascii')
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'HyperLogLog':
+        """Reconstruye un sketch serializado"""
+        registers = np.frombuffer(base64.b64decode(data['registers']), dtype=np.uint8).copy()
+        return cls(data['p'], registers)
+
+
+def build_summary(dataset_id: str, df: pd.DataFrame, source_size: int = None) -> Dict:
+    """
+    Calcula el resumen de un dataset normalizado
+    
+    Args:
+        dataset_id: ID del dataset
+        df: DataFrame con columnas normalizadas
+        source_size: Tamaño en bytes del CSV de origen
+    
+    Returns:
+        Dict serializable con agregados combinables
+    """
+    summary = {
+        'schema_version': SUMMARY_SCHEMA_VERSION,
+        'dataset_id': dataset_id,
+        'source_size': source_size,
+        'records': int(len(df)),
+        'date_range': None,
+        'alert_counts': {},
+        'port_counts': {},
+        'protocol_counts': {},
+        'unique_attackers': 0,
+        'unique_targets': 0,
+        'attacker_sketch': HyperLogLog().to_dict(),
+        'hourly_histogram': {},
+        'hour_of_day': [0] * 24,
+        'top_talkers': []
+    }
+    
+    if df.empty:
+        return summary
+    
+    src_counts = df['ip_origen'].value_counts()
+    hourly = df.groupby(df['timestamp'].dt.floor('h')).size()
+    hour_of_day = df['timestamp'].dt.hour.value_counts()
+    
+    summary.update({
+        'date_range': {
+            'start': df['timestamp'].min().isoformat(),
+            'end': df['timestamp'].max().isoformat()
+        },
+        'alert_counts': {str(k): int(v) for k, v in df['alerta'].value_counts().items()},
+        'port_counts': {str(int(k)): int(v) for k, v in df['puerto'].value_counts().items()},
+        'protocol_counts': {str(k): int(v) for k, v in df['protocolo'].value_counts().items()},
+        'unique_attackers': int(len(src_counts)),
+        'unique_targets': int(df['ip_destino'].nunique()),
+        'attacker_sketch': HyperLogLog.from_values(src_counts.index.to_series()).to_dict(),
+        'hourly_histogram': {ts.isoformat(): int(v) for ts, v in hourly.items()},
+        'hour_of_day': [int(hour_of_day.get(h, 0)) for h in range(24)],
+        'top_talkers': [
+            {'ip': str(ip), 'count': int(count)}
+            for ip, count in src_counts.head(TOP_TALKERS_SIZE).items()
+        ]
+    })
+    
+    return summary
+
+
+def merge_summaries(summaries: List[Dict]) -> Dict:
+    """
+    Combina varios resúmenes en uno solo sin releer los datos
+    
+    Args:
+        summaries: Lista de resúmenes generados por build_summary
+    
+    Returns:
+        Resumen agregado (atacantes únicos estimados con HyperLogLog)
+    """
+    def add_counts(target: Dict, source: Dict) -> None:
+        for key, value in source.items():
+            target[key] = target.get(key, 0) + value
+    
+    merged = {
+        'datasets': [s['dataset_id'] for s in summaries],
+        'records': 0,
+        'date_range': None,
+        'alert_counts': {},
+        'port_counts': {},
+        'protocol_counts': {},
+        'hourly_histogram': {},
+        'hour_of_day': [0] * 24,
+        'top_talkers': []
+    }
+    sketch = HyperLogLog()
+    talkers: Dict[str, int] = {}
+    
+    for summary in summaries:
+        merged['records'] += summary['records']
+        add_counts(merged['alert_counts'], summary['alert_counts'])
+        add_counts(merged['port_counts'], summary['port_counts'])
+        add_counts(merged['protocol_counts'], summary['protocol_counts'])
+        add_counts(merged['hourly_histogram'], summary['hourly_histogram'])
+        merged['hour_of_day'] = [a + b for a, b in zip(merged['hour_of_day'], summary['hour_of_day'])]
+        add_counts(talkers, {t['ip']: t['count'] for t in summary['top_talkers']})
+        sketch = sketch.merge(HyperLogLog.from_dict(summary['attacker_sketch']))
+        
+        if summary['date_range']:
+            if merged['date_range'] is None:
+                merged['date_range'] = dict(summary['date_range'])
+            else:
+                merged['date_range']['start'] = min(merged['date_range']['start'], summary['date_range']['start'])
+                merged['date_range']['end'] = max(merged['date_range']['end'], summary['date_range']['end'])
+    
+    merged['alert_counts'] = dict(sorted(merged['alert_counts'].items(), key=lambda x: x[1], reverse=True))
+    merged['hourly_histogram'] = dict(sorted(merged['hourly_histogram'].items()))
+    merged['unique_attackers_estimate'] = sketch.count()
+    merged['top_talkers'] = [
+        {'ip': ip, 'count': count}
+        for ip, count in sorted(talkers.items(), key=lambda x: x[1], reverse=True)[:TOP_TALKERS_SIZE]
+    ]
+    
+    return merged
+
+
+def public_summary(summary: Dict) -> Dict:
+    """Versión del resumen para respuestas de API (sin registros del sketch)"""
+    result = {k: v for k, v in summary.items() if k not in ('attacker_sketch', 'source_size', 'schema_version')}
+    if 'attacker_sketch' in summary:
+        result['unique_attackers_estimate'] = HyperLogLog.from_dict(summary['attacker_sketch']).count()
+    return result
+
+
+class SummaryStore:
+    """Lee y escribe los sidecars `<dataset_id>.summary.json` con caché en memoria"""
+    
+    def __init__(self):
+        self._cache: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+    
+    def sidecar_path(self, dataset_id: str) -> str:
+        """Ruta del sidecar de un dataset"""
+        return os.path.join(settings.UPLOAD_PATH, f"{dataset_id}.summary.json")
+    
+    def write(self, dataset_id: str, df: pd.DataFrame, source_path: str = None) -> Dict:
+        """Calcula y persiste el resumen de un dataset"""
+        source_size = os.path.getsize(source_path) if source_path and os.path.exists(source_path) else None
+        summary = build_summary(dataset_id, df, source_size)
+        atomic_write_json(self.sidecar_path(dataset_id), summary, indent=None)
+        
+        with self._lock:
+            self._cache[dataset_id] = summary
+        return summary
+    
+    def read(self, dataset_id: str, source_path: str = None) -> Optional[Dict]:
+        """
+        Obtiene el resumen de un dataset si existe y sigue vigente
+        
+        Args:
+            dataset_id: ID del dataset
+            source_path: CSV de origen (para validar que no cambió)
+        """
+        source_size = os.path.getsize(source_path) if source_path and os.path.exists(source_path) else None
+        
+        with self._lock:
+            summary = self._cache.get(dataset_id)
+        
+        if summary is not None:
+            CACHE_HITS.inc(cache='summary_memory')
+        else:
+            path = self.sidecar_path(dataset_id)
+            if not os.path.exists(path):
+                CACHE_MISSES.inc(cache='summary_sidecar')
+                return None
+            CACHE_HITS.inc(cache='summary_sidecar')
+            with open(path, 'r') as f:
+                summary = json.load(f)
+            if summary.get('schema_version') != SUMMARY_SCHEMA_VERSION:
+                return None
+        
+        if source_size is not None and summary.get('source_size') not in (None, source_size):
+            return None
+        
+        with self._lock:
+            self._cache[dataset_id] = summary
+        return summary
+    
+    def delete(self, dataset_id: str) -> None:
+        """Elimina el sidecar de un dataset"""
+        with self._lock:
+            self._cache.pop(dataset_id, None)
+        path = self.sidecar_path(dataset_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# Instancia global
+summary_store = SummaryStore()
@@ -0,0 +1,222 @@
+"""
+Exportación en streaming de eventos IDS filtrados (CSV, NDJSON, Arrow IPC)
+"""
+import io
+import os
+import zlib
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+import pandas as pd
+from ..core.config import settings
+from ..core.metrics import ROWS_PROCESSED
+from ..utils.data_loader import data_loader
+
+
+EXPORT_COLUMNS = ['timestamp', 'ip_origen', 'ip_destino', 'puerto', 'protocolo', 'alerta']
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrow'),
+}
+
+
+class EventFilter:
+    """
+    Filtro de eventos por rango temporal, IP, puerto, protocolo y alerta
+    
+    Los criterios vacíos no filtran; los de lista aceptan cualquiera de sus
+    valores. `ip` coincide con origen o destino.
+    """
+    
+    def __init__(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        ip: Optional[List[str]] = None,
+        ip_origen: Optional[List[str]] = None,
+        ip_destino: Optional[List[str]] = None,
+        puerto: Optional[List[int]] = None,
+        protocolo: Optional[List[str]] = None,
+        alerta: Optional[List[str]] = None
+    ):
+        self.start = pd.Timestamp(start) if start is not None else None
+        self.end = pd.Timestamp(end) if end is not None else None
+        self.ip = ip or []
+        self.ip_origen = ip_origen or []
+        self.ip_destino = ip_destino or []
+        self.puerto = puerto or []
+        self.protocolo = [p.upper() for p in protocolo or []]
+        self.alerta = alerta or []
+    
+    def mask(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Máscara booleana de los eventos que cumplen el filtro
+        
+        Args:
+            df: Bloque de eventos normalizado
+        """
+        mask = pd.Series(True, index=df.index)
+        if self.start is not None:
+            mask &= df['timestamp'] >= self.start
+        if self.end is not None:
+            mask &= df['timestamp'] < self.end
+        if self.ip:
+            mask &= df['ip_origen'].isin(self.ip) | df['ip_destino'].isin(self.ip)
+        if self.ip_origen:
+            mask &= df['ip_origen'].isin(self.ip_origen)
+        if self.ip_destino:
+            mask &= df['ip_destino'].isin(self.ip_destino)
+        if self.puerto:
+            mask &= df['puerto'].isin(self.puerto)
+        if self.protocolo:
+            mask &= df['protocolo'].str.upper().isin(self.protocolo)
+        if self.alerta:
+            mask &= df['alerta'].isin(self.alerta)
+        return mask
+    
+    def to_dict(self) -> Dict:
+        """Criterios activos (para cabeceras y registros)"""
+        criteria = {
+            'start': self.start.isoformat() if self.start is not None else None,
+            'end': self.end.isoformat() if self.end is not None else None,
+            'ip': self.ip,
+            'ip_origen': self.ip_origen,
+            'ip_destino': self.ip_destino,
+            'puerto': self.puerto,
+            'protocolo': self.protocolo,
+            'alerta': self.alerta
+        }
+        return {k: v for k, v in criteria.items() if v}
+
+
+def iter_event_chunks(
+    dataset_id: Optional[str] = None,
+    event_filter: Optional[EventFilter] = None,
+    chunk_rows: int = None,
+    limit: Optional[int] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee el CSV del dataset por bloques y devuelve los eventos filtrados
+    
+    Nunca carga el archivo completo: la memoria depende solo del tamaño de
+    bloque, no del número de filas del dataset.
+    
+    Args:
+        dataset_id: ID del dataset (None = default)
+        event_filter: Filtro a aplicar (None = todos los eventos)
+        chunk_rows: Filas por bloque leído (por defecto EXPORT_CHUNK_ROWS)
+        limit: Máximo de eventos a devolver
+    """
+    filepath = data_loader.resolve_path(dataset_id)
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(filepath)
+    
+    remaining = limit
+    reader = pd.read_csv(filepath, chunksize=chunk_rows or settings.EXPORT_CHUNK_ROWS)
+    with reader:
+        for chunk in reader:
+            chunk.columns = chunk.columns.str.lower().str.strip()
+            chunk['timestamp'] = pd.to_datetime(chunk['timestamp'])
+            ROWS_PROCESSED.inc(len(chunk), service='event_export')
+            
+            if event_filter is not None:
+                chunk = chunk[event_filter.mask(chunk)]
+            if remaining is not None:
+                chunk = chunk.iloc[:remaining]
+                remaining -= len(chunk)
+            if not chunk.empty:
+                yield chunk[EXPORT_COLUMNS]
+            if remaining == 0:
+                return
+
+
+def _encode_csv(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header, date_format='%Y-%m-%d %H:%M:%S').encode('utf-8')
+        header = False
+    if header:
+        yield (','.join(EXPORT_COLUMNS) + '\n').encode('utf-8')
+
+
+def _encode_ndjson(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        chunk = chunk.assign(timestamp=chunk['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S'))
+        # Según la versión de pandas, to_json(lines=True) termina o no en salto de línea
+        lines = chunk.to_json(orient='records', lines=True, force_ascii=False).rstrip('\n')
+        yield (lines + '\n').encode('utf-8')
+
+
+def _encode_arrow(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    import pyarrow as pa
+    
+    schema = pa.schema([
+        ('timestamp', pa.timestamp('us')),
+        ('ip_origen', pa.string()),
+        ('ip_destino', pa.string()),
+        ('puerto', pa.int64()),
+        ('protocolo', pa.string()),
+        ('alerta', pa.string()),
+    ])
+    
+    # Cada lote se escribe en el buffer y se entrega de inmediato
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for chunk in chunks:
+            writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+
+_ENCODERS: Dict[str, Callable[[Iterator[pd.DataFrame]], Iterator[bytes]]] = {
+    'csv': _encode_csv,
+    'ndjson': _encode_ndjson,
+    'arrow': _encode_arrow,
+}
+
+
+def arrow_available() -> bool:
+    """Indica si pyarrow está instalado (formato Arrow IPC)"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _gzip_stream(parts: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: formato gzip
+    for part in parts:
+        compressed = compressor.compress(part)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_events(
+    export_format: str,
+    dataset_id: Optional[str] = None,
+    event_filter: Optional[EventFilter] = None,
+    limit: Optional[int] = None,
+    gzip: bool = False
+) -> Iterator[bytes]:
+    """
+    Genera la exportación como secuencia de bloques de bytes
+    
+    Args:
+        export_format: 'csv', 'ndjson' o 'arrow'
+        dataset_id: ID del dataset (None = default)
+        event_filter: Filtro de eventos
+        limit: Máximo de eventos
+        gzip: Comprimir la salida con gzip
+    
+    Returns:
+        Iterador de bytes apto para StreamingResponse
+    """
+    parts = _ENCODERS[export_format](iter_event_chunks(dataset_id, event_filter, limit=limit))
+    return _gzip_stream(parts) if gzip else parts
@@ -0,0 +1,276 @@
+"""
+Índices invertidos por columna para consultas ad-hoc sobre eventos
+"""
+import ipaddress
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from ..api.models.schemas import EventQuery, QueryCondition, QueryField, QueryOperator
+from ..core.metrics import CACHE_HITS, CACHE_MISSES
+from ..core.tracing import span, traced
+from ..utils.data_loader import data_loader
+from ..utils.helpers import ipv4_to_int
+
+
+INDEXED_FIELDS = [f.value for f in QueryField]
+IP_FIELDS = {QueryField.IP_ORIGEN.value, QueryField.IP_DESTINO.value}
+
+
+class ColumnIndex:
+    """
+    Índice invertido de una columna en formato CSR
+    
+    `codes` guarda el código de valor de cada fila y `postings` las filas
+    agrupadas por código (cada grupo en orden ascendente), de modo que las
+    filas de un valor son `postings[offsets[c]:offsets[c + 1]]`.
+    """
+    
+    def __init__(self, values: pd.Series):
+        codes, uniques = pd.factorize(values, sort=True, use_na_sentinel=False)
+        self.codes = codes.astype(np.int32)
+        self.uniques = pd.Index(uniques)
+        self.postings = np.argsort(self.codes, kind='stable').astype(np.int64)
+        self.offsets = np.concatenate(([0], np.cumsum(np.bincount(self.codes, minlength=len(uniques)))))
+        self.numeric: Optional[np.ndarray] = None
+    
+    def rows(self, codes: np.ndarray) -> np.ndarray:
+        """Filas (ordenadas) que tienen cualquiera de los códigos dados"""
+        if len(codes) == 1:
+            c = codes[0]
+            return self.postings[self.offsets[c]:self.offsets[c + 1]]
+        parts = [self.postings[self.offsets[c]:self.offsets[c + 1]] for c in codes]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+    
+    def posting_size(self, codes: np.ndarray) -> int:
+        return int((self.offsets[codes + 1] - self.offsets[codes]).sum())
+
+
+class EventIndex:
+    """
+    Eventos de un dataset ordenados por tiempo con un índice por columna
+    
+    Las condiciones se resuelven sobre los índices y se intersectan de la
+    lista más corta a la más larga; el rango temporal es un corte por
+    búsqueda binaria. Solo se materializan las filas coincidentes.
+    """
+    
+    def __init__(self, df: pd.DataFrame):
+        with span('event_index.build'):
+            self.frame = df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+            self.timestamps = self.frame['timestamp'].to_numpy()
+            self.columns: Dict[str, ColumnIndex] = {
+                field: ColumnIndex(self.frame[field]) for field in INDEXED_FIELDS
+            }
+            for field in IP_FIELDS:
+                self.columns[field].numeric = ipv4_to_int(self.columns[field].uniques.to_series())
+    
+    def __len__(self) -> int:
+        return len(self.frame)
+    
+    def _match_codes(self, condition: QueryCondition) -> np.ndarray:
+        """Códigos de valor que satisfacen una condición"""
+        field = condition.field.value
+        column = self.columns[field]
+        op = condition.op
+        
+        if op == QueryOperator.CIDR:
+            if field not in IP_FIELDS:
+                raise ValueError(f"El operador cidr solo aplica a IPs, no a '{field}'")
+            try:
+                network = ipaddress.IPv4Network(str(condition.value), strict=False)
+            except ValueError:
+                raise ValueError(f"Subred IPv4 inválida: {condition.value}")
+            low = int(network.network_address)
+            high = int(network.broadcast_address)
+            return np.flatnonzero((column.numeric >= low) & (column.numeric <= high))
+        
+        if op == QueryOperator.RANGE:
+            if field != QueryField.PUERTO.value:
+                raise ValueError(f"El operador range solo aplica a puerto, no a '{field}'")
+            if not isinstance(condition.value, (list, tuple)) or len(condition.value) != 2:
+                raise ValueError("range requiere [mínimo, máximo]")
+            low, high = (int(v) for v in condition.value)
+            # Valores únicos ordenados: el rango es un corte contiguo
+            uniques = column.uniques.to_numpy()
+            return np.arange(np.searchsorted(uniques, low, 'left'), np.searchsorted(uniques, high, 'right'))
+        
+        values = condition.value if op == QueryOperator.IN else [condition.value]
+        if not isinstance(values, (list, tuple)):
+            raise ValueError("in requiere una lista de valores")
+        if field == QueryField.PUERTO.value:
+            try:
+                values = [int(v) for v in values]
+            except (TypeError, ValueError):
+                raise ValueError("puerto requiere valores enteros")
+        elif field == QueryField.PROTOCOLO.value:
+            wanted = {str(v).upper() for v in values}
+            return np.flatnonzero(column.uniques.str.upper().isin(wanted))
+        else:
+            values = [str(v) for v in values]
+        
+        codes = column.uniques.get_indexer(values)
+        return np.unique(codes[codes >= 0])
+    
+    @staticmethod
+    def _intersect(rows: np.ndarray, other: np.ndarray) -> np.ndarray:
+        """Intersección de dos listas ordenadas (coste según la más corta)"""
+        if len(rows) > len(other):
+            rows, other = other, rows
+        if len(rows) == 0 or len(other) == 0:
+            return rows[:0]
+        positions = np.minimum(np.searchsorted(other, rows), len(other) - 1)
+        return rows[other[positions] == rows]
+    
+    def _time_slice(self, query: EventQuery) -> Tuple[int, int]:
+        low = 0 if query.start is None else int(np.searchsorted(self.timestamps, pd.Timestamp(query.start).to_datetime64(), 'left'))
+        high = len(self) if query.end is None else int(np.searchsorted(self.timestamps, pd.Timestamp(query.end).to_datetime64(), 'left'))
+        return low, max(low, high)
+    
+    @traced()
+    def select(self, query: EventQuery) -> Tuple[np.ndarray, Dict]:
+        """
+        Filas que cumplen la consulta (en orden temporal)
+        
+        Returns:
+            (filas, plan de ejecución con el tamaño de cada lista usada)
+        """
+        low, high = self._time_slice(query)
+        plan = {'total_rows': len(self), 'time_range_rows': high - low, 'conditions': []}
+        
+        candidates = []
+        for condition in query.conditions:
+            codes = self._match_codes(condition)
+            column = self.columns[condition.field.value]
+            candidates.append((column.posting_size(codes), column, codes, condition))
+        
+        if not candidates:
+            rows = np.arange(low, high, dtype=np.int64)
+            plan['rows_examined'] = 0
+            return rows, plan
+        
+        # Más selectiva primero: cada intersección cuesta según la lista menor
+        candidates.sort(key=lambda c: c[0])
+        rows = None
+        examined = 0
+        for size, column, codes, condition in candidates:
+            plan['conditions'].append({
+                'field': condition.field.value, 'op': condition.op.value,
+                'values_matched': int(len(codes)), 'posting_rows': size
+            })
+            if rows is not None and len(rows) == 0:
+                continue
+            postings = column.rows(codes)
+            examined += len(postings)
+            if rows is None:
+                rows = postings[np.searchsorted(postings, low):np.searchsorted(postings, high)]
+            else:
+                rows = self._intersect(rows, postings)
+        
+        plan['rows_examined'] = examined
+        return rows, plan
+    
+    def group(self, rows: np.ndarray, fields: List[str], top_k: int) -> List[Dict]:
+        """
+        Conteo por combinación de columnas y top-k por conteo
+        
+        Args:
+            rows: Filas seleccionadas
+            fields: Columnas de agrupación
+            top_k: Número de grupos a devolver
+        """
+        columns = [self.columns[f] for f in fields]
+        
+        # Clave compuesta en base mixta sobre los códigos de cada columna
+        keys = np.zeros(len(rows), dtype=np.int64)
+        for column in columns:
+            keys = keys * len(column.uniques) + column.codes[rows]
+        unique_keys, counts = np.unique(keys, return_counts=True)
+        
+        if len(counts) > top_k:
+            top = np.argpartition(-counts, top_k - 1)[:top_k]
+            unique_keys, counts = unique_keys[top], counts[top]
+        order = np.lexsort((unique_keys, -counts))
+        
+        groups = []
+        for key, count in zip(unique_keys[order], counts[order]):
+            values = {}
+            for field, column in reversed(list(zip(fields, columns))):
+                key, code = divmod(int(key), len(column.uniques))
+                value = column.uniques[code]
+                values[field] = value.item() if hasattr(value, 'item') else value
+            groups.append({'key': {f: values[f] for f in fields}, 'count': int(count)})
+        return groups
+    
+    def records(self, rows: np.ndarray) -> List[Dict]:
+        """Eventos de las filas dadas en forma de dicts"""
+        events = self.frame.iloc[rows]
+        events = events.assign(timestamp=events['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S'))
+        return events.to_dict('records')
+
+
+class EventIndexStore:
+    """Índices por dataset, reconstruidos cuando cambia la versión del CSV"""
+    
+    def __init__(self, max_datasets: int = 4):
+        self.max_datasets = max_datasets
+        self._indexes: "OrderedDict[str, Tuple[str, EventIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, dataset_id: Optional[str] = None) -> EventIndex:
+        """
+        Índice vigente de un dataset (se construye una vez por versión)
+        
+        Args:
+            dataset_id: ID del dataset (None = default)
+        """
+        key = dataset_id or 'default'
+        version = data_loader.get_dataset_version(dataset_id)
+        
+        with self._lock:
+            entry = self._indexes.get(key)
+            if entry is not None and entry[0] == version:
+                CACHE_HITS.inc(cache='event_index')
+                self._indexes.move_to_end(key)
+                return entry[1]
+            
+            CACHE_MISSES.inc(cache='event_index')
+            df = data_loader.load_data(dataset_id)
+            if df.empty:
+                raise ValueError("El dataset no tiene eventos")
+            index = EventIndex(df)
+            self._indexes[key] = (version, index)
+            while len(self._indexes) > self.max_datasets:
+                self._indexes.popitem(last=False)
+            return index
+    
+    def drop(self, dataset_id: Optional[str] = None) -> None:
+        """Elimina el índice de un dataset"""
+        with self._lock:
+            self._indexes.pop(dataset_id or 'default', None)
+    
+    def query(self, query: EventQuery, dataset_id: Optional[str] = None) -> Dict:
+        """
+        Ejecuta una consulta sobre los índices del dataset
+        
+        Args:
+            query: Condiciones, rango temporal, agrupación y límites
+            dataset_id: ID del dataset (None = default)
+        
+        Returns:
+            Dict con total de coincidencias, eventos, grupos y plan
+        """
+        index = self.get(dataset_id)
+        rows, plan = index.select(query)
+        group_fields = [f.value for f in query.group_by]
+        return {
+            'total_matched': int(len(rows)),
+            'events': index.records(rows[:query.limit]),
+            'groups': index.group(rows, group_fields, query.top_k) if group_fields else [],
+            'plan': plan
+        }
+
+
+# Instancia global
+event_indexes = EventIndexStore()
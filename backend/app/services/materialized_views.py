@@ -0,0 +1,583 @@
+"""
+Vistas materializadas de análisis con refresco incremental
+"""
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from ..api.models.schemas import (
+    SuspiciousIP,
+    AttackPattern,
+    PortAnalysis,
+    AlertSummary,
+    TimelineData,
+    RiskLevel
+)
+from ..core.config import settings
+from ..core.metrics import CACHE_HITS, CACHE_MISSES
+from ..core.tracing import span
+from ..utils.data_loader import data_loader
+from ..utils.helpers import calculate_trend, union_unique
+from ..utils.classification import is_scada_port, port_services
+from .data_analyzer import DataAnalyzer
+from .threat_detector import ThreatDetector
+from .sql_engine import sql_engine
+
+
+class ViewDefinition:
+    """
+    Definición de una vista
+    
+    Las vistas base se alimentan de eventos: `initial()` crea el estado vacío
+    y `merge(state, df)` agrega un bloque de eventos (refresco incremental).
+    Las vistas derivadas se recalculan con `derive(*estados)` a partir de
+    las vistas de las que dependen.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        depends_on: List[str],
+        initial: Callable[[], Any] = None,
+        merge: Callable[[Any, pd.DataFrame], Any] = None,
+        derive: Callable[..., Any] = None
+    ):
+        self.name = name
+        self.depends_on = depends_on
+        self.initial = initial
+        self.merge = merge
+        self.derive = derive
+    
+    @property
+    def is_base(self) -> bool:
+        return self.derive is None
+
+
+class MaterializedViews:
+    """
+    Registro de vistas y sus estados por dataset
+    
+    Cada dataset guarda la versión (mtime + tamaño del CSV) con la que se
+    calcularon sus vistas. Las lecturas son búsquedas; si la versión cambió
+    por un medio no notificado (p. ej. otro worker) se reconstruyen una vez.
+    """
+    
+    def __init__(self, max_datasets: int = 8):
+        self.definitions: "OrderedDict[str, ViewDefinition]" = OrderedDict()
+        self.max_datasets = max_datasets
+        self._datasets: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.RLock()
+    
+    def base_view(self, name: str, initial: Callable[[], Any]) -> Callable:
+        """Decorador para registrar la función merge de una vista base"""
+        def decorator(merge: Callable) -> Callable:
+            self.definitions[name] = ViewDefinition(name, ['events'], initial=initial, merge=merge)
+            return merge
+        return decorator
+    
+    def derived_view(self, name: str, depends_on: List[str]) -> Callable:
+        """Decorador para registrar una vista derivada de otras vistas"""
+        missing = [d for d in depends_on if d not in self.definitions]
+        if missing:
+            raise ValueError(f"Vista {name}: dependencias no registradas {missing}")
+        
+        def decorator(derive: Callable) -> Callable:
+            self.definitions[name] = ViewDefinition(name, depends_on, derive=derive)
+            return derive
+        return decorator
+    
+    def _recompute(self, states: Dict[str, Any], changed: set) -> None:
+        """Recalcula (en orden de registro) las vistas derivadas afectadas"""
+        for name, definition in self.definitions.items():
+            if not definition.is_base and changed.intersection(definition.depends_on):
+                with span(f"view.{name}"):
+                    states[name] = definition.derive(*[states[d] for d in definition.depends_on])
+                changed.add(name)
+    
+    def _build(self, df: pd.DataFrame) -> Dict[str, Any]:
+        states = {}
+        for name, definition in self.definitions.items():
+            if definition.is_base:
+                with span(f"view.{name}"):
+                    state = definition.initial()
+                    states[name] = definition.merge(state, df) if not df.empty else state
+        self._recompute(states, {n for n, d in self.definitions.items() if d.is_base})
+        return states
+    
+    def _store(self, key: str, version: str, states: Dict[str, Any]) -> None:
+        self._datasets[key] = {'version': version, 'states': states}
+        self._datasets.move_to_end(key)
+        while len(self._datasets) > self.max_datasets:
+            self._datasets.popitem(last=False)
+    
+    def _build_sql(self, dataset_id: Optional[str]) -> Dict[str, Any]:
+        """Vistas base calculadas por el motor SQL (ANALYTICS_ENGINE='sql')"""
+        base = [n for n, d in self.definitions.items() if d.is_base]
+        states = sql_engine.base_states(dataset_id, base)
+        self._recompute(states, set(base))
+        return states
+    
+    def refresh(self, dataset_id: Optional[str] = None) -> None:
+        """Reconstruye todas las vistas de un dataset (alta o reemplazo)"""
+        with self._lock:
+            version = data_loader.get_dataset_version(dataset_id)
+            if settings.ANALYTICS_ENGINE == 'sql':
+                states = self._build_sql(dataset_id)
+            else:
+                states = self._build(data_loader.load_data(dataset_id))
+            self._store(dataset_id or 'default', version, states)
+    
+    def append(self, dataset_id: Optional[str], delta: pd.DataFrame, previous_version: str) -> None:
+        """
+        Aplica filas nuevas de forma incremental
+        
+        Args:
+            dataset_id: ID del dataset
+            delta: Eventos añadidos (columnas normalizadas)
+            previous_version: Versión del dataset antes de añadir las filas
+        """
+        key = dataset_id or 'default'
+        with self._lock:
+            entry = self._datasets.get(key)
+            if entry is None or entry['version'] != previous_version:
+                # Sin estado vigente que extender: reconstrucción completa
+                self.refresh(dataset_id)
+                return
+            
+            if settings.ANALYTICS_ENGINE == 'sql':
+                # El motor SQL inserta solo las filas nuevas y reagrega
+                sql_engine.append(dataset_id, delta, previous_version)
+                self._store(key, data_loader.get_dataset_version(dataset_id), self._build_sql(dataset_id))
+                return
+            
+            states = dict(entry['states'])
+            for name, definition in self.definitions.items():
+                if definition.is_base and not delta.empty:
+                    with span(f"view.{name}"):
+                        states[name] = definition.merge(states[name], delta)
+            self._recompute(states, {n for n, d in self.definitions.items() if d.is_base})
+            self._store(key, data_loader.get_dataset_version(dataset_id), states)
+    
+    def drop(self, dataset_id: Optional[str] = None) -> None:
+        """Elimina las vistas de un dataset"""
+        with self._lock:
+            self._datasets.pop(dataset_id or 'default', None)
+    
+    def get(self, name: str, dataset_id: Optional[str] = None) -> Any:
+        """
+        Lee una vista (la construye si no existe o quedó obsoleta)
+        
+        Args:
+            name: Nombre de la vista
+            dataset_id: ID del dataset (None = default)
+        """
+        key = dataset_id or 'default'
+        version = data_loader.get_dataset_version(dataset_id)
+        
+        entry = self._datasets.get(key)
+        if entry is not None and entry['version'] == version:
+            CACHE_HITS.inc(cache='materialized_view')
+            return entry['states'][name]
+        
+        with self._lock:
+            entry = self._datasets.get(key)
+            if entry is None or entry['version'] != version:
+                CACHE_MISSES.inc(cache='materialized_view')
+                self.refresh(dataset_id)
+                entry = self._datasets[key]
+            return entry['states'][name]
+
+
+# Instancia global
+materialized_views = MaterializedViews()
+
+
+def _hour_histogram(timestamps: pd.Series) -> np.ndarray:
+    return np.bincount(timestamps.dt.hour.to_numpy(), minlength=24)
+
+
+def _add_counts(counts: Dict, items) -> Dict:
+    """Copia de un dict de conteos con los pares (clave, conteo) sumados"""
+    counts = dict(counts)
+    for key, count in items:
+        counts[key] = counts.get(key, 0) + int(count)
+    return counts
+
+
+# ----------------------------------------------------------------------
+# Vistas base (agregados aditivos sobre eventos)
+#
+# Los merges no modifican el estado recibido: devuelven un estado nuevo que
+# copia solo las entradas que cambian. Los lectores de `get()` no toman el
+# lock, así que el estado publicado debe ser inmutable.
+# ----------------------------------------------------------------------
+
+@materialized_views.base_view('overview', initial=lambda: {'total': 0, 'ts_min': None, 'ts_max': None})
+def _merge_overview(state: Dict, df: pd.DataFrame) -> Dict:
+    ts_min, ts_max = df['timestamp'].min(), df['timestamp'].max()
+    return {
+        'total': state['total'] + len(df),
+        'ts_min': ts_min if state['ts_min'] is None else min(state['ts_min'], ts_min),
+        'ts_max': ts_max if state['ts_max'] is None else max(state['ts_max'], ts_max)
+    }
+
+
+@materialized_views.base_view('ip_stats', initial=dict)
+def _merge_ip_stats(state: Dict, df: pd.DataFrame) -> Dict:
+    grouped = df.groupby('ip_origen', sort=False)
+    totals = grouped.size()
+    tipos = grouped['alerta'].unique()
+    puertos = grouped['puerto'].unique()
+    ultima = grouped['timestamp'].max()
+    
+    state = dict(state)
+    for ip in totals.index:
+        entry = state.get(ip, {'total': 0, 'tipos': [], 'puertos': [], 'ultima': None})
+        state[ip] = {
+            'total': entry['total'] + int(totals[ip]),
+            'tipos': union_unique(entry['tipos'], tipos[ip].tolist()),
+            'puertos': union_unique(entry['puertos'], puertos[ip].tolist()),
+            'ultima': ultima[ip] if entry['ultima'] is None else max(entry['ultima'], ultima[ip])
+        }
+    return state
+
+
+@materialized_views.base_view('port_stats', initial=dict)
+def _merge_port_stats(state: Dict, df: pd.DataFrame) -> Dict:
+    grouped = df.groupby('puerto', sort=False)
+    totals = grouped.size()
+    ips = grouped['ip_origen'].unique()
+    protocols = grouped['protocolo'].unique()
+    
+    state = dict(state)
+    for puerto in totals.index:
+        entry = state.get(int(puerto), {'count': 0, 'ips': [], 'protocols': []})
+        state[int(puerto)] = {
+            'count': entry['count'] + int(totals[puerto]),
+            'ips': union_unique(entry['ips'], ips[puerto].tolist()),
+            'protocols': union_unique(entry['protocols'], protocols[puerto].tolist())
+        }
+    return state
+
+
+@materialized_views.base_view('alert_stats', initial=lambda: {'counts': {}, 'critical': 0, 'hour_of_day': np.zeros(24, dtype=np.int64)})
+def _merge_alert_stats(state: Dict, df: pd.DataFrame) -> Dict:
+    counts = _add_counts(state['counts'], df['alerta'].value_counts(sort=False).items())
+    
+    critical = int(((df['alerta'] == 'SQL Injection') | df['puerto'].isin(ThreatDetector.CRITICAL_PORTS)).sum())
+    return {
+        'counts': counts,
+        'critical': state['critical'] + critical,
+        'hour_of_day': state['hour_of_day'] + _hour_histogram(df['timestamp'])
+    }
+
+
+@materialized_views.base_view('pattern_stats', initial=dict)
+def _merge_pattern_stats(state: Dict, df: pd.DataFrame) -> Dict:
+    state = dict(state)
+    for tipo_ataque, group in df.groupby('alerta', sort=False):
+        entry = state.get(tipo_ataque, {'count': 0, 'hours': np.zeros(24, dtype=np.int64), 'ips': []})
+        state[tipo_ataque] = {
+            'count': entry['count'] + len(group),
+            'hours': entry['hours'] + _hour_histogram(group['timestamp']),
+            'ips': union_unique(entry['ips'], group['ip_origen'].unique().tolist())
+        }
+    return state
+
+
+@materialized_views.base_view('timeline_stats', initial=dict)
+def _merge_timeline_stats(state: Dict, df: pd.DataFrame) -> Dict:
+    counts = df.groupby([df['timestamp'].dt.floor('h'), 'alerta'], sort=False).size()
+    by_hour: Dict = {}
+    for (hour, alerta), count in counts.items():
+        by_hour.setdefault(hour, []).append((alerta, count))
+    
+    state = dict(state)
+    for hour, items in by_hour.items():
+        state[hour] = _add_counts(state.get(hour, {}), items)
+    return state
+
+
+@materialized_views.base_view('hourly_stats', initial=lambda: {'attackers': {}, 'scada': {}})
+def _merge_hourly_stats(state: Dict, df: pd.DataFrame) -> Dict:
+    hours = df['timestamp'].dt.floor('h')
+    by_hour: Dict = {}
+    for (hour, ip), count in df.groupby([hours, 'ip_origen'], sort=False).size().items():
+        by_hour.setdefault(hour, []).append((ip, count))
+    
+    attackers = dict(state['attackers'])
+    for hour, items in by_hour.items():
+        attackers[hour] = _add_counts(attackers.get(hour, {}), items)
+    
+    scada = df['puerto'].isin(settings.SCADA_CRITICAL_PORTS)
+    return {
+        'attackers': attackers,
+        'scada': _add_counts(state['scada'], hours[scada].value_counts(sort=False).items())
+    }
+
+
+@materialized_views.base_view('target_stats', initial=dict)
+def _merge_target_stats(state: Dict, df: pd.DataFrame) -> Dict:
+    grouped = df.groupby('ip_destino', sort=False)
+    totals = grouped.size()
+    attackers = grouped['ip_origen'].unique()
+    ports = grouped['puerto'].unique()
+    
+    state = dict(state)
+    for ip in totals.index:
+        entry = state.get(ip, {'total': 0, 'attackers': set(), 'ports': []})
+        state[ip] = {
+            'total': entry['total'] + int(totals[ip]),
+            'attackers': entry['attackers'] | set(attackers[ip].tolist()),
+            'ports': union_unique(entry['ports'], ports[ip].tolist())
+        }
+    return state
+
+
+@materialized_views.base_view('graph_stats', initial=lambda: {'sent': {}, 'received': {}, 'edges': {}})
+def _merge_graph_stats(state: Dict, df: pd.DataFrame) -> Dict:
+    # Los dicts conservan el orden de primera aparición de cada IP / arista
+    edges = dict(state['edges'])
+    for (source, target), group in df.groupby(['ip_origen', 'ip_destino'], sort=False):
+        edge = edges.get((source, target), {'weight': 0, 'attacks': [], 'ports': []})
+        edges[(source, target)] = {
+            'weight': edge['weight'] + len(group),
+            'attacks': union_unique(edge['attacks'], group['alerta'].unique().tolist()),
+            'ports': union_unique(edge['ports'], [int(p) for p in group['puerto'].unique()])
+        }
+    
+    return {
+        'sent': _add_counts(state['sent'], df.groupby('ip_origen', sort=False).size().items()),
+        'received': _add_counts(state['received'], df.groupby('ip_destino', sort=False).size().items()),
+        'edges': edges
+    }
+
+
+# ----------------------------------------------------------------------
+# Vistas derivadas (formato de respuesta de los endpoints)
+# ----------------------------------------------------------------------
+
+@materialized_views.derived_view('suspicious_ips', depends_on=['ip_stats'])
+def _derive_suspicious_ips(ip_stats: Dict) -> List[SuspiciousIP]:
+    """Todas las IPs con su riesgo, ordenadas por total (el umbral se aplica al leer)"""
+    resultados = []
+    for ip in sorted(ip_stats):
+        entry = ip_stats[ip]
+        total = entry['total']
+        if total > settings.HIGH_RISK_THRESHOLD:
+            riesgo = RiskLevel.HIGH
+        elif total > settings.MEDIUM_RISK_THRESHOLD:
+            riesgo = RiskLevel.MEDIUM
+        else:
+            riesgo = RiskLevel.LOW
+        
+        resultados.append(SuspiciousIP(
+            ip=ip,
+            total_ataques=total,
+            tipos_ataques=list(entry['tipos']),
+            nivel_riesgo=riesgo,
+            puertos_afectados=list(entry['puertos']),
+            ultima_actividad=entry['ultima'],
+            recomendaciones=DataAnalyzer.generate_ip_recommendations(entry['tipos'], entry['puertos'])
+        ))
+    return sorted(resultados, key=lambda x: x.total_ataques, reverse=True)
+
+
+@materialized_views.derived_view('risk_index', depends_on=['suspicious_ips'])
+def _derive_risk_index(suspicious_ips: List[SuspiciousIP]) -> Dict:
+    """
+    IPs sospechosas (umbral SUSPICIOUS_IP_THRESHOLD) indexadas por IP y por nivel
+    
+    Lo comparten los endpoints de respuesta: buscar una IP es un acceso a
+    dict y cada nivel de riesgo conserva el orden por total de ataques.
+    """
+    ips = [ip for ip in suspicious_ips if ip.total_ataques >= settings.SUSPICIOUS_IP_THRESHOLD]
+    by_level = {level.value: [] for level in RiskLevel}
+    for ip in ips:
+        by_level[ip.nivel_riesgo].append(ip)
+    return {
+        'ips': ips,
+        'by_ip': {ip.ip: ip for ip in ips},
+        'by_level': by_level,
+        # Alto o Crítico con algún puerto SCADA atacado
+        'scada_targeted': any(
+            any(p in settings.SCADA_CRITICAL_PORTS for p in ip.puertos_afectados)
+            for ip in by_level[RiskLevel.HIGH.value] + by_level[RiskLevel.CRITICAL.value]
+        )
+    }
+
+
+@materialized_views.derived_view('attack_distribution', depends_on=['alert_stats'])
+def _derive_attack_distribution(alert_stats: Dict) -> Dict[str, int]:
+    return dict(sorted(alert_stats['counts'].items(), key=lambda x: x[1], reverse=True))
+
+
+@materialized_views.derived_view('port_analysis', depends_on=['port_stats'])
+def _derive_port_analysis(port_stats: Dict) -> List[PortAnalysis]:
+    ordered = sorted(port_stats.items(), key=lambda x: (-x[1]['count'], x[0]))
+    puertos = [puerto for puerto, _ in ordered]
+    es_scada = is_scada_port(puertos) if puertos else []
+    servicios = port_services(puertos) if puertos else []
+    resultados = []
+    for i, (puerto, data) in enumerate(ordered):
+        resultados.append(PortAnalysis(
+            puerto=puerto,
+            total_intentos=data['count'],
+            ips_origen=data['ips'][:5],
+            protocolos=list(data['protocols']),
+            es_scada_critico=bool(es_scada[i]),
+            descripcion_servicio=servicios[i]
+        ))
+    return resultados
+
+
+@materialized_views.derived_view('attack_patterns', depends_on=['pattern_stats', 'overview'])
+def _derive_attack_patterns(pattern_stats: Dict, overview: Dict) -> List[AttackPattern]:
+    patterns = []
+    for tipo_ataque in sorted(pattern_stats):
+        data = pattern_stats[tipo_ataque]
+        porcentaje = data['count'] / overview['total'] * 100
+        hora_pico = int(np.argmax(data['hours']))
+        patterns.append(AttackPattern(
+            tipo_ataque=tipo_ataque,
+            frecuencia=data['count'],
+            porcentaje=round(porcentaje, 2),
+            ips_involucradas=data['ips'][:10],
+            horario_pico=f"{hora_pico}:00 - {hora_pico+1}:00",
+            severidad=DataAnalyzer.classify_pattern_severity(porcentaje)
+        ))
+    return sorted(patterns, key=lambda x: x.frecuencia, reverse=True)
+
+
+@materialized_views.derived_view('alert_summary', depends_on=['alert_stats', 'overview'])
+def _derive_alert_summary(alert_stats: Dict, overview: Dict) -> AlertSummary:
+    total = overview['total']
+    return AlertSummary(
+        total_alertas=total,
+        alertas_criticas=alert_stats['critical'],
+        alertas_activas=24 if total > 24 else total,
+        tendencia=calculate_trend(alert_stats['hour_of_day'].tolist()) if total > 24 else "estable"
+    )
+
+
+@materialized_views.derived_view('timeline', depends_on=['timeline_stats'])
+def _derive_timeline(timeline_stats: Dict) -> Dict[str, List[TimelineData]]:
+    """Timeline por hora y por día"""
+    daily: Dict[pd.Timestamp, Dict[str, int]] = {}
+    for hour, counts in timeline_stats.items():
+        bucket = daily.setdefault(hour.floor('D'), {})
+        for alerta, count in counts.items():
+            bucket[alerta] = bucket.get(alerta, 0) + count
+    
+    def render(buckets: Dict) -> List[TimelineData]:
+        return [
+            TimelineData(
+                timestamp=point.strftime('%Y-%m-%d %H:%M:%S'),
+                count=sum(counts.values()),
+                ataques_detallados=dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+            )
+            for point, counts in sorted(buckets.items())
+        ]
+    
+    return {'H': render(timeline_stats), 'D': render(daily)}
+
+
+@materialized_views.derived_view('hourly_rollup', depends_on=['timeline_stats', 'hourly_stats'])
+def _derive_hourly_rollup(timeline_stats: Dict, hourly_stats: Dict) -> Dict:
+    """
+    Rollup horario en arrays para agregar ventanas arbitrarias
+    
+    Las horas están ordenadas, así que una ventana es un tramo contiguo de
+    filas (búsqueda binaria). Los atacantes por hora se guardan como CSR:
+    `ip_offsets[i]:ip_offsets[i+1]` son los pares (IP, conteo) de la hora i.
+    """
+    hours = sorted(timeline_stats)
+    alerts = sorted({alerta for counts in timeline_stats.values() for alerta in counts})
+    ips = sorted({ip for counts in hourly_stats['attackers'].values() for ip in counts})
+    alert_pos = {alerta: i for i, alerta in enumerate(alerts)}
+    ip_pos = {ip: i for i, ip in enumerate(ips)}
+    
+    by_alert = np.zeros((len(hours), len(alerts)), dtype=np.int64)
+    ip_offsets = np.zeros(len(hours) + 1, dtype=np.int64)
+    ip_codes: List[int] = []
+    ip_counts: List[int] = []
+    for row, hour in enumerate(hours):
+        for alerta, count in timeline_stats[hour].items():
+            by_alert[row, alert_pos[alerta]] = count
+        attackers = hourly_stats['attackers'].get(hour, {})
+        for ip in sorted(attackers):
+            ip_codes.append(ip_pos[ip])
+            ip_counts.append(attackers[ip])
+        ip_offsets[row + 1] = len(ip_codes)
+    
+    return {
+        'hours': pd.DatetimeIndex(hours).values if hours else np.empty(0, dtype='datetime64[ns]'),
+        'alerts': alerts,
+        'by_alert': by_alert,
+        'scada': np.array([hourly_stats['scada'].get(hour, 0) for hour in hours], dtype=np.int64),
+        'ips': ips,
+        'ip_offsets': ip_offsets,
+        'ip_codes': np.array(ip_codes, dtype=np.int64),
+        'ip_counts': np.array(ip_counts, dtype=np.int64)
+    }
+
+
+@materialized_views.derived_view('hotspots', depends_on=['target_stats'])
+def _derive_hotspots(target_stats: Dict) -> List[Dict]:
+    ranked = sorted(target_stats.items(), key=lambda x: x[1]['total'], reverse=True)
+    hotspots = []
+    for ip, data in ranked[:10]:
+        unique_attackers = len(data['attackers'])
+        hotspots.append({
+            'ip': ip,
+            'total_attacks': data['total'],
+            'unique_attackers': unique_attackers,
+            'ports_targeted': [int(p) for p in data['ports'][:10]],
+            'severity': 'Crítico' if unique_attackers > 3 else 'Alto' if unique_attackers > 1 else 'Medio'
+        })
+    return hotspots
+
+
+@materialized_views.derived_view('attack_graph', depends_on=['graph_stats'])
+def _derive_attack_graph(graph_stats: Dict) -> Dict:
+    sent, received = graph_stats['sent'], graph_stats['received']
+    
+    nodes = []
+    for ip in list(sent) + [ip for ip in received if ip not in sent]:
+        attacks_sent, attacks_received = sent.get(ip, 0), received.get(ip, 0)
+        if attacks_sent > 0 and attacks_received > 0:
+            node_type = 'both'
+        elif attacks_sent > 0:
+            node_type = 'attacker'
+        else:
+            node_type = 'target'
+        nodes.append({
+            'id': ip,
+            'label': ip,
+            'type': node_type,
+            'attacks_sent': attacks_sent,
+            'attacks_received': attacks_received
+        })
+    
+    edges = [
+        {
+            'source': source,
+            'target': target,
+            'weight': edge['weight'],
+            'attacks': edge['attacks'][:5],
+            'ports': edge['ports'][:10]
+        }
+        for (source, target), edge in graph_stats['edges'].items()
+    ]
+    
+    return {
+        'nodes': nodes,
+        'edges': edges,
+        'stats': {
+            'total_nodes': len(nodes),
+            'total_edges': len(edges),
+            'attackers': len([n for n in nodes if n['type'] in ['attacker', 'both']]),
+            'targets': len([n for n in nodes if n['type'] in ['target', 'both']])
+        }
+    }
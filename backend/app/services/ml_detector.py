@@ -3,10 +3,10 @@ Detector de anomalías con Machine Learning
 """
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
 from typing import List, Dict, Tuple
 from datetime import datetime, timedelta
+from ..core.metrics import ROWS_PROCESSED, MODEL_FITS
+from ..core.tracing import traced
 
 
 class MLAnomalyDetector:
@@ -15,8 +15,10 @@ class MLAnomalyDetector:
     def __init__(self, df: pd.DataFrame):
         self.df = df
         self.model = None
-        self.scaler = StandardScaler()
+        self.scaler = None
+        ROWS_PROCESSED.inc(len(df), service='ml_detector')
         
+    @traced()
     def prepare_features(self) -> pd.DataFrame:
         """Prepara features para el modelo ML"""
         if self.df.empty:
@@ -49,6 +51,7 @@ class MLAnomalyDetector:
         
         return ip_stats.fillna(0)
     
+    @traced()
     def train_model(self, contamination=0.1):
         """Entrena el modelo de detección de anomalías"""
         features = self.prepare_features()
@@ -56,7 +59,12 @@ class MLAnomalyDetector:
         if features.empty:
             return None
         
+        # scikit-learn se importa al primer uso para no retrasar el arranque
+        from sklearn.ensemble import IsolationForest
+        from sklearn.preprocessing import StandardScaler
+        
         # Normalizar features
+        self.scaler = StandardScaler()
         X = self.scaler.fit_transform(features)
         
         # Entrenar Isolation Forest
@@ -68,6 +76,7 @@ class MLAnomalyDetector:
         
         predictions = self.model.fit_predict(X)
         scores = self.model.score_samples(X)
+        MODEL_FITS.inc(model='isolation_forest')
         
         # Agregar predicciones al dataframe
         features['anomaly'] = predictions
@@ -76,6 +85,7 @@ class MLAnomalyDetector:
         
         return features
     
+    @traced()
     def detect_anomalies(self) -> List[Dict]:
         """Detecta IPs anómalas usando ML"""
         results = self.train_model()
@@ -109,6 +119,7 @@ class MLAnomalyDetector:
         
         return anomaly_list
     
+    @traced()
     def predict_next_attack(self) -> Dict:
         """Predice probabilidad de próximo ataque en las siguientes horas"""
         if self.df.empty:
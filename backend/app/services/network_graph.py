@@ -3,6 +3,7 @@ Generador de grafo de red de ataques
 """
 import pandas as pd
 from typing import Dict, List
+from ..core.metrics import ROWS_PROCESSED
 
 
 class NetworkGraphGenerator:
@@ -10,6 +11,7 @@ class NetworkGraphGenerator:
     
     def __init__(self, df: pd.DataFrame):
         self.df = df
+        ROWS_PROCESSED.inc(len(df), service='network_graph')
     
     def generate_attack_graph(self) -> Dict:
         """
@@ -0,0 +1,303 @@
+"""
+Motor de ejecución particionada (map-reduce) por hash de IP de origen
+"""
+import asyncio
+import numpy as np
+import pandas as pd
+from concurrent.futures import Executor
+from typing import List, Dict, Optional
+from ..api.models.schemas import (
+    SuspiciousIP,
+    AttackPattern,
+    PortAnalysis,
+    AlertSummary,
+    TimelineData,
+    RiskLevel
+)
+from ..core.tracing import span
+from ..utils.helpers import calculate_trend, union_unique
+from ..utils.classification import port_info
+from ..utils.workers import get_process_pool, get_worker_count
+from .data_analyzer import DataAnalyzer
+from .threat_detector import ThreatDetector
+
+
+def partition_by_source(df: pd.DataFrame, partitions: int) -> List[pd.DataFrame]:
+    """
+    Divide los eventos en particiones según el hash de la IP de origen
+    
+    Todos los eventos de una misma IP caen en la misma partición, por lo que
+    los análisis por IP de origen son exactos dentro de cada una.
+    
+    Args:
+        df: DataFrame de logs IDS
+        partitions: Número de particiones
+    
+    Returns:
+        Lista de DataFrames (uno por partición)
+    """
+    if partitions <= 1 or df.empty:
+        return [df]
+    
+    keys = pd.util.hash_pandas_object(df['ip_origen'], index=False).to_numpy() % np.uint64(partitions)
+    return [df[keys == i] for i in range(partitions)]
+
+
+def map_partition(shard: pd.DataFrame, threshold: int = None) -> Dict:
+    """
+    Fase map: agregaciones parciales de una partición
+    
+    Se ejecuta en los procesos worker; devuelve solo objetos serializables.
+    
+    Args:
+        shard: Eventos de la partición
+        threshold: Umbral de IPs sospechosas
+    
+    Returns:
+        Dict con agregados parciales combinables
+    """
+    analyzer = DataAnalyzer(shard)
+    detector = ThreatDetector(shard)
+    
+    partial = {
+        'rows': len(shard),
+        'suspicious_ips': analyzer.get_suspicious_ips(threshold),
+        'port_sweeps': detector.detect_port_sweep(),
+        'alert_counts': {},
+        'timeline': {},
+        'ports': {},
+        'patterns': {},
+        'critical': 0,
+        'hour_of_day': np.zeros(24, dtype=np.int64),
+        'coordinated': {},
+        'ts_min': None,
+        'ts_max': None
+    }
+    
+    if shard.empty:
+        return partial
+    
+    hours = shard['timestamp'].dt.floor('h')
+    hour_of_day = shard['timestamp'].dt.hour.to_numpy()
+    
+    partial['alert_counts'] = shard['alerta'].value_counts().to_dict()
+    partial['timeline'] = shard.groupby([hours, 'alerta']).size().to_dict()
+    partial['critical'] = int((
+        (shard['alerta'] == 'SQL Injection') |
+        (shard['puerto'].isin(ThreatDetector.CRITICAL_PORTS))
+    ).sum())
+    partial['hour_of_day'] = np.bincount(hour_of_day, minlength=24)
+    partial['ts_min'] = shard['timestamp'].min()
+    partial['ts_max'] = shard['timestamp'].max()
+    
+    for puerto, group in shard.groupby('puerto'):
+        partial['ports'][int(puerto)] = {
+            'count': len(group),
+            'ips': group['ip_origen'].unique().tolist(),
+            'protocols': group['protocolo'].unique().tolist()
+        }
+    
+    for tipo_ataque, group in shard.groupby('alerta'):
+        partial['patterns'][tipo_ataque] = {
+            'count': len(group),
+            'hours': np.bincount(group['timestamp'].dt.hour.to_numpy(), minlength=24),
+            'ips': group['ip_origen'].unique().tolist()
+        }
+    
+    for (target_ip, hour), group in shard.groupby(['ip_destino', hours]):
+        partial['coordinated'][(target_ip, hour)] = (
+            set(group['ip_origen'].unique()),
+            group['alerta'].unique().tolist()
+        )
+    
+    return partial
+
+
+def reduce_partials(partials: List[Dict], top_n: int = 10) -> Dict:
+    """
+    Fase reduce: combina los agregados parciales en el resultado final
+    
+    Args:
+        partials: Resultados de map_partition
+        top_n: Número de puertos a retornar
+    
+    Returns:
+        Dict con las mismas estructuras que DataAnalyzer/ThreatDetector
+    """
+    total = sum(p['rows'] for p in partials)
+    
+    suspicious: List[SuspiciousIP] = []
+    sweeps: List[Dict] = []
+    alert_counts: Dict[str, int] = {}
+    timeline: Dict[pd.Timestamp, Dict[str, int]] = {}
+    ports: Dict[int, Dict] = {}
+    patterns: Dict[str, Dict] = {}
+    coordinated: Dict[tuple, tuple] = {}
+    hour_of_day = np.zeros(24, dtype=np.int64)
+    critical = 0
+    
+    for partial in partials:
+        suspicious.extend(partial['suspicious_ips'])
+        sweeps.extend(partial['port_sweeps'])
+        critical += partial['critical']
+        hour_of_day += partial['hour_of_day']
+        
+        for alerta, count in partial['alert_counts'].items():
+            alert_counts[alerta] = alert_counts.get(alerta, 0) + count
+        
+        for (hour, alerta), count in partial['timeline'].items():
+            bucket = timeline.setdefault(hour, {})
+            bucket[alerta] = bucket.get(alerta, 0) + count
+        
+        for puerto, data in partial['ports'].items():
+            entry = ports.setdefault(puerto, {'count': 0, 'ips': [], 'protocols': []})
+            entry['count'] += data['count']
+            entry['ips'] = union_unique(entry['ips'], data['ips'])
+            entry['protocols'] = union_unique(entry['protocols'], data['protocols'])
+        
+        for tipo_ataque, data in partial['patterns'].items():
+            entry = patterns.setdefault(tipo_ataque, {'count': 0, 'hours': np.zeros(24, dtype=np.int64), 'ips': []})
+            entry['count'] += data['count']
+            entry['hours'] += data['hours']
+            entry['ips'] = union_unique(entry['ips'], data['ips'])
+        
+        for key, (sources, attack_types) in partial['coordinated'].items():
+            if key in coordinated:
+                coordinated[key][0].update(sources)
+                coordinated[key] = (coordinated[key][0], union_unique(coordinated[key][1], attack_types))
+            else:
+                coordinated[key] = (set(sources), list(attack_types))
+    
+    # IPs sospechosas y barridos: exactos por partición, solo se concatenan
+    suspicious.sort(key=lambda x: x.total_ataques, reverse=True)
+    sweeps.sort(key=lambda x: x['ports_scanned'], reverse=True)
+    
+    timeline_data = [
+        TimelineData(
+            timestamp=hour.strftime('%Y-%m-%d %H:%M:%S'),
+            count=sum(counts.values()),
+            ataques_detallados=dict(sorted(counts.items(), key=lambda x: x[1], reverse=True))
+        )
+        for hour, counts in sorted(timeline.items())
+    ]
+    
+    port_analysis = []
+    for puerto, data in sorted(ports.items(), key=lambda x: (-x[1]['count'], x[0]))[:top_n]:
+        info = port_info(puerto)
+        port_analysis.append(PortAnalysis(
+            puerto=puerto,
+            total_intentos=data['count'],
+            ips_origen=data['ips'][:5],
+            protocolos=data['protocols'],
+            es_scada_critico=info['es_scada'],
+            descripcion_servicio=info['servicio']
+        ))
+    
+    attack_patterns = []
+    for tipo_ataque, data in patterns.items():
+        porcentaje = data['count'] / total * 100
+        hora_pico = int(np.argmax(data['hours']))
+        attack_patterns.append(AttackPattern(
+            tipo_ataque=tipo_ataque,
+            frecuencia=data['count'],
+            porcentaje=round(porcentaje, 2),
+            ips_involucradas=data['ips'][:10],
+            horario_pico=f"{hora_pico}:00 - {hora_pico+1}:00",
+            severidad=DataAnalyzer.classify_pattern_severity(porcentaje)
+        ))
+    attack_patterns.sort(key=lambda x: x.frecuencia, reverse=True)
+    
+    if total > 24:
+        alert_summary = AlertSummary(
+            total_alertas=total,
+            alertas_criticas=critical,
+            alertas_activas=24,
+            tendencia=calculate_trend(hour_of_day.tolist())
+        )
+    else:
+        alert_summary = AlertSummary(
+            total_alertas=total,
+            alertas_criticas=critical,
+            alertas_activas=total,
+            tendencia="estable"
+        )
+    
+    coordinated_attacks = [
+        {
+            'target_ip': target_ip,
+            'timestamp': hour.strftime('%Y-%m-%d %H:%M'),
+            'attacking_ips': sorted(sources),
+            'attack_types': attack_types,
+            'severity': RiskLevel.CRITICAL
+        }
+        for (target_ip, hour), (sources, attack_types) in sorted(coordinated.items())
+        if len(sources) >= 3
+    ]
+    
+    timestamps = [p['ts_min'] for p in partials if p['ts_min'] is not None]
+    timestamps_max = [p['ts_max'] for p in partials if p['ts_max'] is not None]
+    
+    return {
+        'total_logs': total,
+        'periodo_analizado': {
+            'inicio': min(timestamps).isoformat() if timestamps else None,
+            'fin': max(timestamps_max).isoformat() if timestamps_max else None
+        },
+        'ips_sospechosas': suspicious,
+        'distribucion_ataques': dict(sorted(alert_counts.items(), key=lambda x: x[1], reverse=True)),
+        'timeline': timeline_data,
+        'puertos_mas_atacados': port_analysis,
+        'patrones_detectados': attack_patterns,
+        'alert_summary': alert_summary,
+        'coordinated_attacks': coordinated_attacks,
+        'port_sweeps': sweeps
+    }
+
+
+class PartitionedEngine:
+    """
+    Ejecuta el análisis particionando los eventos por IP de origen
+    
+    Cada partición se procesa en un worker del executor (por defecto el pool
+    de procesos local) y los parciales se combinan en el proceso coordinador.
+    Cualquier `concurrent.futures.Executor` sirve como backend, lo que permite
+    sustituir el pool local por uno distribuido entre varios hosts.
+    """
+    
+    def __init__(self, partitions: int = None, executor: Optional[Executor] = None):
+        self.partitions = partitions or get_worker_count()
+        self.executor = executor
+    
+    def _get_executor(self) -> Executor:
+        return self.executor or get_process_pool()
+    
+    async def run(self, df: pd.DataFrame, threshold: int = None, top_n: int = 10) -> Dict:
+        """
+        Ejecuta map en paralelo y reduce en el coordinador
+        
+        Args:
+            df: DataFrame de logs IDS
+            threshold: Umbral de IPs sospechosas
+            top_n: Número de puertos a retornar
+        
+        Returns:
+            Resultado combinado más información de ejecución
+        """
+        with span('PartitionedEngine.partition'):
+            shards = partition_by_source(df, self.partitions)
+        executor = self._get_executor()
+        
+        with span('PartitionedEngine.map'):
+            futures = [
+                asyncio.wrap_future(executor.submit(map_partition, shard, threshold))
+                for shard in shards
+            ]
+            partials = await asyncio.gather(*futures)
+        
+        with span('PartitionedEngine.reduce'):
+            result = reduce_partials(partials, top_n)
+        result['execution'] = {
+            'partitions': len(shards),
+            'rows_per_partition': [len(shard) for shard in shards]
+        }
+        return result
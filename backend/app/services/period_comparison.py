@@ -0,0 +1,175 @@
+"""
+Comparación de métricas entre periodos consecutivos a partir del rollup horario
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from ..core.config import settings
+from ..core.tracing import traced
+from .materialized_views import materialized_views
+from .report_generator import risk_from_score
+
+
+# Periodos con nombre -> horas
+COMPARISON_PERIODS = {'day': 24, 'week': 24 * 7}
+
+# Tramo máximo comparado (periodos x horas): datetime64[ns] solo cubre ~292 años
+MAX_COMPARISON_HOURS = 24 * 366 * 100
+
+# Métricas numéricas comparadas entre periodos
+COMPARED_METRICS = ['total_ataques', 'atacantes_unicos', 'ataques_scada', 'ips_sospechosas']
+
+
+def _change(current: int, previous: int) -> Dict:
+    return {
+        'current': current,
+        'previous': previous,
+        'delta': current - previous,
+        'delta_pct': round((current - previous) / previous * 100, 1) if previous else None
+    }
+
+
+class PeriodComparison:
+    """
+    Métricas clave por periodo (día sobre día, semana sobre semana o
+    cualquier número de horas) y su variación entre periodos consecutivos
+    
+    Cada periodo se agrega desde la vista `hourly_rollup`: sumas de filas
+    contiguas para totales, vectores y puertos SCADA, y un bincount de los
+    pares (IP, conteo) del tramo para atacantes únicos y riesgo. El coste
+    depende de las horas y pares IP-hora de la ventana, no de los eventos,
+    así que un dataset de un año o más se compara igual de rápido.
+    """
+    
+    def __init__(self, top_n: int = 5):
+        self.top_n = top_n
+    
+    def _window(self, rollup: Dict, start: int, end: int) -> tuple:
+        """Métricas de las filas [start, end) del rollup y conteos por alerta"""
+        by_alert = rollup['by_alert'][start:end].sum(axis=0)
+        total = int(by_alert.sum())
+        
+        lo, hi = rollup['ip_offsets'][start], rollup['ip_offsets'][end]
+        per_ip = np.bincount(
+            rollup['ip_codes'][lo:hi], weights=rollup['ip_counts'][lo:hi], minlength=len(rollup['ips'])
+        ).astype(np.int64)
+        
+        # Mismos umbrales y puntuación que las IPs sospechosas del reporte ejecutivo
+        suspicious = per_ip[per_ip >= settings.SUSPICIOUS_IP_THRESHOLD]
+        scores = np.where(
+            suspicious > settings.HIGH_RISK_THRESHOLD, 3,
+            np.where(suspicious > settings.MEDIUM_RISK_THRESHOLD, 2, 1)
+        )
+        
+        order = np.argsort(-by_alert, kind='stable')[:self.top_n]
+        metrics = {
+            'total_ataques': total,
+            'atacantes_unicos': int((per_ip > 0).sum()),
+            'ataques_scada': int(rollup['scada'][start:end].sum()),
+            'ips_sospechosas': int(len(suspicious)),
+            'nivel_riesgo_general': risk_from_score(scores.mean()) if len(scores) else "Bajo",
+            'vectores_principales': [
+                {
+                    'alerta': rollup['alerts'][i],
+                    'count': int(by_alert[i]),
+                    'porcentaje': round(float(by_alert[i]) / total * 100, 2)
+                }
+                for i in order if by_alert[i] > 0
+            ]
+        }
+        return metrics, by_alert
+    
+    def _vector_changes(self, rollup: Dict, current: np.ndarray, previous: np.ndarray) -> List[Dict]:
+        """Variación de los vectores principales de cualquiera de los dos periodos"""
+        top = set(np.argsort(-current, kind='stable')[:self.top_n])
+        top |= set(np.argsort(-previous, kind='stable')[:self.top_n])
+        rows = []
+        for i in sorted(top, key=lambda i: (-current[i], -previous[i], rollup['alerts'][i])):
+            if current[i] == 0 and previous[i] == 0:
+                continue
+            rows.append({
+                'alerta': rollup['alerts'][i],
+                **_change(int(current[i]), int(previous[i])),
+                'new': bool(previous[i] == 0)
+            })
+        return rows
+    
+    @traced('period_comparison.compare')
+    def compare(
+        self,
+        period: str = 'week',
+        hours: Optional[int] = None,
+        periods: int = 2,
+        end: Optional[datetime] = None,
+        dataset_id: Optional[str] = None
+    ) -> Dict:
+        """
+        Compara periodos consecutivos de igual duración
+        
+        Args:
+            period: 'day' o 'week' (se ignora si se indica `hours`)
+            hours: Duración del periodo en horas
+            periods: Número de periodos consecutivos (el último es el actual)
+            end: Fin del periodo actual (por defecto, la hora siguiente al último evento)
+            dataset_id: ID del dataset (None = default)
+        
+        Returns:
+            Dict con las métricas de cada periodo (orden cronológico) y la
+            variación del periodo actual respecto al anterior
+        
+        Raises:
+            ValueError: Si el dataset no tiene eventos o el tramo es demasiado largo
+        """
+        rollup = materialized_views.get('hourly_rollup', dataset_id)
+        if not len(rollup['hours']):
+            raise ValueError("No hay datos para comparar periodos")
+        
+        length = hours or COMPARISON_PERIODS[period]
+        if length * periods > MAX_COMPARISON_HOURS:
+            raise ValueError(f"El tramo comparado supera {MAX_COMPARISON_HOURS} horas")
+        one_hour = np.timedelta64(1, 'h')
+        if end is None:
+            end_hour = rollup['hours'][-1] + one_hour
+        else:
+            end_hour = pd.Timestamp(end).ceil('h').to_datetime64()
+        boundaries = end_hour - np.timedelta64(length, 'h') * np.arange(periods, -1, -1)
+        rows = np.searchsorted(rollup['hours'], boundaries, 'left')
+        
+        first, last = rollup['hours'][0], rollup['hours'][-1] + one_hour
+        windows, by_alert = [], []
+        for i in range(periods):
+            metrics, counts = self._window(rollup, rows[i], rows[i + 1])
+            by_alert.append(counts)
+            windows.append({
+                'start': pd.Timestamp(boundaries[i]).isoformat(),
+                'end': pd.Timestamp(boundaries[i + 1]).isoformat(),
+                # Un periodo que empieza antes del primer evento solo está cubierto en parte
+                'complete': bool(boundaries[i] >= first and boundaries[i + 1] <= last),
+                **metrics
+            })
+        
+        current, previous = windows[-1], windows[-2]
+        changes = {metric: _change(current[metric], previous[metric]) for metric in COMPARED_METRICS}
+        changes['nivel_riesgo_general'] = {
+            'current': current['nivel_riesgo_general'],
+            'previous': previous['nivel_riesgo_general'],
+            'changed': current['nivel_riesgo_general'] != previous['nivel_riesgo_general']
+        }
+        vectors = self._vector_changes(rollup, by_alert[-1], by_alert[-2])
+        
+        return {
+            'period_hours': length,
+            'periods': windows,
+            'changes': changes,
+            'vector_changes': vectors,
+            'rollup': {
+                'hours': int(len(rollup['hours'])),
+                'first_hour': pd.Timestamp(first).isoformat(),
+                'last_hour': pd.Timestamp(rollup['hours'][-1]).isoformat()
+            }
+        }
+
+
+# Instancia global
+period_comparison = PeriodComparison()
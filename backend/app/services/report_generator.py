@@ -187,10 +187,20 @@ class ReportGenerator:
         
         avg_score = sum(risk_scores.get(ip.nivel_riesgo, 1) for ip in ips) / len(ips)
         
-        if avg_score >= 3:
-            return "Crítico"
-        elif avg_score >= 2:
-            return "Alto"
-        elif avg_score >= 1.5:
-            return "Medio"
-        return "Bajo"
+        return risk_from_score(avg_score)
+
+
+def risk_from_score(avg_score: float) -> str:
+    """
+    Nivel de riesgo general a partir de la puntuación media de las IPs
+    
+    Args:
+        avg_score: Media de puntuaciones (Crítico 4, Alto 3, Medio 2, Bajo 1)
+    """
+    if avg_score >= 3:
+        return "Crítico"
+    elif avg_score >= 2:
+        return "Alto"
+    elif avg_score >= 1.5:
+        return "Medio"
+    return "Bajo"
@@ -0,0 +1,527 @@
+"""
+Renderizado de reportes ejecutivos en segundo plano con artefactos por versión de dataset
+"""
+import io
+import os
+import csv
+import json
+import html
+import time
+import uuid
+import shutil
+import asyncio
+import hashlib
+import zipfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from ..api.models.schemas import ReportData
+from ..core.config import settings
+from ..core.metrics import CACHE_HITS, CACHE_MISSES
+from ..utils.data_loader import data_loader
+from ..utils.storage import atomic_write_bytes
+from .data_analyzer import DataAnalyzer
+from .materialized_views import materialized_views
+from .period_comparison import period_comparison
+from .report_generator import ReportGenerator
+from .snapshot_store import get_code_version
+
+
+# Tipo de reporte -> título, ventana hasta el último evento (None = dataset
+# completo) y periodo con el que se compara el anterior
+REPORT_TYPES = {
+    'executive': {'title': 'Reporte Ejecutivo de Seguridad', 'window': None, 'compare': None},
+    'daily': {'title': 'Reporte Diario de Seguridad', 'window': pd.Timedelta(days=1), 'compare': 'day'},
+    'weekly': {'title': 'Reporte Semanal de Seguridad', 'window': pd.Timedelta(days=7), 'compare': 'week'}
+}
+
+# Formato -> (extensión del artefacto, media type)
+REPORT_FORMATS = {
+    'json': ('json', 'application/json'),
+    'html': ('html', 'text/html'),
+    'csv': ('zip', 'application/zip')
+}
+
+
+def build_report(report_type: str, dataset_id: Optional[str] = None) -> ReportData:
+    """
+    Calcula los datos de un reporte ejecutivo
+    
+    El reporte completo parte de las vistas materializadas; los periódicos
+    analizan solo el último día o semana hasta el último evento del
+    dataset (los datasets son históricos y no tienen por qué llegar a hoy)
+    e incluyen la comparación con el periodo anterior.
+    
+    Args:
+        report_type: Tipo de reporte (executive, daily, weekly)
+        dataset_id: ID del dataset (None = default)
+    
+    Returns:
+        Datos estructurados del reporte
+    """
+    df = data_loader.load_data(dataset_id)
+    if df.empty:
+        raise ValueError("No hay datos para generar reporte")
+    
+    window = REPORT_TYPES[report_type]['window']
+    if window is None:
+        ips = materialized_views.get('risk_index', dataset_id)['ips']
+        distribution = materialized_views.get('attack_distribution', dataset_id)
+    else:
+        df = df[df['timestamp'] > df['timestamp'].max() - window]
+        analyzer = DataAnalyzer(df)
+        ips = analyzer.get_suspicious_ips()
+        distribution = analyzer.get_attack_distribution()
+    
+    report = ReportGenerator(df).generate_executive_report(ips, distribution)
+    if REPORT_TYPES[report_type]['compare']:
+        report.comparacion_periodo = period_comparison.compare(
+            period=REPORT_TYPES[report_type]['compare'], dataset_id=dataset_id
+        )
+    return report
+
+
+# ----------------------------------------------------------------------
+# Formatos de salida (reciben el reporte ya en forma JSON)
+# ----------------------------------------------------------------------
+
+_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: Arial, Helvetica, sans-serif; margin: 2em auto; max-width: 960px; color: #1f2937; }}
+h1 {{ color: #1d4ed8; border-bottom: 3px solid #1d4ed8; padding-bottom: .3em; }}
+h2 {{ color: #111827; margin-top: 1.6em; }}
+table {{ border-collapse: collapse; width: 100%; }}
+th, td {{ border: 1px solid #d1d5db; padding: 6px 10px; text-align: left; vertical-align: top; }}
+th {{ background: #f3f4f6; }}
+.meta {{ color: #6b7280; }}
+.rec {{ border-left: 4px solid #2563eb; padding: .2em 1em; margin-bottom: 1em; background: #f9fafb; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p class="meta">Periodo analizado: {periodo} &middot; Generado: {generado}</p>
+<h2>Resumen Ejecutivo</h2>
+<p>{resumen}</p>
+<h2>Métricas Clave</h2>
+<table>{metricas}</table>
+{comparacion}
+<h2>Hallazgos Principales</h2>
+<ul>{hallazgos}</ul>
+<h2>IPs a Bloquear</h2>
+<table>
+<tr><th>IP</th><th>Ataques</th><th>Riesgo</th><th>Tipos de ataque</th><th>Puertos</th></tr>
+{ips}
+</table>
+<h2>Recomendaciones Estratégicas</h2>
+{recomendaciones}
+</body>
+</html>
+"""
+
+
+def _join(values: List) -> str:
+    return '; '.join(str(v) for v in values)
+
+
+def render_json(report: Dict) -> bytes:
+    """Reporte como JSON (mismo formato que /reports/executive)"""
+    return json.dumps(report, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def render_html(report: Dict, title: str) -> bytes:
+    """Reporte como página HTML autocontenida (imprimible a PDF desde el navegador)"""
+    e = html.escape
+    metricas = ''.join(
+        f"<tr><th>{e(key.replace('_', ' ').capitalize())}</th><td>{e(str(value))}</td></tr>"
+        for key, value in report['metricas_clave'].items()
+    )
+    hallazgos = ''.join(f"<li>{e(h)}</li>" for h in report['hallazgos_principales'])
+    ips = '\n'.join(
+        f"<tr><td>{e(ip['ip'])}</td><td>{ip['total_ataques']}</td><td>{e(ip['nivel_riesgo'])}</td>"
+        f"<td>{e(_join(ip['tipos_ataques']))}</td><td>{e(_join(ip['puertos_afectados']))}</td></tr>"
+        for ip in report['ips_bloqueadas_sugeridas']
+    )
+    comparacion = ''
+    if report.get('comparacion_periodo'):
+        rows = ''.join(
+            f"<tr><th>{e(name)}</th><td>{c['previous']}</td><td>{c['current']}</td>"
+            f"<td>{c['delta']:+d}</td><td>{_pct(c['delta_pct'])}</td></tr>"
+            for name, c in _comparison_rows(report['comparacion_periodo'])
+        )
+        comparacion = (
+            "<h2>Comparación con el Periodo Anterior</h2>"
+            "<table><tr><th></th><th>Anterior</th><th>Actual</th><th>Variación</th><th>%</th></tr>"
+            f"{rows}</table>"
+        )
+    recomendaciones = '\n'.join(
+        f"<div class=\"rec\"><h3>{e(r['titulo'])}</h3>"
+        f"<p class=\"meta\">{e(r['prioridad'])} &middot; {e(r['categoria'])}</p>"
+        f"<p>{e(r['descripcion'])}</p>"
+        f"<ul>{''.join(f'<li>{e(a)}</li>' for a in r['acciones'])}</ul></div>"
+        for r in report['recomendaciones']
+    )
+    
+    page = _HTML_TEMPLATE.format(
+        title=e(title),
+        periodo=e(report['periodo_analisis']),
+        generado=e(report['fecha_generacion']),
+        resumen=e(report['resumen_ejecutivo']),
+        metricas=metricas,
+        comparacion=comparacion,
+        hallazgos=hallazgos,
+        ips=ips,
+        recomendaciones=recomendaciones
+    )
+    return page.encode('utf-8')
+
+
+def _pct(value: Optional[float]) -> str:
+    return '' if value is None else f"{value:+.1f}%"
+
+
+def _comparison_rows(comparison: Dict) -> List[tuple]:
+    """Métricas numéricas y vectores de ataque de una comparación de periodos"""
+    rows = [
+        (name.replace('_', ' ').capitalize(), change)
+        for name, change in comparison['changes'].items() if 'delta' in change
+    ]
+    rows += [(change['alerta'], change) for change in comparison['vector_changes']]
+    return rows
+
+
+def _csv(header: List[str], rows: List[List]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    writer.writerows(rows)
+    # BOM para que Excel detecte UTF-8
+    return buffer.getvalue().encode('utf-8-sig')
+
+
+def render_csv_bundle(report: Dict) -> bytes:
+    """Reporte como zip con un CSV por sección"""
+    sections = {
+        'resumen.csv': _csv(['campo', 'valor'], [
+            ['fecha_generacion', report['fecha_generacion']],
+            ['periodo_analisis', report['periodo_analisis']],
+            ['resumen_ejecutivo', ' '.join(report['resumen_ejecutivo'].split())],
+            *[[key, value] for key, value in report['metricas_clave'].items()]
+        ]),
+        'hallazgos.csv': _csv(['hallazgo'], [[h] for h in report['hallazgos_principales']]),
+        'ips_bloqueadas.csv': _csv(
+            ['ip', 'total_ataques', 'nivel_riesgo', 'tipos_ataques', 'puertos_afectados', 'ultima_actividad'],
+            [
+                [ip['ip'], ip['total_ataques'], ip['nivel_riesgo'], _join(ip['tipos_ataques']),
+                 _join(ip['puertos_afectados']), ip['ultima_actividad']]
+                for ip in report['ips_bloqueadas_sugeridas']
+            ]
+        ),
+        'recomendaciones.csv': _csv(
+            ['prioridad', 'categoria', 'titulo', 'descripcion', 'acciones'],
+            [
+                [r['prioridad'], r['categoria'], r['titulo'], r['descripcion'], _join(r['acciones'])]
+                for r in report['recomendaciones']
+            ]
+        )
+    }
+    
+    if report.get('comparacion_periodo'):
+        sections['comparacion.csv'] = _csv(
+            ['metrica', 'anterior', 'actual', 'variacion', 'variacion_pct'],
+            [
+                [name, c['previous'], c['current'], c['delta'], c['delta_pct']]
+                for name, c in _comparison_rows(report['comparacion_periodo'])
+            ]
+        )
+    
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as bundle:
+        for name, content in sections.items():
+            bundle.writestr(name, content)
+    return buffer.getvalue()
+
+
+def render_artifacts(report: Dict, report_type: str) -> Dict[str, bytes]:
+    """Renderiza el reporte en todos los formatos (clave = formato)"""
+    return {
+        'html': render_html(report, REPORT_TYPES[report_type]['title']),
+        'csv': render_csv_bundle(report),
+        # El JSON se escribe el último: su presencia marca el reporte como completo
+        'json': render_json(report)
+    }
+
+
+def _digest(value: str, length: int = 16) -> str:
+    return hashlib.md5(value.encode('utf-8')).hexdigest()[:length]
+
+
+class ReportJobs:
+    """
+    Cola de renderizado de reportes y caché de artefactos en disco
+    
+    Un trabajo calcula el reporte una vez y escribe los tres formatos. Si
+    los artefactos de la versión actual del dataset ya existen no se
+    encola nada, y si hay un trabajo en curso para el mismo tipo y versión
+    se reutiliza. Al escribir una versión nueva se borran las anteriores.
+    Un hilo programador mantiene precalculados REPORT_SCHEDULED_TYPES del
+    dataset por defecto (comprueba la versión cada REPORT_SCHEDULE_INTERVAL).
+    
+    Estructura en disco:
+        <REPORTS_PATH>/<code_version>/<dataset>/<dataset_version>/<tipo>.<json|html|zip>
+    """
+    
+    def __init__(self, path: str = None, workers: int = None):
+        self.path = path or settings.REPORTS_PATH
+        self.workers = workers or settings.REPORT_WORKERS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._futures: Dict[str, Future] = {}
+        self._running: Dict[tuple, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._scheduler: Optional[threading.Thread] = None
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='report')
+        return self._executor
+    
+    # ------------------------------------------------------------------
+    # Artefactos
+    # ------------------------------------------------------------------
+    
+    def _dataset_dir(self, dataset_id: Optional[str]) -> str:
+        return os.path.join(self.path, get_code_version(), _digest(dataset_id or 'default'))
+    
+    def _artifact(self, dataset_id: Optional[str], dataset_version: str, report_type: str, fmt: str) -> str:
+        return os.path.join(
+            self._dataset_dir(dataset_id), _digest(dataset_version, 12),
+            f"{report_type}.{REPORT_FORMATS[fmt][0]}"
+        )
+    
+    def artifact_path(self, report_type: str, fmt: str, dataset_id: Optional[str] = None) -> Optional[str]:
+        """
+        Ruta del artefacto de la versión actual del dataset
+        
+        Args:
+            report_type: Tipo de reporte
+            fmt: Formato (json, html, csv)
+            dataset_id: ID del dataset (None = default)
+        
+        Returns:
+            Ruta del archivo, o None si aún no se ha renderizado
+        """
+        version = data_loader.get_dataset_version(dataset_id)
+        path = self._artifact(dataset_id, version, report_type, fmt)
+        if os.path.exists(self._artifact(dataset_id, version, report_type, 'json')) and os.path.exists(path):
+            CACHE_HITS.inc(cache='report')
+            return path
+        CACHE_MISSES.inc(cache='report')
+        return None
+    
+    def list_artifacts(self, dataset_id: Optional[str] = None) -> List[Dict]:
+        """Artefactos disponibles para la versión actual del dataset"""
+        version = data_loader.get_dataset_version(dataset_id)
+        artifacts = []
+        for report_type in REPORT_TYPES:
+            if not os.path.exists(self._artifact(dataset_id, version, report_type, 'json')):
+                continue
+            for fmt in REPORT_FORMATS:
+                path = self._artifact(dataset_id, version, report_type, fmt)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                artifacts.append({
+                    'report_type': report_type,
+                    'format': fmt,
+                    'size_bytes': stat.st_size,
+                    'created_at': datetime.fromtimestamp(stat.st_mtime).isoformat()
+                })
+        return artifacts
+    
+    def _write(self, dataset_id: Optional[str], dataset_version: str, report_type: str,
+               artifacts: Dict[str, bytes]) -> None:
+        version_dir = os.path.dirname(self._artifact(dataset_id, dataset_version, report_type, 'json'))
+        os.makedirs(version_dir, exist_ok=True)
+        for fmt, content in artifacts.items():
+            atomic_write_bytes(self._artifact(dataset_id, dataset_version, report_type, fmt), content)
+        
+        # Los reportes de versiones anteriores del dataset ya no son alcanzables
+        dataset_dir = os.path.dirname(version_dir)
+        for name in os.listdir(dataset_dir):
+            if os.path.join(dataset_dir, name) != version_dir:
+                shutil.rmtree(os.path.join(dataset_dir, name), ignore_errors=True)
+    
+    def invalidate(self, dataset_id: Optional[str] = None) -> None:
+        """Elimina los reportes renderizados de un dataset"""
+        shutil.rmtree(self._dataset_dir(dataset_id), ignore_errors=True)
+    
+    # ------------------------------------------------------------------
+    # Trabajos
+    # ------------------------------------------------------------------
+    
+    def submit(self, report_type: str, dataset_id: Optional[str] = None, source: str = 'api') -> Dict:
+        """
+        Encola el renderizado de un reporte
+        
+        Args:
+            report_type: Tipo de reporte (executive, daily, weekly)
+            dataset_id: ID del dataset (None = default)
+            source: Origen del trabajo ('api' o 'schedule')
+        
+        Returns:
+            Estado del trabajo (terminado al instante si ya estaba renderizado)
+        """
+        version = data_loader.get_dataset_version(dataset_id)
+        now = datetime.now().isoformat()
+        
+        with self._lock:
+            running = self._running.get((version, report_type))
+            if running in self._jobs:
+                return dict(self._jobs[running])
+            
+            job = {
+                'job_id': uuid.uuid4().hex[:12],
+                'report_type': report_type,
+                'dataset_id': dataset_id,
+                'dataset_version': version,
+                'source': source,
+                'status': 'queued',
+                'cached': False,
+                'created_at': now,
+                'finished_at': None,
+                'duration_ms': None,
+                'error': None
+            }
+            if os.path.exists(self._artifact(dataset_id, version, report_type, 'json')):
+                job.update(status='done', cached=True, finished_at=now, duration_ms=0.0)
+                self._remember(job)
+                return dict(job)
+            
+            self._remember(job)
+            self._running[(version, report_type)] = job['job_id']
+            self._futures[job['job_id']] = self._get_executor().submit(self._run, job)
+        return dict(job)
+    
+    def _remember(self, job: Dict) -> None:
+        self._jobs[job['job_id']] = job
+        while len(self._jobs) > settings.REPORT_JOBS_MAX:
+            self._jobs.popitem(last=False)
+    
+    def _run(self, job: Dict) -> None:
+        job['status'] = 'running'
+        started = time.perf_counter()
+        try:
+            report = jsonable_encoder(build_report(job['report_type'], job['dataset_id']))
+            artifacts = render_artifacts(report, job['report_type'])
+            self._write(job['dataset_id'], job['dataset_version'], job['report_type'], artifacts)
+            job['sizes'] = {fmt: len(content) for fmt, content in artifacts.items()}
+            job['status'] = 'done'
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+            print(f" Error generando reporte {job['report_type']}: {e}")
+        finally:
+            job['finished_at'] = datetime.now().isoformat()
+            job['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            with self._lock:
+                self._running.pop((job['dataset_version'], job['report_type']), None)
+                self._futures.pop(job['job_id'], None)
+    
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Estado de un trabajo (None si no existe o ya se olvidó)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+    
+    def list_jobs(self, limit: int = 50) -> List[Dict]:
+        """Trabajos recientes (más recientes primero)"""
+        with self._lock:
+            return [dict(job) for job in reversed(self._jobs.values())][:limit]
+    
+    async def wait(self, job_id: str) -> Optional[Dict]:
+        """Espera a que termine un trabajo sin bloquear el event loop"""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            await asyncio.wrap_future(future)
+        return self.get(job_id)
+    
+    async def fetch(self, report_type: str, fmt: str, dataset_id: Optional[str] = None) -> bytes:
+        """
+        Contenido de un artefacto, renderizándolo si aún no existe
+        
+        Args:
+            report_type: Tipo de reporte
+            fmt: Formato (json, html, csv)
+            dataset_id: ID del dataset (None = default)
+        
+        Returns:
+            Bytes del artefacto
+        
+        Raises:
+            ValueError: Si el renderizado falla (p. ej. dataset sin datos)
+        """
+        path = self.artifact_path(report_type, fmt, dataset_id)
+        if path is None:
+            job = await self.wait(self.submit(report_type, dataset_id)['job_id'])
+            if job['status'] != 'done':
+                raise ValueError(job['error'] or "No se pudo generar el reporte")
+            path = self._artifact(dataset_id, job['dataset_version'], report_type, fmt)
+        with open(path, 'rb') as f:
+            return f.read()
+    
+    # ------------------------------------------------------------------
+    # Reportes programados
+    # ------------------------------------------------------------------
+    
+    def schedule(self) -> List[Dict]:
+        """Encola los reportes programados del dataset por defecto que falten"""
+        version = data_loader.get_dataset_version()
+        return [
+            self.submit(report_type, None, source='schedule')
+            for report_type in settings.REPORT_SCHEDULED_TYPES
+            if not os.path.exists(self._artifact(None, version, report_type, 'json'))
+        ]
+    
+    def start_scheduler(self) -> Dict:
+        """
+        Encola los reportes programados y lanza el hilo que los mantiene al día
+        
+        Returns:
+            Trabajos encolados e intervalo de comprobación
+        """
+        queued = self.schedule()
+        interval = settings.REPORT_SCHEDULE_INTERVAL
+        if interval > 0 and (self._scheduler is None or not self._scheduler.is_alive()):
+            self._stop.clear()
+            self._scheduler = threading.Thread(target=self._run_scheduler, name='report-scheduler', daemon=True)
+            self._scheduler.start()
+        return {'queued': len(queued), 'interval_s': interval}
+    
+    def _run_scheduler(self) -> None:
+        while not self._stop.wait(settings.REPORT_SCHEDULE_INTERVAL):
+            try:
+                self.schedule()
+            except Exception as e:
+                print(f" Error programando reportes: {e}")
+    
+    def shutdown(self) -> None:
+        """Detiene el programador y descarta los trabajos aún no iniciados"""
+        self._stop.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Instancia global
+report_jobs = ReportJobs()
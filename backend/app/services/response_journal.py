@@ -0,0 +1,306 @@
+"""
+Diario de acciones de respuesta: buffer en memoria acotado y segmentos NDJSON en disco
+"""
+import os
+import json
+import glob
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+from ..core.config import settings
+from ..utils.storage import file_lock
+
+
+class ResponseJournal:
+    """
+    Registro de solo-añadido de las acciones de respuesta generadas
+    
+    Las entradas se guardan en un buffer circular (JOURNAL_BUFFER_SIZE) con
+    índices por IP y por tipo de acción, y se escriben en disco desde un
+    hilo propio: `record()` solo encola, así que no añade latencia a los
+    endpoints. En disco se rota por tamaño en segmentos
+    `journal-<seq>.ndjson` y se conservan los JOURNAL_MAX_SEGMENTS últimos.
+    Al arrancar (warm-up o hilo de escritura), el buffer se rellena con la
+    cola de los segmentos.
+    """
+    
+    def __init__(self, path: str = None, capacity: int = None):
+        self.path = path or settings.JOURNAL_PATH
+        self.capacity = capacity or settings.JOURNAL_BUFFER_SIZE
+        self._entries: deque = deque()
+        self._by_ip: Dict[str, deque] = {}
+        self._by_action: Dict[str, deque] = {}
+        self._pending: List[Dict] = []
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._writer: Optional[threading.Thread] = None
+        self._loaded = False
+        self._loading = False
+        self._seq_ready = False
+    
+    # ------------------------------------------------------------------
+    # Buffer e índices
+    # ------------------------------------------------------------------
+    
+    def _index(self, entry: Dict) -> None:
+        if len(self._entries) >= self.capacity:
+            self._evict(self._entries.popleft())
+        self._entries.append(entry)
+        for ip in entry['ips']:
+            self._by_ip.setdefault(ip, deque()).append(entry)
+        self._by_action.setdefault(entry['action'], deque()).append(entry)
+    
+    def _evict(self, entry: Dict) -> None:
+        # Las entradas llegan en orden: la más antigua de cada índice está a la izquierda
+        for ip in entry['ips']:
+            bucket = self._by_ip[ip]
+            bucket.popleft()
+            if not bucket:
+                del self._by_ip[ip]
+        bucket = self._by_action[entry['action']]
+        bucket.popleft()
+        if not bucket:
+            del self._by_action[entry['action']]
+    
+    def load(self) -> int:
+        """
+        Rellena el buffer con las últimas entradas escritas en disco
+        
+        Los segmentos se leen sin el lock, del más reciente al más antiguo
+        hasta llenar la capacidad del buffer; luego las entradas se colocan
+        delante de las registradas mientras tanto. Se ejecuta en el warm-up
+        o en el hilo de escritura, nunca en `record()`.
+        
+        Returns:
+            Número de entradas recuperadas
+        """
+        with self._lock:
+            if self._loaded or self._loading:
+                return 0
+            self._loading = True
+        
+        lines: List[str] = []
+        for segment in reversed(self._segments()):
+            try:
+                with open(segment, 'r') as f:
+                    lines = f.readlines() + lines
+            except FileNotFoundError:
+                continue
+            if len(lines) >= self.capacity:
+                break
+        
+        restored = []
+        for line in lines[-self.capacity:]:
+            try:
+                restored.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        
+        with self._lock:
+            # Las entradas ya en memoria son más recientes que las del disco
+            first = self._entries[0]['seq'] if self._entries else None
+            restored = [entry for entry in restored if first is None or entry['seq'] < first]
+            current = list(self._entries)
+            self._entries.clear()
+            self._by_ip.clear()
+            self._by_action.clear()
+            for entry in restored + current:
+                self._index(entry)
+            if restored:
+                self._seq = max(self._seq, restored[-1]['seq'])
+            self._loaded = True
+            self._loading = False
+        return len(restored)
+    
+    def _last_seq(self) -> int:
+        """Último número de secuencia en disco (solo lee el final del último segmento)"""
+        segments = self._segments()
+        if not segments:
+            return 0
+        # El nombre del segmento lleva el seq de su primera entrada
+        last = int(os.path.basename(segments[-1])[len('journal-'):-len('.ndjson')])
+        try:
+            with open(segments[-1], 'rb') as f:
+                f.seek(max(0, os.path.getsize(segments[-1]) - 65536))
+                tail = f.read().splitlines()
+        except OSError:
+            return last
+        for line in reversed(tail):
+            try:
+                return max(last, json.loads(line)['seq'])
+            except (ValueError, KeyError):
+                continue
+        return last
+    
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    
+    def record(self, action: str, ips: Optional[List[str]] = None, **summary) -> Dict:
+        """
+        Registra una acción de respuesta
+        
+        Args:
+            action: Tipo de acción (firewall_rules, remediation_playbook...)
+            ips: IPs afectadas (se indexan hasta JOURNAL_MAX_IPS_PER_ENTRY)
+            **summary: Resumen de la acción (parámetros, totales, versión...)
+        
+        Returns:
+            Entrada registrada
+        """
+        ips = list(dict.fromkeys(ips or []))
+        if len(ips) > settings.JOURNAL_MAX_IPS_PER_ENTRY:
+            summary['total_ips'] = len(ips)
+            summary['ips_truncated'] = True
+            ips = ips[:settings.JOURNAL_MAX_IPS_PER_ENTRY]
+        
+        with self._lock:
+            if not self._seq_ready:
+                self._seq = max(self._seq, self._last_seq())
+                self._seq_ready = True
+            self._seq += 1
+            entry = {
+                'seq': self._seq,
+                'timestamp': datetime.now().isoformat(),
+                'action': action,
+                'ips': ips,
+                'summary': summary
+            }
+            self._index(entry)
+            self._pending.append(entry)
+            self._ensure_writer()
+        self._wakeup.set()
+        return entry
+    
+    def _ensure_writer(self) -> None:
+        if self._writer is None or not self._writer.is_alive():
+            self._stopping = False
+            self._writer = threading.Thread(target=self._run_writer, name='response-journal', daemon=True)
+            self._writer.start()
+    
+    def _run_writer(self) -> None:
+        # Sin warm-up (scripts, tests), la cola del disco se recupera aquí
+        self.load()
+        while True:
+            # Agrupa las entradas que lleguen durante el intervalo en una sola escritura
+            self._wakeup.wait()
+            if not self._stopping:
+                self._wakeup.wait(settings.JOURNAL_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            self.flush()
+            if self._stopping:
+                return
+    
+    def flush(self) -> int:
+        """
+        Escribe en disco las entradas pendientes
+        
+        Returns:
+            Número de entradas escritas
+        """
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        
+        payload = ''.join(json.dumps(entry, default=str, ensure_ascii=False) + '\n' for entry in batch)
+        os.makedirs(self.path, exist_ok=True)
+        try:
+            with file_lock(os.path.join(self.path, 'journal')):
+                segments = self._segments()
+                current = segments[-1] if segments else None
+                if current is None or os.path.getsize(current) >= settings.JOURNAL_SEGMENT_BYTES:
+                    current = os.path.join(self.path, f"journal-{batch[0]['seq']:012d}.ndjson")
+                    segments.append(current)
+                with open(current, 'a') as f:
+                    f.write(payload)
+                for old in segments[:-settings.JOURNAL_MAX_SEGMENTS]:
+                    os.remove(old)
+        except OSError as e:
+            print(f" Error escribiendo el diario de respuesta: {e}")
+            return 0
+        return len(batch)
+    
+    def close(self) -> None:
+        """Vacía las entradas pendientes y detiene el hilo de escritura"""
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            self._stopping = True
+            self._wakeup.set()
+            writer.join(timeout=5)
+        self.flush()
+    
+    def _segments(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.path, 'journal-*.ndjson')))
+    
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+    
+    def query(
+        self,
+        ip: Optional[str] = None,
+        action: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 100
+    ) -> Dict:
+        """
+        Entradas del buffer que cumplen los filtros (más recientes primero)
+        
+        Se recorre el índice más pequeño de los aplicables desde el final y
+        se corta al salir del rango temporal o al llegar a `limit`.
+        
+        Args:
+            ip: IP afectada
+            action: Tipo de acción
+            start: Desde (incluido)
+            end: Hasta (excluido)
+            limit: Máximo de entradas
+        
+        Returns:
+            Dict con las entradas y el tamaño del buffer
+        """
+        start_iso = start.isoformat() if start else None
+        end_iso = end.isoformat() if end else None
+        
+        if not self._loaded:
+            self.load()
+        
+        with self._lock:
+            candidates = [self._entries]
+            if ip is not None:
+                candidates.append(self._by_ip.get(ip, deque()))
+            if action is not None:
+                candidates.append(self._by_action.get(action, deque()))
+            source = list(min(candidates, key=len))
+            buffered = len(self._entries)
+            actions = {name: len(entries) for name, entries in self._by_action.items()}
+        
+        entries = []
+        for entry in reversed(source):
+            if end_iso and entry['timestamp'] >= end_iso:
+                continue
+            if start_iso and entry['timestamp'] < start_iso:
+                break
+            if ip is not None and ip not in entry['ips']:
+                continue
+            if action is not None and entry['action'] != action:
+                continue
+            entries.append(entry)
+            if len(entries) >= limit:
+                break
+        
+        return {
+            'buffered': buffered,
+            'capacity': self.capacity,
+            'actions': actions,
+            'entries': entries
+        }
+
+
+# Instancia global
+response_journal = ResponseJournal()
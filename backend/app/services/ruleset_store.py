@@ -0,0 +1,146 @@
+"""
+Historial de versiones de los rulesets de firewall generados
+"""
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from ..core.config import settings
+from ..utils.storage import file_lock, atomic_write_json
+
+
+class RulesetStore:
+    """
+    Guarda cada ruleset distinto como una versión numerada
+    
+    Un ruleset es la lista de bloques CIDR bloqueados (IPv4 e IPv6). Cada
+    combinación de parámetros (p. ej. `min_risk_level`) tiene su propio
+    historial: si el ruleset generado coincide con la última versión del
+    mismo historial no se crea otra, y la poda (RULESETS_MAX) se aplica por
+    historial, así que alternar parámetros no descarta las versiones de
+    las que parten otros firewalls. Los números de versión son globales.
+    
+    Estructura en disco:
+        <RULESETS_PATH>/index.json   (versiones y última)
+        <RULESETS_PATH>/v<N>.json    (bloques de la versión N)
+    """
+    
+    def __init__(self, path: str = None, max_versions: int = None):
+        self.path = path or settings.RULESETS_PATH
+        self.max_versions = max_versions or settings.RULESETS_MAX
+        self._cache: Dict[int, Dict] = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.path, 'index.json')
+    
+    def _version_path(self, version: int) -> str:
+        return os.path.join(self.path, f"v{version}.json")
+    
+    def _read_index(self) -> Dict:
+        try:
+            with open(self._index_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'latest': 0, 'versions': []}
+    
+    @staticmethod
+    def _history(params: Optional[Dict]) -> str:
+        """Clave del historial de unos parámetros"""
+        return json.dumps(params or {}, sort_keys=True)
+    
+    @staticmethod
+    def _digest(v4: List[str], v6: List[str]) -> str:
+        return hashlib.sha1('\n'.join(v4 + v6).encode('utf-8')).hexdigest()
+    
+    def record(self, v4: List[str], v6: List[str], params: Dict = None) -> Dict:
+        """
+        Registra un ruleset (o devuelve la última versión si no cambió)
+        
+        Args:
+            v4: Bloques CIDR IPv4
+            v6: Bloques CIDR IPv6
+            params: Parámetros con los que se generó
+        
+        Returns:
+            Entrada de la versión (version, created_at, digest, total_networks)
+        """
+        os.makedirs(self.path, exist_ok=True)
+        digest = self._digest(v4, v6)
+        
+        history = self._history(params)
+        
+        with file_lock(self._index_path):
+            index = self._read_index()
+            same = [v for v in index['versions'] if self._history(v.get('params')) == history]
+            if same and same[-1]['digest'] == digest:
+                return same[-1]
+            
+            entry = {
+                'version': index['latest'] + 1,
+                'created_at': datetime.now().isoformat(),
+                'digest': digest,
+                'total_networks': len(v4) + len(v6),
+                'params': params or {}
+            }
+            ruleset = {**entry, 'v4': v4, 'v6': v6}
+            atomic_write_json(self._version_path(entry['version']), ruleset, indent=None)
+            
+            index['latest'] = entry['version']
+            index['versions'].append(entry)
+            pruned = {old['version'] for old in (same + [entry])[:-self.max_versions]}
+            for version in pruned:
+                try:
+                    os.remove(self._version_path(version))
+                except FileNotFoundError:
+                    pass
+                with self._lock:
+                    self._cache.pop(version, None)
+            index['versions'] = [v for v in index['versions'] if v['version'] not in pruned]
+            atomic_write_json(self._index_path, index)
+        
+        with self._lock:
+            self._cache[entry['version']] = ruleset
+        return entry
+    
+    def get(self, version: int) -> Optional[Dict]:
+        """
+        Ruleset completo de una versión
+        
+        Args:
+            version: Número de versión
+        
+        Returns:
+            Dict con v4, v6 y metadatos, o None si no existe (o se podó)
+        """
+        with self._lock:
+            if version in self._cache:
+                return self._cache[version]
+        try:
+            with open(self._version_path(version), 'r') as f:
+                ruleset = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        with self._lock:
+            self._cache[version] = ruleset
+        return ruleset
+    
+    def list_versions(self, params: Optional[Dict] = None) -> List[Dict]:
+        """
+        Versiones disponibles (más recientes primero)
+        
+        Args:
+            params: Solo las del historial de estos parámetros (None = todas)
+        """
+        versions = self._read_index()['versions']
+        if params is not None:
+            history = self._history(params)
+            versions = [v for v in versions if self._history(v.get('params')) == history]
+        return list(reversed(versions))
+
+
+# Instancia global
+ruleset_store = RulesetStore()
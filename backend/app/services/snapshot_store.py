@@ -0,0 +1,273 @@
+"""
+Snapshots persistentes de resultados de análisis (memoria → disco → cálculo)
+"""
+import os
+import json
+import shutil
+import asyncio
+import hashlib
+import inspect
+import functools
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from fastapi.encoders import jsonable_encoder
+from ..core.config import settings
+from ..core.metrics import CACHE_HITS, CACHE_MISSES
+from ..utils.storage import atomic_write_json
+from ..utils.data_loader import data_loader
+
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_code_version: Optional[str] = None
+
+
+def get_code_version() -> str:
+    """
+    Versión del código: hash de los fuentes .py del paquete app
+    
+    Cualquier cambio de código (deploy) invalida los snapshots anteriores.
+    """
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha1()
+        for root, dirs, files in os.walk(_APP_DIR):
+            dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+            for name in sorted(files):
+                if name.endswith('.py'):
+                    path = os.path.join(root, name)
+                    digest.update(os.path.relpath(path, _APP_DIR).encode('utf-8'))
+                    with open(path, 'rb') as f:
+                        digest.update(f.read())
+        _code_version = digest.hexdigest()[:12]
+    return _code_version
+
+
+def _digest(value: str, length: int = 16) -> str:
+    return hashlib.md5(value.encode('utf-8')).hexdigest()[:length]
+
+
+class SnapshotStore:
+    """
+    Almacén de artefactos calculados por versión de dataset y de código
+    
+    Estructura en disco:
+        <SNAPSHOT_PATH>/<code_version>/<dataset>/<dataset_version>/<artefacto>-<params>.json
+    
+    Un cambio en el CSV (nueva versión de dataset) o en el código genera
+    claves nuevas; los directorios de versiones anteriores se eliminan.
+    """
+    
+    def __init__(self, path: str = None, memory_items: int = None):
+        self.path = path or settings.SNAPSHOT_PATH
+        self.memory_items = memory_items or settings.SNAPSHOT_MEMORY_ITEMS
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _dataset_dir(self, dataset_id: Optional[str]) -> str:
+        return os.path.join(self.path, get_code_version(), _digest(dataset_id or 'default'))
+    
+    def _entry_path(self, artifact: str, dataset_id: Optional[str], dataset_version: str, params: Dict) -> str:
+        params_key = _digest(json.dumps(params, sort_keys=True, default=str))
+        return os.path.join(
+            self._dataset_dir(dataset_id), _digest(dataset_version, 12), f"{artifact}-{params_key}.json"
+        )
+    
+    def _remember(self, path: str, value: Any) -> None:
+        with self._lock:
+            self._memory[path] = value
+            self._memory.move_to_end(path)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+    
+    def get_or_compute(self, artifact: str, dataset_id: Optional[str], params: Dict, compute: Callable[[], Any]) -> Any:
+        """
+        Obtiene un artefacto de memoria o disco, calculándolo si no existe
+        
+        Args:
+            artifact: Nombre del artefacto (p. ej. 'dashboard-stats')
+            dataset_id: ID del dataset (None = default)
+            params: Parámetros que afectan al resultado
+            compute: Función que calcula el artefacto
+        
+        Returns:
+            Artefacto en forma JSON (dicts, listas y escalares)
+        """
+        key = self._resolve(artifact, dataset_id, params)
+        if key is None:
+            return compute()
+        
+        value = self._lookup(key[0])
+        if value is None:
+            value = jsonable_encoder(compute())
+            self._write(*key, artifact, dataset_id, params, value)
+        return value
+    
+    async def get_or_compute_async(self, artifact: str, dataset_id: Optional[str], params: Dict, compute: Callable) -> Any:
+        """Igual que get_or_compute para funciones de cálculo asíncronas"""
+        key = self._resolve(artifact, dataset_id, params)
+        if key is None:
+            return await compute()
+        
+        value = self._lookup(key[0])
+        if value is None:
+            value = jsonable_encoder(await compute())
+            self._write(*key, artifact, dataset_id, params, value)
+        return value
+    
+    def _resolve(self, artifact: str, dataset_id: Optional[str], params: Dict) -> Optional[tuple]:
+        """(ruta, versión de dataset) del artefacto, o None si no se debe cachear"""
+        dataset_version = data_loader.get_dataset_version(dataset_id)
+        if not settings.SNAPSHOTS_ENABLED or dataset_version.endswith(':None'):
+            return None
+        return self._entry_path(artifact, dataset_id, dataset_version, params), dataset_version
+    
+    def _lookup(self, path: str) -> Any:
+        with self._lock:
+            if path in self._memory:
+                self._memory.move_to_end(path)
+                CACHE_HITS.inc(cache='snapshot_memory')
+                return self._memory[path]
+        
+        try:
+            with open(path, 'r') as f:
+                value = json.load(f)['value']
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            CACHE_MISSES.inc(cache='snapshot')
+            return None
+        
+        CACHE_HITS.inc(cache='snapshot_disk')
+        self._remember(path, value)
+        return value
+    
+    def _write(self, path: str, dataset_version: str, artifact: str, dataset_id: Optional[str], params: Dict, value: Any) -> None:
+        version_dir = os.path.dirname(path)
+        os.makedirs(version_dir, exist_ok=True)
+        atomic_write_json(path, {
+            'artifact': artifact,
+            'dataset_id': dataset_id,
+            'dataset_version': dataset_version,
+            'code_version': get_code_version(),
+            'params': params,
+            'created_at': datetime.now().isoformat(),
+            'value': value
+        }, indent=None)
+        self._remember(path, value)
+        
+        # Las versiones anteriores del mismo dataset ya no son alcanzables
+        dataset_dir = os.path.dirname(version_dir)
+        for name in os.listdir(dataset_dir):
+            if os.path.join(dataset_dir, name) != version_dir:
+                self._drop_dir(os.path.join(dataset_dir, name))
+    
+    def _drop_dir(self, path: str) -> None:
+        shutil.rmtree(path, ignore_errors=True)
+        with self._lock:
+            for key in [k for k in self._memory if k.startswith(path + os.sep)]:
+                del self._memory[key]
+    
+    def invalidate(self, dataset_id: Optional[str] = None) -> None:
+        """Elimina los snapshots de un dataset"""
+        self._drop_dir(self._dataset_dir(dataset_id))
+    
+    def load_all(self) -> Dict:
+        """
+        Carga en memoria los snapshots vigentes y limpia los obsoletos
+        
+        Returns:
+            Contadores de snapshots cargados y directorios eliminados
+        """
+        loaded = 0
+        dropped = 0
+        if not os.path.isdir(self.path):
+            return {'loaded': 0, 'dropped': 0, 'code_version': get_code_version()}
+        
+        for name in os.listdir(self.path):
+            if name != get_code_version():
+                self._drop_dir(os.path.join(self.path, name))
+                dropped += 1
+        
+        code_dir = os.path.join(self.path, get_code_version())
+        for dataset_key in os.listdir(code_dir) if os.path.isdir(code_dir) else []:
+            dataset_dir = os.path.join(code_dir, dataset_key)
+            for version_key in os.listdir(dataset_dir):
+                version_dir = os.path.join(dataset_dir, version_key)
+                files = sorted(f for f in os.listdir(version_dir) if f.endswith('.json'))
+                for i, name in enumerate(files):
+                    path = os.path.join(version_dir, name)
+                    try:
+                        with open(path, 'r') as f:
+                            entry = json.load(f)
+                    except (OSError, json.JSONDecodeError):
+                        continue
+                    
+                    # Todos los archivos del directorio comparten versión de dataset
+                    if i == 0 and entry['dataset_version'] != data_loader.get_dataset_version(entry['dataset_id']):
+                        self._drop_dir(version_dir)
+                        dropped += 1
+                        break
+                    if loaded < self.memory_items:
+                        self._remember(path, entry['value'])
+                        loaded += 1
+        
+        return {'loaded': loaded, 'dropped': dropped, 'code_version': get_code_version()}
+
+
+# Instancia global
+snapshot_store = SnapshotStore()
+
+# Endpoints registrados con @snapshot: se precalculan en el warm-up
+_warmable: List[Callable] = []
+
+
+def snapshot(artifact: str, warm: bool = True) -> Callable:
+    """
+    Decorador para endpoints GET cuyo resultado depende solo de sus
+    parámetros y del dataset (parámetro opcional `dataset_id`)
+    
+    Args:
+        artifact: Nombre del artefacto
+        warm: Precalcular con los parámetros por defecto durante el warm-up
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(**kwargs):
+            return await snapshot_store.get_or_compute_async(
+                artifact, kwargs.get('dataset_id'), kwargs, lambda: fn(**kwargs)
+            )
+        
+        if warm:
+            _warmable.append(wrapper)
+        return wrapper
+    return decorator
+
+
+def _default_kwargs(fn: Callable) -> Optional[Dict]:
+    """Parámetros por defecto de un endpoint (None si alguno es obligatorio)"""
+    kwargs = {}
+    for name, param in inspect.signature(fn).parameters.items():
+        default = param.default
+        if default is inspect.Parameter.empty:
+            return None
+        # Query(...) de FastAPI guarda el valor por defecto en .default
+        default = getattr(default, 'default', default)
+        if default is Ellipsis:
+            return None
+        kwargs[name] = default
+    return kwargs
+
+
+def warm_snapshots() -> Dict:
+    """Calcula (o carga) los artefactos registrados para el dataset por defecto"""
+    warmed = 0
+    for endpoint in _warmable:
+        kwargs = _default_kwargs(endpoint)
+        if kwargs is None:
+            continue
+        try:
+            asyncio.run(endpoint(**kwargs))
+            warmed += 1
+        except Exception as e:
+            print(f" Snapshot {endpoint.__name__} no precalculado: {e}")
+    return {'warmed': warmed}
@@ -0,0 +1,475 @@
+"""
+Motor SQL analítico embebido (DuckDB o SQLite) como alternativa a pandas
+"""
+import os
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from ..api.models.schemas import RiskLevel
+from ..core.config import settings
+from ..core.metrics import ROWS_PROCESSED
+from ..core.tracing import span, traced
+from ..utils.data_loader import data_loader
+from .event_export import iter_event_chunks, EXPORT_COLUMNS
+from .threat_detector import ThreatDetector
+
+
+class SQLDialect:
+    """Expresiones que difieren entre motores"""
+    
+    name = 'sqlite'
+    
+    @staticmethod
+    def hour_floor(column: str) -> str:
+        # Timestamps guardados como texto ISO 'YYYY-MM-DD HH:MM:SS.ffffff'
+        return f"substr({column}, 1, 13) || ':00:00'"
+    
+    @staticmethod
+    def hour_of_day(column: str) -> str:
+        return f"CAST(substr({column}, 12, 2) AS INTEGER)"
+
+
+class DuckDBDialect(SQLDialect):
+    name = 'duckdb'
+    
+    @staticmethod
+    def hour_floor(column: str) -> str:
+        return f"date_trunc('hour', {column})"
+    
+    @staticmethod
+    def hour_of_day(column: str) -> str:
+        return f"hour({column})"
+
+
+def _duckdb_available() -> bool:
+    try:
+        import duckdb  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class SQLEngine:
+    """
+    Datasets registrados como tablas de un motor SQL en proceso
+    
+    Cada dataset es una tabla `events_<hash>` con las columnas de eventos y
+    un `seq` con el orden original de las filas (para reproducir el orden de
+    primera aparición de pandas). Con DuckDB las consultas se ejecutan en
+    paralelo y los agregados que no caben en memoria se vuelcan a disco
+    (SQL_ENGINE_PATH); con SQLite la tabla vive en un archivo en disco.
+    """
+    
+    def __init__(self):
+        self._conn = None
+        self.dialect: Optional[SQLDialect] = None
+        self._tables: Dict[str, Tuple[str, str]] = {}  # dataset -> (tabla, versión)
+        self._lock = threading.RLock()
+    
+    @property
+    def backend(self) -> str:
+        choice = settings.SQL_ENGINE_BACKEND
+        if choice == 'auto':
+            return 'duckdb' if _duckdb_available() else 'sqlite'
+        return choice
+    
+    def _connect(self):
+        if self._conn is not None:
+            return self._conn
+        
+        os.makedirs(settings.SQL_ENGINE_PATH, exist_ok=True)
+        self._remove_stale_files()
+        if self.backend == 'duckdb':
+            import duckdb
+            
+            self._conn = duckdb.connect(self._database_path('duckdb'))
+            threads = settings.SQL_ENGINE_THREADS or os.cpu_count() or 1
+            self._conn.execute(f"SET threads TO {int(threads)}")
+            self._conn.execute(f"SET temp_directory = '{os.path.join(settings.SQL_ENGINE_PATH, 'spill')}'")
+            if settings.SQL_ENGINE_MEMORY_LIMIT:
+                self._conn.execute(f"SET memory_limit = '{settings.SQL_ENGINE_MEMORY_LIMIT}'")
+            self.dialect = DuckDBDialect()
+        else:
+            self._conn = sqlite3.connect(self._database_path('sqlite3'), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA temp_store = FILE")
+            self.dialect = SQLDialect()
+        
+        print(f"✓ Motor SQL analítico: {self.dialect.name}")
+        return self._conn
+    
+    @staticmethod
+    def _database_path(extension: str) -> str:
+        # Un archivo por proceso: cada worker de uvicorn tiene sus tablas
+        return os.path.join(settings.SQL_ENGINE_PATH, f"analytics-{os.getpid()}.{extension}")
+    
+    @staticmethod
+    def _remove_stale_files() -> None:
+        """Elimina bases de datos de procesos que ya no existen"""
+        for name in os.listdir(settings.SQL_ENGINE_PATH):
+            pid = name.split('.')[0].split('-')[-1]
+            if not name.startswith('analytics-') or not pid.isdigit():
+                continue
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                path = os.path.join(settings.SQL_ENGINE_PATH, name)
+                if os.path.isdir(path):
+                    continue
+                os.remove(path)
+            except PermissionError:
+                pass
+    
+    def execute(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        """Ejecuta una consulta y devuelve todas las filas"""
+        with self._lock:
+            conn = self._connect()
+            if self.dialect.name == 'duckdb':
+                return conn.cursor().execute(sql, params).fetchall()
+            return conn.execute(sql, params).fetchall()
+    
+    @staticmethod
+    def _table_name(dataset_id: Optional[str]) -> str:
+        return 'events_' + hashlib.md5((dataset_id or 'default').encode('utf-8')).hexdigest()[:12]
+    
+    def _insert_chunk(self, table: str, chunk: pd.DataFrame, first_seq: int) -> None:
+        conn = self._connect()
+        if self.dialect.name == 'duckdb':
+            frame = chunk.assign(seq=np.arange(first_seq, first_seq + len(chunk)))[['seq'] + EXPORT_COLUMNS]
+            conn.register('_chunk', frame)
+            conn.execute(f"INSERT INTO {table} SELECT * FROM _chunk")
+            conn.unregister('_chunk')
+        else:
+            timestamps = chunk['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+            rows = zip(
+                range(first_seq, first_seq + len(chunk)), timestamps, chunk['ip_origen'].astype(str),
+                chunk['ip_destino'].astype(str), chunk['puerto'].astype(int).tolist(),
+                chunk['protocolo'].astype(str), chunk['alerta'].astype(str)
+            )
+            conn.executemany(f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        ROWS_PROCESSED.inc(len(chunk), service='sql_engine')
+    
+    @traced('SQLEngine.load')
+    def _load(self, dataset_id: Optional[str], table: str) -> None:
+        """Carga el CSV del dataset en su tabla (por bloques, sin cargarlo entero)"""
+        conn = self._connect()
+        timestamp_type = 'TIMESTAMP' if self.dialect.name == 'duckdb' else 'TEXT'
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(
+            f"CREATE TABLE {table} (seq BIGINT, timestamp {timestamp_type}, ip_origen VARCHAR, "
+            f"ip_destino VARCHAR, puerto BIGINT, protocolo VARCHAR, alerta VARCHAR)"
+        )
+        seq = 0
+        for chunk in iter_event_chunks(dataset_id):
+            self._insert_chunk(table, chunk, seq)
+            seq += len(chunk)
+        if self.dialect.name == 'sqlite':
+            conn.commit()
+    
+    def table(self, dataset_id: Optional[str] = None) -> str:
+        """
+        Tabla vigente de un dataset (se recarga si cambió el CSV)
+        
+        Args:
+            dataset_id: ID del dataset (None = default)
+        """
+        key = dataset_id or 'default'
+        version = data_loader.get_dataset_version(dataset_id)
+        with self._lock:
+            entry = self._tables.get(key)
+            if entry is None or entry[1] != version:
+                name = self._table_name(dataset_id)
+                self._load(dataset_id, name)
+                self._tables[key] = (name, version)
+            return self._tables[key][0]
+    
+    def append(self, dataset_id: Optional[str], delta: pd.DataFrame, previous_version: str) -> None:
+        """
+        Inserta filas nuevas en la tabla del dataset
+        
+        Args:
+            dataset_id: ID del dataset
+            delta: Eventos añadidos (columnas normalizadas)
+            previous_version: Versión del dataset antes de añadir las filas
+        """
+        key = dataset_id or 'default'
+        with self._lock:
+            entry = self._tables.get(key)
+            if entry is None or entry[1] != previous_version:
+                self._tables.pop(key, None)
+                self.table(dataset_id)
+                return
+            
+            name = entry[0]
+            next_seq = self.execute(f"SELECT COALESCE(MAX(seq) + 1, 0) FROM {name}")[0][0]
+            if not delta.empty:
+                self._insert_chunk(name, delta[EXPORT_COLUMNS], int(next_seq))
+                if self.dialect.name == 'sqlite':
+                    self._conn.commit()
+            self._tables[key] = (name, data_loader.get_dataset_version(dataset_id))
+    
+    def drop(self, dataset_id: Optional[str] = None) -> None:
+        """Elimina la tabla de un dataset"""
+        with self._lock:
+            entry = self._tables.pop(dataset_id or 'default', None)
+            if entry is not None:
+                self.execute(f"DROP TABLE IF EXISTS {entry[0]}")
+    
+    def ordered_lists(self, table: str, keys: List[str], value: str, where: str = "") -> Dict[Any, List]:
+        """
+        Valores únicos de `value` por clave en orden de primera aparición
+        
+        Equivale a `df.groupby(keys, sort=False)[value].unique()`: el orden de
+        las claves también es el de su primera aparición.
+        """
+        key_list = ', '.join(keys)
+        rows = self.execute(
+            f"SELECT {key_list}, {value}, MIN(seq) AS first_seq FROM {table} {where} "
+            f"GROUP BY {key_list}, {value} ORDER BY first_seq"
+        )
+        result: Dict[Any, List] = {}
+        width = len(keys)
+        for row in rows:
+            key = row[0] if width == 1 else tuple(row[:width])
+            result.setdefault(key, []).append(row[width])
+        return result
+    
+    def base_states(self, dataset_id: Optional[str], names: List[str]) -> Dict[str, Any]:
+        """
+        Estados de las vistas base calculados con SQL
+        
+        Devuelve las mismas estructuras que las funciones merge de
+        materialized_views, de modo que las vistas derivadas no cambian.
+        
+        Args:
+            dataset_id: ID del dataset
+            names: Vistas base a calcular
+        """
+        table = self.table(dataset_id)
+        states = {}
+        for name in names:
+            if name not in _SQL_BASE_VIEWS:
+                raise ValueError(f"Vista base '{name}' sin implementación SQL")
+            with span(f"view.{name}"):
+                states[name] = _SQL_BASE_VIEWS[name](self, table)
+        return states
+
+
+# Instancia global
+sql_engine = SQLEngine()
+
+
+def _timestamp(value) -> pd.Timestamp:
+    return pd.Timestamp(value)
+
+
+def _hour_histogram(rows: List[Tuple]) -> np.ndarray:
+    hours = np.zeros(24, dtype=np.int64)
+    for hour, count in rows:
+        hours[int(hour)] = count
+    return hours
+
+
+def _sql_overview(engine: SQLEngine, table: str) -> Dict:
+    total, ts_min, ts_max = engine.execute(f"SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM {table}")[0]
+    return {
+        'total': int(total),
+        'ts_min': _timestamp(ts_min) if total else None,
+        'ts_max': _timestamp(ts_max) if total else None
+    }
+
+
+def _sql_ip_stats(engine: SQLEngine, table: str) -> Dict:
+    tipos = engine.ordered_lists(table, ['ip_origen'], 'alerta')
+    puertos = engine.ordered_lists(table, ['ip_origen'], 'puerto')
+    rows = engine.execute(
+        f"SELECT ip_origen, COUNT(*), MAX(timestamp) FROM {table} GROUP BY ip_origen ORDER BY MIN(seq)"
+    )
+    return {
+        ip: {'total': int(total), 'tipos': tipos[ip], 'puertos': puertos[ip], 'ultima': _timestamp(ultima)}
+        for ip, total, ultima in rows
+    }
+
+
+def _sql_port_stats(engine: SQLEngine, table: str) -> Dict:
+    ips = engine.ordered_lists(table, ['puerto'], 'ip_origen')
+    protocols = engine.ordered_lists(table, ['puerto'], 'protocolo')
+    rows = engine.execute(f"SELECT puerto, COUNT(*) FROM {table} GROUP BY puerto ORDER BY MIN(seq)")
+    return {
+        int(puerto): {'count': int(count), 'ips': ips[puerto], 'protocols': protocols[puerto]}
+        for puerto, count in rows
+    }
+
+
+def _sql_alert_stats(engine: SQLEngine, table: str) -> Dict:
+    critical_ports = ', '.join(str(p) for p in ThreatDetector.CRITICAL_PORTS)
+    counts = engine.execute(f"SELECT alerta, COUNT(*) FROM {table} GROUP BY alerta ORDER BY MIN(seq)")
+    critical = engine.execute(
+        f"SELECT COUNT(*) FROM {table} WHERE alerta = 'SQL Injection' OR puerto IN ({critical_ports})"
+    )[0][0]
+    hour = engine.dialect.hour_of_day('timestamp')
+    hours = engine.execute(f"SELECT {hour}, COUNT(*) FROM {table} GROUP BY 1")
+    return {
+        'counts': {alerta: int(count) for alerta, count in counts},
+        'critical': int(critical),
+        'hour_of_day': _hour_histogram(hours)
+    }
+
+
+def _sql_pattern_stats(engine: SQLEngine, table: str) -> Dict:
+    ips = engine.ordered_lists(table, ['alerta'], 'ip_origen')
+    hour = engine.dialect.hour_of_day('timestamp')
+    hours: Dict[str, List] = {}
+    for alerta, hour_value, count in engine.execute(f"SELECT alerta, {hour}, COUNT(*) FROM {table} GROUP BY 1, 2"):
+        hours.setdefault(alerta, []).append((hour_value, count))
+    rows = engine.execute(f"SELECT alerta, COUNT(*) FROM {table} GROUP BY alerta ORDER BY MIN(seq)")
+    return {
+        alerta: {'count': int(count), 'hours': _hour_histogram(hours[alerta]), 'ips': ips[alerta]}
+        for alerta, count in rows
+    }
+
+
+def _sql_timeline_stats(engine: SQLEngine, table: str) -> Dict:
+    hour = engine.dialect.hour_floor('timestamp')
+    state: Dict[pd.Timestamp, Dict[str, int]] = {}
+    for bucket, alerta, count in engine.execute(
+        f"SELECT {hour} AS bucket, alerta, COUNT(*) FROM {table} GROUP BY 1, 2 ORDER BY MIN(seq)"
+    ):
+        state.setdefault(_timestamp(bucket), {})[alerta] = int(count)
+    return state
+
+
+def _sql_target_stats(engine: SQLEngine, table: str) -> Dict:
+    attackers = engine.ordered_lists(table, ['ip_destino'], 'ip_origen')
+    ports = engine.ordered_lists(table, ['ip_destino'], 'puerto')
+    rows = engine.execute(f"SELECT ip_destino, COUNT(*) FROM {table} GROUP BY ip_destino ORDER BY MIN(seq)")
+    return {
+        ip: {'total': int(total), 'attackers': set(attackers[ip]), 'ports': ports[ip]}
+        for ip, total in rows
+    }
+
+
+def _sql_graph_stats(engine: SQLEngine, table: str) -> Dict:
+    attacks = engine.ordered_lists(table, ['ip_origen', 'ip_destino'], 'alerta')
+    ports = engine.ordered_lists(table, ['ip_origen', 'ip_destino'], 'puerto')
+    sent = engine.execute(f"SELECT ip_origen, COUNT(*) FROM {table} GROUP BY ip_origen ORDER BY MIN(seq)")
+    received = engine.execute(f"SELECT ip_destino, COUNT(*) FROM {table} GROUP BY ip_destino ORDER BY MIN(seq)")
+    edges = engine.execute(
+        f"SELECT ip_origen, ip_destino, COUNT(*) FROM {table} GROUP BY ip_origen, ip_destino ORDER BY MIN(seq)"
+    )
+    return {
+        'sent': {ip: int(count) for ip, count in sent},
+        'received': {ip: int(count) for ip, count in received},
+        'edges': {
+            (source, target): {
+                'weight': int(weight),
+                'attacks': attacks[(source, target)],
+                'ports': [int(p) for p in ports[(source, target)]]
+            }
+            for source, target, weight in edges
+        }
+    }
+
+
+def _sql_hourly_stats(engine: SQLEngine, table: str) -> Dict:
+    hour = engine.dialect.hour_floor('timestamp')
+    scada_ports = ', '.join(str(p) for p in settings.SCADA_CRITICAL_PORTS)
+    state: Dict[str, Dict] = {'attackers': {}, 'scada': {}}
+    for bucket, ip, count in engine.execute(
+        f"SELECT {hour} AS bucket, ip_origen, COUNT(*) FROM {table} GROUP BY 1, 2"
+    ):
+        state['attackers'].setdefault(_timestamp(bucket), {})[ip] = int(count)
+    for bucket, count in engine.execute(
+        f"SELECT {hour} AS bucket, COUNT(*) FROM {table} WHERE puerto IN ({scada_ports}) GROUP BY 1"
+    ):
+        state['scada'][_timestamp(bucket)] = int(count)
+    return state
+
+
+_SQL_BASE_VIEWS: Dict[str, Callable[[SQLEngine, str], Any]] = {
+    'overview': _sql_overview,
+    'ip_stats': _sql_ip_stats,
+    'port_stats': _sql_port_stats,
+    'alert_stats': _sql_alert_stats,
+    'pattern_stats': _sql_pattern_stats,
+    'timeline_stats': _sql_timeline_stats,
+    'hourly_stats': _sql_hourly_stats,
+    'target_stats': _sql_target_stats,
+    'graph_stats': _sql_graph_stats,
+}
+
+
+class SQLThreatDetector:
+    """Equivalente SQL de las detecciones de ThreatDetector usadas por los endpoints"""
+    
+    def __init__(self, dataset_id: Optional[str] = None, engine: SQLEngine = None):
+        self.engine = engine or sql_engine
+        self.table = self.engine.table(dataset_id)
+    
+    @traced()
+    def detect_coordinated_attacks(self) -> List[Dict]:
+        """Objetivos atacados por 3 o más IPs distintas en una misma hora"""
+        hour = self.engine.dialect.hour_floor('timestamp')
+        windows = self.engine.execute(
+            f"SELECT ip_destino, {hour} AS bucket FROM {self.table} GROUP BY 1, 2 "
+            f"HAVING COUNT(DISTINCT ip_origen) >= 3 ORDER BY 1, 2"
+        )
+        if not windows:
+            return []
+        
+        source = f"(SELECT *, {hour} AS bucket FROM {self.table})"
+        ips = self.engine.ordered_lists(source, ['ip_destino', 'bucket'], 'ip_origen')
+        tipos = self.engine.ordered_lists(source, ['ip_destino', 'bucket'], 'alerta')
+        return [
+            {
+                'target_ip': target_ip,
+                'timestamp': _timestamp(bucket).strftime('%Y-%m-%d %H:%M'),
+                'attacking_ips': ips[(target_ip, bucket)],
+                'attack_types': tipos[(target_ip, bucket)],
+                'severity': RiskLevel.CRITICAL
+            }
+            for target_ip, bucket in windows
+        ]
+    
+    @traced()
+    def detect_port_sweep(self) -> List[Dict]:
+        """IPs de origen que atacan 10 o más puertos distintos"""
+        rows = self.engine.execute(
+            f"SELECT ip_origen, COUNT(DISTINCT puerto), MIN(timestamp), MAX(timestamp) FROM {self.table} "
+            f"GROUP BY ip_origen HAVING COUNT(DISTINCT puerto) >= 10 ORDER BY ip_origen"
+        )
+        if not rows:
+            return []
+        
+        targets = self.engine.ordered_lists(self.table, ['ip_origen'], 'ip_destino')
+        return [
+            {
+                'source_ip': ip,
+                'ports_scanned': int(ports),
+                'target_ips': targets[ip],
+                'timeframe': f"{_timestamp(first)} - {_timestamp(last)}",
+                'risk_level': RiskLevel.HIGH
+            }
+            for ip, ports, first, last in rows
+        ]
+    
+    @traced()
+    def get_attack_velocity(self) -> Dict[str, float]:
+        """Ataques por hora: media, máximo y mínimo"""
+        hour = self.engine.dialect.hour_floor('timestamp')
+        row = self.engine.execute(
+            f"SELECT COUNT(*), AVG(n), MAX(n), MIN(n), SUM(n) FROM "
+            f"(SELECT {hour} AS bucket, COUNT(*) AS n FROM {self.table} GROUP BY 1) AS hourly"
+        )[0]
+        buckets, avg, maximum, minimum, total = row
+        if not buckets or total < 2:
+            return {'avg_per_hour': 0, 'max_per_hour': 0, 'min_per_hour': 0}
+        
+        return {
+            'avg_per_hour': round(float(avg), 2),
+            'max_per_hour': int(maximum),
+            'min_per_hour': int(minimum)
+        }
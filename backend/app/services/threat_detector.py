@@ -5,15 +5,22 @@ import pandas as pd
 from typing import List, Dict, Tuple
 from collections import Counter
 from ..api.models.schemas import AlertSummary, RiskLevel
+from ..core.metrics import ROWS_PROCESSED
+from ..core.tracing import traced
 from ..utils.helpers import calculate_trend
 
 
 class ThreatDetector:
     """Detector de amenazas y anomalías en tráfico IDS"""
     
+    # Puertos cuyo tráfico se considera alerta crítica
+    CRITICAL_PORTS = [502, 102, 2404, 20000]
+    
     def __init__(self, df: pd.DataFrame):
         self.df = df
+        ROWS_PROCESSED.inc(len(df), service='threat_detector')
     
+    @traced()
     def get_alert_summary(self) -> AlertSummary:
         """
         Genera resumen de alertas del sistema
@@ -32,7 +39,7 @@ class ThreatDetector:
         # Contar alertas críticas (SQL Injection y ataques a puertos SCADA)
         alertas_criticas = len(self.df[
             (self.df['alerta'] == 'SQL Injection') | 
-            (self.df['puerto'].isin([502, 102, 2404, 20000]))
+            (self.df['puerto'].isin(self.CRITICAL_PORTS))
         ])
         
         # Alertas activas (últimas 24 horas simuladas - últimos 24 registros por hora)
@@ -54,6 +61,7 @@ class ThreatDetector:
             tendencia=tendencia
         )
     
+    @traced()
     def detect_coordinated_attacks(self) -> List[Dict]:
         """
         Detecta ataques coordinados (múltiples IPs atacando mismo objetivo)
@@ -83,6 +91,7 @@ class ThreatDetector:
         
         return coordinated
     
+    @traced()
     def detect_port_sweep(self) -> List[Dict]:
         """
         Detecta barridos de puertos (una IP escaneando múltiples puertos)
@@ -109,6 +118,7 @@ class ThreatDetector:
         
         return sweeps
     
+    @traced()
     def get_attack_velocity(self) -> Dict[str, float]:
         """
         Calcula la velocidad de ataques (ataques por hora promedio)
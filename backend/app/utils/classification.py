@@ -0,0 +1,258 @@
+"""
+Tablas de clasificación precalculadas: metadatos de puertos, zonas de red e IPs
+"""
+import re
+import ipaddress
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+from ..core.config import settings
+
+
+# ----------------------------------------------------------------------
+# IPs
+# ----------------------------------------------------------------------
+
+_IPV4_PATTERN = re.compile(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}')
+
+
+def is_valid_ipv4(ip: str) -> bool:
+    """
+    Valida formato de dirección IPv4
+    
+    Args:
+        ip: Cadena con la IP
+    
+    Returns:
+        True si es válida
+    """
+    if not isinstance(ip, str) or not _IPV4_PATTERN.fullmatch(ip):
+        return False
+    return all(int(octet) <= 255 for octet in ip.split('.'))
+
+
+def ipv4_to_int(values: pd.Series) -> np.ndarray:
+    """
+    Convierte IPs IPv4 en enteros (vectorizado); las inválidas quedan en -1
+    
+    Args:
+        values: Serie (o lista) de cadenas con IPs
+    
+    Returns:
+        Array int64 con el valor numérico de cada IP
+    """
+    if not isinstance(values, pd.Series):
+        values = pd.Series(values, dtype=object)
+    valid = values.astype(str).str.fullmatch(_IPV4_PATTERN.pattern).to_numpy(dtype=bool)
+    result = np.full(len(values), -1, dtype=np.int64)
+    if not valid.any():
+        return result
+    
+    # Un único split sobre el texto concatenado evita procesar IP a IP
+    octets = np.array('.'.join(values[valid]).split('.'), dtype=np.int64).reshape(-1, 4)
+    in_range = (octets <= 255).all(axis=1)
+    octets = octets[in_range]
+    result[np.flatnonzero(valid)[in_range]] = (
+        (octets[:, 0] << 24) | (octets[:, 1] << 16) | (octets[:, 2] << 8) | octets[:, 3]
+    )
+    return result
+
+
+def int_to_ipv4(value: int) -> str:
+    """Formatea un entero como IPv4 con puntos"""
+    return f"{value >> 24}.{(value >> 16) & 255}.{(value >> 8) & 255}.{value & 255}"
+
+
+def valid_ipv4(values: pd.Series) -> np.ndarray:
+    """Máscara de IPs IPv4 válidas de una columna (vectorizado)"""
+    return ipv4_to_int(values) >= 0
+
+
+# ----------------------------------------------------------------------
+# Puertos
+# ----------------------------------------------------------------------
+
+PORT_COUNT = 65536
+
+# Puertos conocidos -> servicio, criticidad y protocolo
+PORT_SERVICES = {
+    502: {'servicio': 'Modbus TCP', 'criticidad': 'ALTA', 'protocolo': 'SCADA'},
+    102: {'servicio': 'S7comm (Siemens)', 'criticidad': 'ALTA', 'protocolo': 'PLC'},
+    2404: {'servicio': 'IEC 60870-5-104', 'criticidad': 'ALTA', 'protocolo': 'SCADA'},
+    20000: {'servicio': 'DNP3', 'criticidad': 'ALTA', 'protocolo': 'SCADA'},
+    44818: {'servicio': 'Ethernet/IP', 'criticidad': 'ALTA', 'protocolo': 'Industrial'},
+    22: {'servicio': 'SSH', 'criticidad': 'MEDIA', 'protocolo': 'Administración'},
+    80: {'servicio': 'HTTP', 'criticidad': 'MEDIA', 'protocolo': 'Web'},
+    443: {'servicio': 'HTTPS', 'criticidad': 'MEDIA', 'protocolo': 'Web'},
+}
+
+SCADA_PROTOCOLS = {'SCADA', 'PLC', 'Industrial'}
+
+_UNKNOWN_PORT = {'servicio': 'Desconocido', 'criticidad': 'BAJA', 'protocolo': 'Genérico'}
+
+
+def _build_port_table():
+    """
+    Una fila por servicio (la 0 es 'desconocido') y un array de 65536
+    posiciones con la fila de cada puerto
+    """
+    services = [dict(_UNKNOWN_PORT, es_scada=False)]
+    codes = np.zeros(PORT_COUNT, dtype=np.uint8)
+    for puerto, info in PORT_SERVICES.items():
+        codes[puerto] = len(services)
+        services.append(dict(info, es_scada=info['protocolo'] in SCADA_PROTOCOLS))
+    return services, codes
+
+
+# Metadatos por servicio y código de servicio de cada puerto
+PORT_SERVICE_INFO, PORT_SERVICE_CODES = _build_port_table()
+SERVICE_NAMES = np.array([info['servicio'] for info in PORT_SERVICE_INFO], dtype=object)
+SERVICE_CRITICALITY = np.array([info['criticidad'] for info in PORT_SERVICE_INFO], dtype=object)
+SERVICE_IS_SCADA = np.array([info['es_scada'] for info in PORT_SERVICE_INFO], dtype=bool)
+
+
+def port_info(puerto: int) -> Dict[str, any]:
+    """
+    Información de un puerto (servicio, criticidad, protocolo, es_scada)
+    
+    Args:
+        puerto: Número de puerto
+    
+    Returns:
+        Dict con información del puerto
+    """
+    try:
+        code = PORT_SERVICE_CODES[int(puerto)] if 0 <= int(puerto) < PORT_COUNT else 0
+    except (TypeError, ValueError):
+        code = 0
+    return {'puerto': puerto, **PORT_SERVICE_INFO[code]}
+
+
+def port_codes(ports) -> np.ndarray:
+    """
+    Código de servicio de cada puerto de una columna (0 = desconocido)
+    
+    Args:
+        ports: Serie, array o lista de puertos
+    
+    Returns:
+        Array con el índice de cada puerto en PORT_SERVICE_INFO
+    """
+    ports = np.asarray(ports)
+    if ports.dtype.kind not in 'iuf':
+        ports = pd.to_numeric(pd.Series(ports.ravel()), errors='coerce').to_numpy()
+    valid = (ports >= 0) & (ports < PORT_COUNT)
+    codes = np.zeros(len(ports), dtype=np.uint8)
+    codes[valid] = PORT_SERVICE_CODES[ports[valid].astype(np.int64)]
+    return codes
+
+
+def is_scada_port(ports) -> np.ndarray:
+    """Máscara de puertos SCADA/ICS de una columna"""
+    return SERVICE_IS_SCADA[port_codes(ports)]
+
+
+def port_services(ports) -> np.ndarray:
+    """Nombre del servicio de cada puerto de una columna"""
+    return SERVICE_NAMES[port_codes(ports)]
+
+
+def port_criticality(ports) -> np.ndarray:
+    """Criticidad (ALTA, MEDIA, BAJA) de cada puerto de una columna"""
+    return SERVICE_CRITICALITY[port_codes(ports)]
+
+
+# ----------------------------------------------------------------------
+# Zonas de red
+# ----------------------------------------------------------------------
+
+class SubnetTable:
+    """
+    Tabla de prefijos CIDR -> zona de red (gana el prefijo más largo)
+    
+    Los prefijos se agrupan por longitud; para cada longitud se aplica la
+    máscara a toda la columna y se busca la red en un array ordenado, de
+    mayor a menor longitud. Las IPs se convierten una sola vez por valor
+    único, así que clasificar una columna repetitiva es casi gratis.
+    """
+    
+    def __init__(self, zones: Dict[str, str], default: str):
+        """
+        Args:
+            zones: Bloques CIDR IPv4 y su zona ('10.0.0.0/16': 'Red SCADA')
+            default: Zona de las IPs fuera de todos los bloques (o inválidas)
+        """
+        self.names = [default] + list(dict.fromkeys(zones.values()))
+        position = {name: i for i, name in enumerate(self.names)}
+        
+        by_length: Dict[int, Dict[int, int]] = {}
+        for cidr, zone in zones.items():
+            network = ipaddress.ip_network(cidr, strict=False)
+            if network.version != 4:
+                raise ValueError(f"Zona {zone}: solo se admiten bloques IPv4 ({cidr})")
+            by_length.setdefault(network.prefixlen, {})[int(network.network_address)] = position[zone]
+        
+        self.levels = []
+        for length in sorted(by_length, reverse=True):
+            networks = np.array(sorted(by_length[length]), dtype=np.int64)
+            codes = np.array([by_length[length][n] for n in networks.tolist()], dtype=np.int64)
+            mask = (0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF
+            self.levels.append((mask, networks, codes))
+        self._names = np.array(self.names, dtype=object)
+    
+    def codes(self, numeric: np.ndarray) -> np.ndarray:
+        """
+        Zona (índice en `names`) de cada IP ya convertida a entero
+        
+        Args:
+            numeric: IPs como int64 (-1 = inválida)
+        """
+        result = np.zeros(len(numeric), dtype=np.int64)
+        pending = numeric >= 0
+        for mask, networks, codes in self.levels:
+            if not pending.any():
+                break
+            candidates = np.flatnonzero(pending)
+            masked = numeric[candidates] & mask
+            slot = np.minimum(np.searchsorted(networks, masked), len(networks) - 1)
+            hit = networks[slot] == masked
+            result[candidates[hit]] = codes[slot[hit]]
+            pending[candidates[hit]] = False
+        return result
+    
+    def classify(self, values: pd.Series) -> np.ndarray:
+        """
+        Zona de red de cada IP de una columna
+        
+        Args:
+            values: Serie o lista de IPs
+        
+        Returns:
+            Array con el nombre de la zona de cada IP
+        """
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+        zones = self.codes(ipv4_to_int(pd.Series(uniques)))
+        return self._names[zones[codes]]
+    
+    def zone(self, ip: str) -> str:
+        """Zona de red de una IP"""
+        if not is_valid_ipv4(ip):
+            return self.names[0]
+        a, b, c, d = (int(octet) for octet in ip.split('.'))
+        numeric = np.array([(a << 24) | (b << 16) | (c << 8) | d], dtype=np.int64)
+        return self.names[self.codes(numeric)[0]]
+
+
+# Instancia global
+subnet_table = SubnetTable(settings.SUBNET_ZONES, settings.SUBNET_DEFAULT_ZONE)
+
+
+def classify_subnets(values: pd.Series, table: Optional[SubnetTable] = None) -> np.ndarray:
+    """
+    Zona de red de cada IP de una columna (tabla SUBNET_ZONES por defecto)
+    
+    Args:
+        values: Serie o lista de IPs
+        table: Tabla de zonas alternativa
+    """
+    return (table or subnet_table).classify(values)
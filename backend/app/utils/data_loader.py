@@ -4,6 +4,9 @@ Carga de datos desde CSV
 import pandas as pd
 import os
 from ..core.config import settings
+from ..core.metrics import ROWS_PROCESSED
+from ..core.tracing import traced
+from .shared_dataset import shared_dataset_store, source_version
 
 
 class DataLoader:
@@ -13,6 +16,40 @@ class DataLoader:
         self.default_csv_path = os.path.join(settings.DATA_PATH, settings.CSV_FILENAME)
         self.current_dataset = None
         
+    def resolve_path(self, dataset_id: str = None) -> str:
+        """
+        Resuelve la ruta del CSV de un dataset
+        
+        Args:
+            dataset_id: ID del dataset (None = default)
+        """
+        if not dataset_id:
+            return self.default_csv_path
+        
+        # Cargar dataset específico desde uploads
+        filepath = os.path.join(settings.UPLOAD_PATH, f"{dataset_id}.csv")
+        if os.path.exists(filepath):
+            return filepath
+        
+        # Buscar por metadata
+        from ..services.dataset_manager import dataset_manager
+        dataset = dataset_manager.get_metadata(dataset_id)
+        if dataset:
+            return os.path.join(settings.UPLOAD_PATH, dataset['filename'])
+        
+        print(f" Dataset {dataset_id} no encontrado, usando default")
+        return self.default_csv_path
+    
+    def get_dataset_version(self, dataset_id: str = None) -> str:
+        """
+        Versión del dataset (cambia cuando el CSV se reemplaza o modifica)
+        
+        Args:
+            dataset_id: ID del dataset (None = default)
+        """
+        return f"{dataset_id or 'default'}:{source_version(self.resolve_path(dataset_id))}"
+    
+    @traced()
     def load_data(self, dataset_id: str = None) -> pd.DataFrame:
         """
         Carga datos desde CSV
@@ -21,41 +58,36 @@ class DataLoader:
             dataset_id: ID del dataset a cargar (None = default)
         """
         try:
-            if dataset_id:
-                # Cargar dataset específico desde uploads
-                filepath = os.path.join(settings.UPLOAD_PATH, f"{dataset_id}.csv")
-                if not os.path.exists(filepath):
-                    # Buscar por metadata
-                    from ..services.dataset_manager import dataset_manager
-                    datasets = dataset_manager.list_datasets()
-                    dataset = next((d for d in datasets if d['id'] == dataset_id), None)
-                    if dataset:
-                        filepath = os.path.join(settings.UPLOAD_PATH, dataset['filename'])
-                    else:
-                        print(f" Dataset {dataset_id} no encontrado, usando default")
-                        filepath = self.default_csv_path
-            else:
-                filepath = self.default_csv_path
+            filepath = self.resolve_path(dataset_id)
             
             if not os.path.exists(filepath):
                 print(f" Archivo no encontrado: {filepath}")
                 return pd.DataFrame()
             
-            df = pd.read_csv(filepath)
-            
-            # Normalizar nombres de columnas
-            df.columns = df.columns.str.lower().str.strip()
-            
-            # Convertir timestamp
-            if 'timestamp' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
+            if settings.SHARED_MEMORY_DATASETS:
+                return shared_dataset_store.get(dataset_id or 'default', filepath, self._read_csv)
             
-            return df
+            return self._read_csv(filepath)
             
         except Exception as e:
             print(f" Error cargando datos: {e}")
             return pd.DataFrame()
     
+    @traced()
+    def _read_csv(self, filepath: str) -> pd.DataFrame:
+        """Lee y normaliza un CSV de logs IDS"""
+        df = pd.read_csv(filepath)
+        
+        # Normalizar nombres de columnas
+        df.columns = df.columns.str.lower().str.strip()
+        
+        # Convertir timestamp
+        if 'timestamp' in df.columns:
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+        
+        ROWS_PROCESSED.inc(len(df), service='data_loader')
+        return df
+    
     def get_date_range(self, dataset_id: str = None) -> tuple:
         """Obtiene rango de fechas del dataset"""
         df = self.load_data(dataset_id)
@@ -3,7 +3,13 @@ Funciones auxiliares generales
 """
 from typing import Dict, List
 from datetime import datetime, timedelta
-import re
+from .classification import (  # noqa: F401 (ipv4_to_int e int_to_ipv4 se reexportan)
+    is_valid_ipv4,
+    ipv4_to_int,
+    int_to_ipv4,
+    port_info,
+    subnet_table
+)
 
 
 def is_valid_ip(ip: str) -> bool:
@@ -16,15 +22,12 @@ def is_valid_ip(ip: str) -> bool:
     Returns:
         True si es válida
     """
-    pattern = re.compile(r'^(\d{1,3}\.){3}\d{1,3}$')
-    if not pattern.match(ip):
-        return False
-    return all(0 <= int(octet) <= 255 for octet in ip.split('.'))
+    return is_valid_ipv4(ip)
 
 
 def classify_ip_subnet(ip: str) -> str:
     """
-    Clasifica la IP según su subred
+    Clasifica la IP según su subred (zonas SUBNET_ZONES de la configuración)
     
     Args:
         ip: Dirección IP
@@ -32,14 +35,7 @@ def classify_ip_subnet(ip: str) -> str:
     Returns:
         Tipo de subred
     """
-    if ip.startswith('192.168.'):
-        return 'Red Interna - Administración'
-    elif ip.startswith('10.0.'):
-        return 'Red Interna - SCADA/Control'
-    elif ip.startswith('172.16.'):
-        return 'Red Interna - DMZ'
-    else:
-        return 'Red Externa/Desconocida'
+    return subnet_table.zone(ip)
 
 
 def get_scada_port_info(puerto: int) -> Dict[str, any]:
@@ -52,30 +48,7 @@ def get_scada_port_info(puerto: int) -> Dict[str, any]:
     Returns:
         Dict con información del puerto
     """
-    scada_ports = {
-        502: {'servicio': 'Modbus TCP', 'criticidad': 'ALTA', 'protocolo': 'SCADA'},
-        102: {'servicio': 'S7comm (Siemens)', 'criticidad': 'ALTA', 'protocolo': 'PLC'},
-        2404: {'servicio': 'IEC 60870-5-104', 'criticidad': 'ALTA', 'protocolo': 'SCADA'},
-        20000: {'servicio': 'DNP3', 'criticidad': 'ALTA', 'protocolo': 'SCADA'},
-        44818: {'servicio': 'Ethernet/IP', 'criticidad': 'ALTA', 'protocolo': 'Industrial'},
-        22: {'servicio': 'SSH', 'criticidad': 'MEDIA', 'protocolo': 'Administración'},
-        80: {'servicio': 'HTTP', 'criticidad': 'MEDIA', 'protocolo': 'Web'},
-        443: {'servicio': 'HTTPS', 'criticidad': 'MEDIA', 'protocolo': 'Web'},
-    }
-    
-    if puerto in scada_ports:
-        info = scada_ports[puerto].copy()
-        info['puerto'] = puerto
-        info['es_scada'] = info['protocolo'] in ['SCADA', 'PLC', 'Industrial']
-        return info
-    
-    return {
-        'puerto': puerto,
-        'servicio': 'Desconocido',
-        'criticidad': 'BAJA',
-        'protocolo': 'Genérico',
-        'es_scada': False
-    }
+    return port_info(puerto)
 
 
 def format_datetime_range(start: datetime, end: datetime) -> str:
@@ -115,3 +88,23 @@ def calculate_trend(data: List[int]) -> str:
     elif diff_percentage < -10:
         return 'descendente'
     return 'estable'
+
+
+def union_unique(target: List, values) -> List:
+    """
+    Une valores a una lista preservando el orden de aparición y sin duplicados
+    
+    Args:
+        target: Lista original (no se modifica)
+        values: Valores a añadir
+        
+    Returns:
+        Lista nueva con los valores de `target` seguidos de los nuevos
+    """
+    result = list(target)
+    seen = set(result)
+    for value in values:
+        if value not in seen:
+            result.append(value)
+            seen.add(value)
+    return result
@@ -0,0 +1,254 @@
+"""
+Datasets decodificados en memoria compartida para despliegues multi-worker
+"""
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory, resource_tracker
+from typing import Callable, Dict, Optional
+from ..core.config import settings
+from ..core.metrics import CACHE_HITS, CACHE_MISSES
+from .storage import file_lock, atomic_write_json
+
+
+_ALIGNMENT = 8
+
+
+def source_version(path: str) -> Optional[str]:
+    """Versión de un archivo de origen (mtime + tamaño)"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def _untrack(shm: shared_memory.SharedMemory) -> None:
+    """
+    Evita que el resource_tracker libere el segmento al terminar el proceso
+    
+    El ciclo de vida de los segmentos lo controla el registro: un segmento
+    solo se libera cuando se publica una versión nueva del dataset.
+    """
+    try:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+
+
+def _encode_columns(df: pd.DataFrame) -> tuple:
+    """
+    Convierte las columnas a arrays de tamaño fijo
+    
+    Returns:
+        (layout, arrays, tamaño total en bytes)
+    """
+    layout = []
+    arrays = []
+    offset = 0
+    
+    for column in df.columns:
+        series = df[column]
+        categories = None
+        
+        if pd.api.types.is_datetime64_any_dtype(series):
+            kind = 'datetime'
+            array = series.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            kind = 'numeric'
+            array = series.to_numpy()
+        else:
+            # Columnas de texto: diccionario + códigos enteros
+            kind = 'category'
+            codes, uniques = pd.factorize(series)
+            array = codes.astype(np.int32)
+            categories = [str(u) for u in uniques]
+        
+        array = np.ascontiguousarray(array)
+        layout.append({
+            'name': column,
+            'kind': kind,
+            'dtype': array.dtype.str,
+            'offset': offset,
+            'length': len(array),
+            'categories': categories
+        })
+        arrays.append(array)
+        offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+    
+    return layout, arrays, max(offset, 1)
+
+
+def _decode_frame(shm: shared_memory.SharedMemory, layout: list) -> pd.DataFrame:
+    """Construye el DataFrame sobre el buffer compartido (sin copiar columnas numéricas)"""
+    columns = {}
+    for col in layout:
+        array = np.ndarray((col['length'],), dtype=np.dtype(col['dtype']), buffer=shm.buf, offset=col['offset'])
+        array.flags.writeable = False
+        
+        if col['kind'] == 'datetime':
+            columns[col['name']] = array.view('datetime64[ns]')
+        elif col['kind'] == 'numeric':
+            columns[col['name']] = array
+        else:
+            # Los strings se comparten vía diccionario: cada worker solo guarda punteros
+            categories = np.array(col['categories'] + [None], dtype=object)
+            columns[col['name']] = categories[np.where(array < 0, len(col['categories']), array)]
+    
+    return pd.DataFrame(columns, copy=False)
+
+
+class _Attachment:
+    """Segmento adjunto por este proceso"""
+    
+    def __init__(self, version: str, segment: str, shm: shared_memory.SharedMemory, df: pd.DataFrame):
+        self.version = version
+        self.segment = segment
+        self.shm = shm
+        self.df = df
+
+
+class SharedDatasetStore:
+    """
+    Publica cada dataset decodificado una sola vez en memoria compartida
+    
+    Un registro en disco (`<key>.json`, escrito con rename atómico) indica qué
+    segmento corresponde a la versión vigente de cada dataset. El primer
+    worker que detecta una versión nueva la decodifica y la publica bajo lock;
+    el resto solo se adjunta al segmento, por lo que todos cambian de versión
+    a la vez cuando el registro se reemplaza.
+    """
+    
+    def __init__(self, registry_path: str = None):
+        self.registry_path = registry_path or os.path.join(settings.UPLOAD_PATH, '.shm')
+        self._attached: Dict[str, _Attachment] = {}
+        self._retired = []
+        self._lock = threading.Lock()
+    
+    def _registry_file(self, key: str) -> str:
+        safe_key = hashlib.md5(key.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.registry_path, f"{safe_key}.json")
+    
+    def _read_registry(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._registry_file(key), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+    
+    def _attach(self, key: str, entry: Dict) -> Optional[_Attachment]:
+        """Se adjunta al segmento indicado por el registro"""
+        try:
+            shm = shared_memory.SharedMemory(name=entry['segment'])
+        except FileNotFoundError:
+            return None
+        _untrack(shm)
+        
+        attachment = _Attachment(entry['version'], entry['segment'], shm, _decode_frame(shm, entry['layout']))
+        self._swap(key, attachment)
+        return attachment
+    
+    def _swap(self, key: str, attachment: _Attachment) -> None:
+        """Reemplaza la versión adjunta y libera las anteriores que ya no se usan"""
+        previous = self._attached.get(key)
+        self._attached[key] = attachment
+        
+        if previous is not None and previous.segment != attachment.segment:
+            previous.df = None
+            self._retired.append(previous.shm)
+        
+        still_used = []
+        for shm in self._retired:
+            try:
+                shm.close()
+            except BufferError:
+                # Aún hay DataFrames de peticiones en curso apuntando al segmento
+                still_used.append(shm)
+        self._retired = still_used
+    
+    def _publish(self, key: str, version: str, df: pd.DataFrame, previous: Optional[Dict]) -> Dict:
+        """Copia el DataFrame a un segmento nuevo y actualiza el registro"""
+        layout, arrays, size = _encode_columns(df)
+        segment = 'ids_' + hashlib.md5(f"{key}:{version}".encode('utf-8')).hexdigest()[:16]
+        
+        try:
+            shm = shared_memory.SharedMemory(name=segment, create=True, size=size)
+        except FileExistsError:
+            # Segmento huérfano de una publicación interrumpida
+            stale = shared_memory.SharedMemory(name=segment)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=segment, create=True, size=size)
+        _untrack(shm)
+        
+        for col, array in zip(layout, arrays):
+            target = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf, offset=col['offset'])
+            target[:] = array
+            del target
+        shm.close()
+        
+        entry = {'key': key, 'version': version, 'segment': segment, 'layout': layout}
+        atomic_write_json(self._registry_file(key), entry, indent=None)
+        
+        # La versión anterior deja de estar disponible para nuevos adjuntos;
+        # los workers que aún la usan conservan su mapeo hasta soltarlo
+        if previous and previous.get('segment') != segment:
+            try:
+                old = shared_memory.SharedMemory(name=previous['segment'])
+                old.close()
+                old.unlink()
+            except FileNotFoundError:
+                pass
+        
+        return entry
+    
+    def get(self, key: str, path: str, loader: Callable[[str], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Obtiene el dataset desde memoria compartida, publicándolo si hace falta
+        
+        Args:
+            key: Identificador del dataset ('default' o dataset_id)
+            path: CSV de origen (su mtime/tamaño definen la versión)
+            loader: Función que lee y normaliza el CSV
+        
+        Returns:
+            DataFrame (copia superficial: columnas nuevas no afectan al resto)
+        """
+        version = source_version(path)
+        if version is None:
+            return pd.DataFrame()
+        
+        with self._lock:
+            attachment = self._attached.get(key)
+            if attachment is not None and attachment.version == version:
+                CACHE_HITS.inc(cache='shared_memory')
+            else:
+                CACHE_MISSES.inc(cache='shared_memory')
+                attachment = None
+                entry = self._read_registry(key)
+                if entry and entry['version'] == version:
+                    attachment = self._attach(key, entry)
+                
+                if attachment is None:
+                    os.makedirs(self.registry_path, exist_ok=True)
+                    with file_lock(self._registry_file(key)):
+                        # Otro worker pudo publicar mientras esperábamos el lock
+                        entry = self._read_registry(key)
+                        if not entry or entry['version'] != version:
+                            df = loader(path)
+                            if df.empty:
+                                return df
+                            entry = self._publish(key, version, df, entry)
+                        attachment = self._attach(key, entry)
+                
+                if attachment is None:
+                    return loader(path)
+            
+            return attachment.df.copy(deep=False)
+
+
+# Instancia global
+shared_dataset_store = SharedDatasetStore()
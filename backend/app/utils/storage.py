@@ -0,0 +1,80 @@
+"""
+Utilidades de persistencia en disco: bloqueo de archivos y escritura atómica
+"""
+import os
+import json
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se serializa dentro del proceso
+    fcntl = None
+
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _get_thread_lock(path: str) -> threading.RLock:
+    """Obtiene el lock de hilos asociado a una ruta"""
+    with _thread_locks_guard:
+        if path not in _thread_locks:
+            _thread_locks[path] = threading.RLock()
+        return _thread_locks[path]
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Bloqueo exclusivo entre hilos y procesos sobre `<path>.lock`
+
+    Args:
+        path: Ruta del recurso a proteger
+    """
+    lock_path = f"{path}.lock"
+    with _get_thread_lock(lock_path):
+        with open(lock_path, 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """
+    Escribe un archivo de forma atómica (archivo temporal + rename)
+
+    Args:
+        path: Ruta destino
+        data: Contenido a escribir
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_', suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_json(path: str, data: Any, indent: int = 2) -> None:
+    """
+    Serializa a JSON y escribe de forma atómica
+
+    Args:
+        path: Ruta destino
+        data: Objeto serializable
+        indent: Indentación del JSON
+    """
+    atomic_write_bytes(path, json.dumps(data, indent=indent, default=str).encode('utf-8'))
@@ -0,0 +1,35 @@
+"""
+Pool de procesos compartido para análisis en paralelo
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from ..core.config import settings
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_count() -> int:
+    """Número de procesos worker configurados"""
+    return settings.ANALYSIS_WORKERS or os.cpu_count() or 1
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Obtiene (creando si es necesario) el pool de procesos global"""
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=get_worker_count())
+        return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Detiene el pool de procesos global"""
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
@@ -0,0 +1,3 @@
+"""
+Generador de datos sintéticos y suite de benchmarks del backend
+"""
@@ -0,0 +1,309 @@
+"""
+Suite de benchmarks de servicios y endpoints sobre datos sintéticos
+
+Uso:
+    python -m benchmarks.run --sizes 10k,1m
+    python -m benchmarks.run --sizes 100k --targets DataAnalyzer,endpoint
+    python -m benchmarks.run --compare benchmarks/results/a.json benchmarks/results/b.json
+
+Cada medición registra el mejor tiempo y la media de varias repeticiones y
+el pico de memoria (tracemalloc) de una ejecución adicional. Los resultados
+se guardan en benchmarks/results/ como JSON para comparar ejecuciones.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from .synthetic import SyntheticIDSGenerator, parse_rows
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+CACHE_DIR = os.path.join(BENCH_DIR, '.cache')
+
+# Los servicios leen la configuración al importarse: se aíslan todos los
+# directorios en los que escriben para que los benchmarks no modifiquen los
+# datasets, rulesets, diario, snapshots ni reportes reales
+_WORKDIR = tempfile.mkdtemp(prefix='ids_bench_')
+os.environ.setdefault('UPLOAD_PATH', os.path.join(_WORKDIR, 'uploads'))
+os.environ.setdefault('DATA_PATH', os.path.join(_WORKDIR, 'data'))
+os.environ.setdefault('RULESETS_PATH', os.path.join(_WORKDIR, 'rulesets'))
+os.environ.setdefault('JOURNAL_PATH', os.path.join(_WORKDIR, 'journal'))
+os.environ.setdefault('SNAPSHOT_PATH', os.path.join(_WORKDIR, 'snapshots'))
+os.environ.setdefault('REPORTS_PATH', os.path.join(_WORKDIR, 'reports'))
+os.environ.setdefault('PROFILES_PATH', os.path.join(_WORKDIR, 'profiles'))
+os.environ.setdefault('SQL_ENGINE_PATH', os.path.join(_WORKDIR, 'sql'))
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+def dataset_path(rows: int, seed: int) -> str:
+    """Genera (o reutiliza) el CSV sintético para un tamaño dado"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"ids_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        print(f"  Generando {rows} eventos sintéticos...")
+        SyntheticIDSGenerator(seed=seed).write_csv(path + '.tmp', rows)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+def measure(fn: Callable, repeat: int) -> Dict:
+    """
+    Mide tiempo y memoria de una función
+    
+    Args:
+        fn: Función sin argumentos a medir
+        repeat: Número de repeticiones para el tiempo
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return {
+        'seconds_min': round(min(timings), 6),
+        'seconds_mean': round(sum(timings) / len(timings), 6),
+        'peak_mb': round(peak / (1024 * 1024), 3)
+    }
+
+
+def build_targets(csv_path: str) -> List[tuple]:
+    """
+    Lista de (grupo, nombre, fábrica) a medir
+    
+    Cada fábrica recibe el DataFrame cargado y devuelve la función a medir.
+    """
+    from app.utils.data_loader import data_loader
+    from app.services.data_analyzer import DataAnalyzer
+    from app.services.threat_detector import ThreatDetector
+    from app.services.network_graph import NetworkGraphGenerator
+    from app.services.dataset_manager import dataset_manager
+    from app.core.config import settings
+    
+    targets = [
+        ('DataLoader', 'load_data', lambda df: lambda: data_loader._read_csv(csv_path)),
+        ('DataAnalyzer', 'get_suspicious_ips', lambda df: lambda: DataAnalyzer(df).get_suspicious_ips()),
+        ('DataAnalyzer', 'get_attack_distribution', lambda df: lambda: DataAnalyzer(df).get_attack_distribution()),
+        ('DataAnalyzer', 'get_timeline_data', lambda df: lambda: DataAnalyzer(df).get_timeline_data()),
+        ('DataAnalyzer', 'get_port_analysis', lambda df: lambda: DataAnalyzer(df).get_port_analysis()),
+        ('DataAnalyzer', 'get_attack_patterns', lambda df: lambda: DataAnalyzer(df).get_attack_patterns()),
+        ('ThreatDetector', 'get_alert_summary', lambda df: lambda: ThreatDetector(df).get_alert_summary()),
+        ('ThreatDetector', 'detect_coordinated_attacks', lambda df: lambda: ThreatDetector(df.copy(deep=False)).detect_coordinated_attacks()),
+        ('ThreatDetector', 'detect_port_sweep', lambda df: lambda: ThreatDetector(df).detect_port_sweep()),
+        ('ThreatDetector', 'get_attack_velocity', lambda df: lambda: ThreatDetector(df).get_attack_velocity()),
+        ('NetworkGraphGenerator', 'generate_attack_graph', lambda df: lambda: NetworkGraphGenerator(df).generate_attack_graph()),
+    ]
+    
+    try:
+        from app.services.ml_detector import MLAnomalyDetector
+        targets += [
+            ('MLAnomalyDetector', 'detect_anomalies', lambda df: lambda: MLAnomalyDetector(df.copy(deep=False)).detect_anomalies()),
+            ('MLAnomalyDetector', 'predict_next_attack', lambda df: lambda: MLAnomalyDetector(df.copy(deep=False)).predict_next_attack()),
+        ]
+    except ImportError:
+        print("  scikit-learn no disponible: se omite MLAnomalyDetector")
+    
+    def blocklist_simulation(df):
+        import numpy as np
+        from app.services.blocklist_simulator import blocklist_simulator
+        data_loader.default_csv_path = csv_path
+        # Ruleset de 100k entradas: las IPs de origen del dataset más bloques /24 aleatorios
+        rng = np.random.default_rng(0)
+        sources = df['ip_origen'].drop_duplicates().tolist()[:50_000]
+        blocks = [f"{a}.{b}.{c}.0/24" for a, b, c in rng.integers(1, 255, (100_000 - len(sources), 3))]
+        rules = sources + blocks
+        return lambda: blocklist_simulator.simulate(rules)
+    
+    targets.append(('BlocklistSimulator', 'simulate_100k_rules', blocklist_simulation))
+    
+    def period_comparison(df):
+        from app.services.period_comparison import period_comparison
+        data_loader.default_csv_path = csv_path
+        # 12 semanas consecutivas desde el rollup horario (ya construido)
+        period_comparison.compare(period='week', periods=12)
+        return lambda: period_comparison.compare(period='week', periods=12)
+    
+    targets.append(('PeriodComparison', 'compare_12_weeks', period_comparison))
+    
+    def register_dataset():
+        filename = f"bench_{time.time_ns()}.csv"
+        shutil.copy(csv_path, os.path.join(settings.UPLOAD_PATH, filename))
+        return dataset_manager.add_dataset(filename=filename, original_name=filename)
+    
+    def dataset_ops(df):
+        info = register_dataset()
+        other = register_dataset()
+        
+        def run():
+            dataset_manager.list_datasets()
+            dataset_manager.get_summary(info['id'])
+            dataset_manager.compare_datasets(info['id'], other['id'])
+        return run
+    
+    targets += [
+        ('DatasetManager', 'add_dataset', lambda df: register_dataset),
+        ('DatasetManager', 'list_summary_compare', dataset_ops),
+    ]
+    
+    try:
+        from fastapi.testclient import TestClient
+        from app.main import app
+        client = TestClient(app)
+        
+        def endpoint(path: str):
+            def factory(df):
+                data_loader.default_csv_path = csv_path
+                
+                def run():
+                    response = client.get(path)
+                    assert response.status_code == 200, f"{path}: {response.status_code}"
+                return run
+            return factory
+        
+        for path in [
+            '/health',
+            '/api/v1/analysis/dashboard-stats',
+            '/api/v1/alerts/summary',
+            '/api/v1/graph/attack-network',
+            '/api/v1/graph/hotspots',
+            '/api/v1/response/firewall-rules',
+            '/api/v1/reports/professional-recommendations',
+            '/api/v1/reports/comparison',
+            '/api/v1/ml/anomalies',
+        ]:
+            targets.append(('endpoint', path, endpoint(path)))
+    except ImportError as e:
+        print(f"  Cliente de pruebas no disponible ({e}): se omiten endpoints")
+    
+    return targets
+
+
+def run_suite(sizes: List[int], seed: int, repeat: int, target_filter: List[str]) -> Dict:
+    """Ejecuta la suite para cada tamaño y devuelve el informe"""
+    os.makedirs(os.environ['UPLOAD_PATH'], exist_ok=True)
+    os.makedirs(os.environ['DATA_PATH'], exist_ok=True)
+    
+    from app.utils.data_loader import data_loader
+    
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'commit': _git_commit(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': seed,
+            'repeat': repeat
+        },
+        'results': []
+    }
+    
+    for rows in sizes:
+        csv_path = dataset_path(rows, seed)
+        df = data_loader._read_csv(csv_path)
+        print(f"\n▶ {rows} eventos")
+        
+        for group, name, factory in build_targets(csv_path):
+            label = f"{group}.{name}"
+            if target_filter and not any(f.lower() in label.lower() for f in target_filter):
+                continue
+            
+            try:
+                result = measure(factory(df), repeat)
+            except Exception as e:
+                result = {'error': str(e)}
+            
+            result.update({'rows': rows, 'group': group, 'name': name})
+            report['results'].append(result)
+            
+            if 'error' in result:
+                print(f"  ✗ {label}: {result['error']}")
+            else:
+                print(f"  {label:<60} {result['seconds_min']:>10.4f}s {result['peak_mb']:>10.1f}MB")
+    
+    return report
+
+
+def compare_reports(baseline_path: str, current_path: str, threshold: float) -> int:
+    """
+    Compara dos informes y marca regresiones
+    
+    Returns:
+        Número de regresiones (tiempo mínimo > threshold veces el de referencia)
+    """
+    with open(baseline_path) as f:
+        baseline = {(r['rows'], r['group'], r['name']): r for r in json.load(f)['results'] if 'error' not in r}
+    with open(current_path) as f:
+        current = [r for r in json.load(f)['results'] if 'error' not in r]
+    
+    regressions = 0
+    print(f"{'medición':<70} {'antes':>10} {'ahora':>10} {'ratio':>7}")
+    for result in current:
+        key = (result['rows'], result['group'], result['name'])
+        if key not in baseline:
+            continue
+        before = baseline[key]['seconds_min']
+        ratio = result['seconds_min'] / before if before > 0 else float('inf')
+        flag = ' ⚠' if ratio > threshold else ''
+        regressions += ratio > threshold
+        label = f"[{result['rows']}] {result['group']}.{result['name']}"
+        print(f"{label:<70} {before:>10.4f} {result['seconds_min']:>10.4f} {ratio:>6.2f}x{flag}")
+    
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del backend IDS SCADA")
+    parser.add_argument('--sizes', default='10k', help="Tamaños separados por coma (10k,100k,1m,10m,100m)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--targets', default='', help="Filtro por subcadena (p. ej. DataAnalyzer,endpoint)")
+    parser.add_argument('--output', default=None, help="Ruta del JSON de resultados")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), help="Comparar dos informes")
+    parser.add_argument('--threshold', type=float, default=1.2, help="Ratio a partir del cual se marca regresión")
+    args = parser.parse_args()
+    
+    try:
+        if args.compare:
+            sys.exit(1 if compare_reports(args.compare[0], args.compare[1], args.threshold) else 0)
+        
+        sizes = [parse_rows(s) for s in args.sizes.split(',') if s]
+        target_filter = [t for t in args.targets.split(',') if t]
+        report = run_suite(sizes, args.seed, args.repeat, target_filter)
+        
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = args.output or os.path.join(
+            RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{report['meta']['commit']}.json"
+        )
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Resultados guardados en {output}")
+    finally:
+        shutil.rmtree(_WORKDIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Paridad entre el motor pandas y el motor SQL embebido
+
+Uso:
+    python -m benchmarks.sql_parity --sizes 10k,100k
+    python -m benchmarks.sql_parity --sizes 1m --backend duckdb
+
+Construye las vistas materializadas con ambos motores sobre datos
+sintéticos y compara cada vista y cada detección de ThreatDetector. Sale
+con código 1 si alguna difiere.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from typing import Any, List
+
+from .synthetic import SyntheticIDSGenerator, parse_rows
+
+
+_WORKDIR = tempfile.mkdtemp(prefix='ids_parity_')
+os.environ.setdefault('UPLOAD_PATH', os.path.join(_WORKDIR, 'uploads'))
+os.environ.setdefault('DATA_PATH', os.path.join(_WORKDIR, 'data'))
+os.environ.setdefault('SQL_ENGINE_PATH', os.path.join(_WORKDIR, 'sql'))
+
+
+def _normalize(value: Any) -> Any:
+    """Forma comparable de una vista (modelos pydantic, arrays, sets)"""
+    import numpy as np
+    
+    if hasattr(value, 'dict'):
+        return _normalize(value.dict())
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, set):
+        return sorted(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def check_parity(rows: int, seed: int, backend: str) -> List[str]:
+    """
+    Compara ambos motores sobre un dataset sintético
+    
+    Returns:
+        Lista de diferencias (vacía si hay paridad)
+    """
+    from app.core.config import settings
+    from app.utils.data_loader import data_loader
+    from app.services.materialized_views import materialized_views
+    from app.services.sql_engine import sql_engine, SQLThreatDetector
+    from app.services.threat_detector import ThreatDetector
+    
+    settings.SQL_ENGINE_BACKEND = backend
+    path = os.path.join(os.environ['DATA_PATH'], f"parity_{rows}_{seed}.csv")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    SyntheticIDSGenerator(seed=seed).write_csv(path, rows)
+    data_loader.default_csv_path = path
+    
+    results = {}
+    for engine in ('pandas', 'sql'):
+        settings.ANALYTICS_ENGINE = engine
+        materialized_views.drop()
+        start = time.perf_counter()
+        materialized_views.refresh()
+        elapsed = time.perf_counter() - start
+        results[engine] = {
+            name: _normalize(materialized_views.get(name))
+            for name in materialized_views.definitions
+        }
+        print(f"  {engine:<7} vistas en {elapsed:.3f}s")
+    
+    df = data_loader.load_data()
+    sql_detector = SQLThreatDetector()
+    for method in ('detect_coordinated_attacks', 'detect_port_sweep', 'get_attack_velocity'):
+        results['pandas'][method] = _normalize(getattr(ThreatDetector(df.copy(deep=False)), method)())
+        results['sql'][method] = _normalize(getattr(sql_detector, method)())
+    
+    settings.ANALYTICS_ENGINE = 'pandas'
+    print(f"  motor SQL: {sql_engine.dialect.name}")
+    return [name for name in results['pandas'] if results['pandas'][name] != results['sql'][name]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paridad de motores de análisis pandas/SQL")
+    parser.add_argument('--sizes', default='10k', help="Tamaños separados por coma (10k,100k,1m)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--backend', default='auto', choices=['auto', 'duckdb', 'sqlite'])
+    args = parser.parse_args()
+    
+    failures = 0
+    try:
+        for rows in [parse_rows(s) for s in args.sizes.split(',') if s]:
+            print(f"\n▶ {rows} eventos")
+            mismatches = check_parity(rows, args.seed, args.backend)
+            for name in mismatches:
+                print(f"  ✗ {name} difiere")
+            if not mismatches:
+                print("  ✓ Paridad completa")
+            failures += len(mismatches)
+    finally:
+        shutil.rmtree(_WORKDIR, ignore_errors=True)
+    
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""
+Generador sintético de logs IDS con el esquema actual del dataset
+
+Uso:
+    python -m benchmarks.synthetic --rows 1m --out /tmp/ids_1m.csv --seed 42
+
+Los eventos se generan por bloques (memoria constante) y son reproducibles
+para una misma combinación de semilla, parámetros y tamaño de bloque.
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator
+
+
+SIZE_PRESETS = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+    '100m': 100_000_000,
+}
+
+SCADA_PORTS = [502, 102, 2404, 20000, 44818]
+
+# Tipo de alerta -> (peso en el tráfico de fondo, puertos típicos)
+BACKGROUND_ALERTS = {
+    'SQL Injection': (0.30, [80, 443, 3306, 1433, 8080]),
+    'Brute force SSH': (0.30, [22, 2222]),
+    'DDoS': (0.10, [80, 443, 53]),
+    'Malware': (0.15, [445, 139, 4444, 8443]),
+    'Unauthorized access': (0.15, [3389, 23, 21]),
+}
+
+SCADA_ALERTS = ['Modbus exploitation', 'S7comm attack', 'Unauthorized access']
+
+COLUMNS = ['timestamp', 'ip_origen', 'ip_destino', 'puerto', 'protocolo', 'alerta']
+
+
+def parse_rows(value: str) -> int:
+    """Convierte '1m', '10k' o '2500' en número de filas"""
+    value = str(value).lower()
+    if value in SIZE_PRESETS:
+        return SIZE_PRESETS[value]
+    return int(float(value))
+
+
+def _ip_pool(rng: np.random.Generator, size: int, prefixes: list) -> np.ndarray:
+    """
+    Genera un pool de IPs únicas repartidas entre varios prefijos /16
+    
+    Si la cardinalidad pedida no cabe en los prefijos dados se añaden
+    prefijos 100.x adicionales.
+    """
+    hosts_per_prefix = 256 * 254
+    prefixes = list(prefixes)
+    extra = 0
+    while len(prefixes) * hosts_per_prefix < size:
+        prefixes.append(f"100.{64 + extra}")
+        extra += 1
+    
+    values = rng.choice(len(prefixes) * hosts_per_prefix, size=size, replace=False)
+    prefix_idx, hosts = values // hosts_per_prefix, values % hosts_per_prefix
+    return np.array([
+        f"{prefixes[p]}.{h // 254}.{h % 254 + 1}"
+        for p, h in zip(prefix_idx, hosts)
+    ], dtype=object)
+
+
+class SyntheticIDSGenerator:
+    """
+    Genera flujos de eventos IDS con patrones controlables
+    
+    Args:
+        seed: Semilla del generador
+        attackers: Número de IPs de origen distintas (cardinalidad)
+        targets: Número de IPs destino distintas
+        scan_fraction: Fracción de eventos pertenecientes a escaneos de puertos
+        scada_fraction: Fracción de eventos dirigidos a puertos SCADA
+        coordinated_fraction: Fracción de eventos en ataques coordinados
+        events_per_hour: Densidad media de eventos (define la duración)
+        start: Inicio del período simulado
+    """
+    
+    def __init__(
+        self,
+        seed: int = 42,
+        attackers: int = 500,
+        targets: int = 50,
+        scan_fraction: float = 0.25,
+        scada_fraction: float = 0.10,
+        coordinated_fraction: float = 0.05,
+        events_per_hour: int = 400,
+        start: str = '2025-07-01 00:00:00'
+    ):
+        self.seed = seed
+        self.scan_fraction = scan_fraction
+        self.scada_fraction = scada_fraction
+        self.coordinated_fraction = coordinated_fraction
+        self.events_per_hour = events_per_hour
+        self.start = pd.Timestamp(start)
+        
+        rng = np.random.default_rng(seed)
+        self.attackers = _ip_pool(rng, attackers, ['10.0', '172.16', '192.168', '45.33', '185.220'])
+        self.targets = _ip_pool(rng, targets, ['192.168', '10.1', '10.0'])
+        
+        # Actividad de atacantes tipo Zipf: pocos atacantes concentran la mayoría
+        weights = 1.0 / np.arange(1, len(self.attackers) + 1) ** 1.1
+        self.attacker_weights = weights / weights.sum()
+        
+        self.alert_names = list(BACKGROUND_ALERTS)
+        alert_weights = np.array([BACKGROUND_ALERTS[a][0] for a in self.alert_names])
+        self.alert_weights = alert_weights / alert_weights.sum()
+    
+    def _background(self, rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
+        alert_idx = rng.choice(len(self.alert_names), size=n, p=self.alert_weights)
+        ports = np.empty(n, dtype=np.int64)
+        for i, name in enumerate(self.alert_names):
+            mask = alert_idx == i
+            ports[mask] = rng.choice(BACKGROUND_ALERTS[name][1], size=int(mask.sum()))
+        return {
+            'ip_origen': self.attackers[rng.choice(len(self.attackers), size=n, p=self.attacker_weights)],
+            'ip_destino': self.targets[rng.integers(0, len(self.targets), size=n)],
+            'puerto': ports,
+            'alerta': np.array(self.alert_names, dtype=object)[alert_idx],
+        }
+    
+    def _port_scans(self, rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
+        # Cada escaneo: una IP recorre puertos consecutivos contra un único objetivo
+        scan_len = 64
+        scans = max(1, -(-n // scan_len))
+        scanner = rng.choice(len(self.attackers), size=scans, p=self.attacker_weights)
+        target = rng.integers(0, len(self.targets), size=scans)
+        first_port = rng.integers(1, 65535 - scan_len, size=scans)
+        scan_id = np.arange(n) // scan_len
+        return {
+            'ip_origen': self.attackers[scanner[scan_id]],
+            'ip_destino': self.targets[target[scan_id]],
+            'puerto': first_port[scan_id] + np.arange(n) % scan_len,
+            'alerta': np.full(n, 'Port scan', dtype=object),
+        }
+    
+    def _scada(self, rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
+        return {
+            'ip_origen': self.attackers[rng.choice(len(self.attackers), size=n, p=self.attacker_weights)],
+            'ip_destino': self.targets[rng.integers(0, max(1, len(self.targets) // 5), size=n)],
+            'puerto': rng.choice(SCADA_PORTS, size=n),
+            'alerta': np.array(SCADA_ALERTS, dtype=object)[rng.integers(0, len(SCADA_ALERTS), size=n)],
+        }
+    
+    def _coordinated(self, rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
+        # Oleadas de 3-8 atacantes distintos contra el mismo objetivo
+        wave_size = 24
+        waves = max(1, -(-n // wave_size))
+        target = rng.integers(0, len(self.targets), size=waves)
+        members = rng.integers(3, 9, size=waves)
+        wave_id = np.arange(n) // wave_size
+        member = np.arange(n) % members[wave_id]
+        attacker = (wave_id * 7 + member * 131) % len(self.attackers)
+        return {
+            'ip_origen': self.attackers[attacker],
+            'ip_destino': self.targets[target[wave_id]],
+            'puerto': rng.choice([22, 80, 443, 502], size=n),
+            'alerta': np.array(['DDoS', 'Brute force SSH', 'SQL Injection'], dtype=object)[rng.integers(0, 3, size=n)],
+        }
+    
+    def _chunk(self, chunk_index: int, offset: int, n: int) -> pd.DataFrame:
+        rng = np.random.default_rng([self.seed, chunk_index])
+        
+        n_scan = int(n * self.scan_fraction)
+        n_scada = int(n * self.scada_fraction)
+        n_coord = int(n * self.coordinated_fraction)
+        n_background = n - n_scan - n_scada - n_coord
+        
+        parts = [
+            self._background(rng, n_background),
+            self._port_scans(rng, n_scan),
+            self._scada(rng, n_scada),
+            self._coordinated(rng, n_coord),
+        ]
+        data = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+        
+        # Orden temporal: el fondo se reparte uniformemente y cada escaneo u
+        # oleada coordinada ocupa una ventana corta alrededor de un instante
+        eps = 1.0 / (4 * n)
+        scan_step = np.arange(n_scan)
+        coord_step = np.arange(n_coord)
+        keys = np.concatenate([
+            rng.random(n_background),
+            rng.random(max(1, -(-n_scan // 64)))[scan_step // 64] + (scan_step % 64) * eps,
+            rng.random(n_scada),
+            rng.random(max(1, -(-n_coord // 24)))[coord_step // 24] + (coord_step % 24) * eps,
+        ])
+        order = np.argsort(keys, kind='stable')
+        data = {k: v[order] for k, v in data.items()}
+        
+        seconds_per_event = 3600.0 / self.events_per_hour
+        seconds = (offset + np.arange(n)) * seconds_per_event + rng.random(n) * seconds_per_event
+        timestamps = self.start + pd.to_timedelta(np.sort(seconds).astype(np.int64), unit='s')
+        
+        protocol = np.where(rng.random(n) < 0.7, 'TCP', 'UDP').astype(object)
+        protocol[np.isin(data['puerto'], SCADA_PORTS)] = 'TCP'
+        
+        return pd.DataFrame({
+            'timestamp': timestamps.strftime('%Y-%m-%d %H:%M:%S'),
+            'ip_origen': data['ip_origen'],
+            'ip_destino': data['ip_destino'],
+            'puerto': data['puerto'],
+            'protocolo': protocol,
+            'alerta': data['alerta'],
+        }, columns=COLUMNS)
+    
+    def iter_chunks(self, rows: int, chunk_size: int = 500_000) -> Iterator[pd.DataFrame]:
+        """
+        Genera los eventos por bloques
+        
+        Args:
+            rows: Número total de eventos
+            chunk_size: Tamaño de cada bloque
+        """
+        offset = 0
+        chunk_index = 0
+        while offset < rows:
+            n = min(chunk_size, rows - offset)
+            yield self._chunk(chunk_index, offset, n)
+            offset += n
+            chunk_index += 1
+    
+    def to_frame(self, rows: int) -> pd.DataFrame:
+        """Genera todos los eventos en un único DataFrame (tamaños pequeños)"""
+        return pd.concat(list(self.iter_chunks(rows)), ignore_index=True)
+    
+    def write_csv(self, path: str, rows: int, chunk_size: int = 500_000) -> int:
+        """
+        Escribe los eventos a CSV sin mantenerlos todos en memoria
+        
+        Returns:
+            Número de filas escritas
+        """
+        written = 0
+        for i, chunk in enumerate(self.iter_chunks(rows, chunk_size)):
+            chunk.to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+            written += len(chunk)
+        return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador sintético de logs IDS")
+    parser.add_argument('--rows', default='10k', help="Filas: 10k, 100k, 1m, 10m, 100m o un número")
+    parser.add_argument('--out', required=True, help="Ruta del CSV de salida")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--attackers', type=int, default=500, help="IPs de origen distintas")
+    parser.add_argument('--targets', type=int, default=50, help="IPs destino distintas")
+    parser.add_argument('--scan-fraction', type=float, default=0.25)
+    parser.add_argument('--scada-fraction', type=float, default=0.10)
+    parser.add_argument('--coordinated-fraction', type=float, default=0.05)
+    parser.add_argument('--events-per-hour', type=int, default=400)
+    args = parser.parse_args()
+    
+    generator = SyntheticIDSGenerator(
+        seed=args.seed,
+        attackers=args.attackers,
+        targets=args.targets,
+        scan_fraction=args.scan_fraction,
+        scada_fraction=args.scada_fraction,
+        coordinated_fraction=args.coordinated_fraction,
+        events_per_hour=args.events_per_hour
+    )
+    rows = generator.write_csv(args.out, parse_rows(args.rows))
+    print(f"✓ {rows} eventos escritos en {args.out}")
+
+
+if __name__ == '__main__':
+    main()
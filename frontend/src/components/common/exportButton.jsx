@@ -3,8 +3,18 @@
  */
 import { Download } from 'lucide-react';
 
-const ExportButton = ({ data, filename = 'export', format = 'json' }) => {
+const ExportButton = ({ data, filename = 'export', format = 'json', exportUrl = null }) => {
   const handleExport = () => {
+    // Exportación en el servidor: el navegador descarga el stream directamente
+    if (exportUrl) {
+      const link = document.createElement('a');
+      link.href = exportUrl;
+      document.body.appendChild(link);
+      link.click();
+      document.body.removeChild(link);
+      return;
+    }
+
     let content, mimeType;
 
     if (format === 'json') {
@@ -134,7 +134,7 @@ const AutoResponse = () => {
 
         {/* Selector de plataforma */}
         <div className="flex gap-2 mb-4">
-          {['iptables', 'cisco_asa', 'windows_firewall', 'pfsense'].map((platform) => (
+          {['iptables', 'ipset', 'nftables', 'cisco_asa', 'windows_firewall', 'pfsense'].map((platform) => (
             <button
               key={platform}
               onClick={() => setSelectedPlatform(platform)}
@@ -159,6 +159,69 @@ export const fetchExecutiveReport = async () => {
   }
 };
 
+/**
+ * Encola el renderizado de un reporte (executive, daily o weekly)
+ */
+export const createReportJob = async (reportType = 'executive', datasetId = null) => {
+  try {
+    const response = await apiClient.post('/api/v1/reports/jobs', {
+      report_type: reportType,
+      dataset_id: datasetId
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error creating report job:', error);
+    throw error;
+  }
+};
+
+export const fetchReportJob = async (jobId) => {
+  try {
+    const response = await apiClient.get(`/api/v1/reports/jobs/${jobId}`);
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching report job:', error);
+    throw error;
+  }
+};
+
+export const fetchReportArtifacts = async (datasetId = null) => {
+  try {
+    const params = {};
+    if (datasetId) params.dataset_id = datasetId;
+    const response = await apiClient.get('/api/v1/reports/artifacts', { params });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching report artifacts:', error);
+    throw error;
+  }
+};
+
+/**
+ * URL de descarga de un reporte renderizado (json, html o csv en zip).
+ * Si aún no está renderizado la API responde 202 con el trabajo encolado.
+ */
+export const buildReportDownloadUrl = (reportType = 'executive', format = 'html', datasetId = null) => {
+  const params = new URLSearchParams({ format });
+  if (datasetId) params.append('dataset_id', datasetId);
+  return `${API_BASE_URL}/api/v1/reports/artifacts/${reportType}?${params.toString()}`;
+};
+
+/**
+ * Comparación de métricas entre periodos consecutivos (day, week o `hours`)
+ */
+export const fetchPeriodComparison = async (period = 'week', options = {}, datasetId = null) => {
+  try {
+    const params = { period, ...options };
+    if (datasetId) params.dataset_id = datasetId;
+    const response = await apiClient.get('/api/v1/reports/comparison', { params });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching period comparison:', error);
+    throw error;
+  }
+};
+
 export const fetchRecommendations = async () => {
   try {
     const response = await apiClient.get(ENDPOINTS.RECOMMENDATIONS);
@@ -239,6 +302,42 @@ export const fetchFirewallRules = async (minRiskLevel = 'Alto') => {
   }
 };
 
+export const fetchFirewallRulesDiff = async (since, minRiskLevel = 'Alto', to = null) => {
+  try {
+    const params = { since, min_risk_level: minRiskLevel };
+    if (to) params.to = to;
+    const response = await apiClient.get('/api/v1/response/firewall-rules/diff', { params });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching firewall rules diff:', error);
+    throw error;
+  }
+};
+
+export const simulateBlocklist = async (ruleset, datasetId = null) => {
+  try {
+    const response = await apiClient.post('/api/v1/response/simulate-blocklist', ruleset, {
+      params: datasetId ? { dataset_id: datasetId } : {}
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error simulating blocklist:', error);
+    throw error;
+  }
+};
+
+export const simulatePropagation = async (params = {}, datasetId = null) => {
+  try {
+    const response = await apiClient.post('/api/v1/response/simulate-propagation', params, {
+      params: datasetId ? { dataset_id: datasetId } : {}
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error simulating attack propagation:', error);
+    throw error;
+  }
+};
+
 export const fetchFail2BanConfig = async () => {
   try {
     const response = await apiClient.get('/api/v1/response/fail2ban-config');
@@ -395,5 +494,37 @@ export const fetchProfessionalRecommendations = async () => {
 };
 
 
+// ==================== EVENTS ENDPOINTS ====================
+
+/**
+ * URL de exportación en streaming de eventos filtrados.
+ * Se descarga con un enlace normal: el navegador escribe a disco a medida
+ * que llegan los datos, sin cargar la exportación en memoria.
+ */
+export const buildEventsExportUrl = (filters = {}, format = 'csv', gzip = false, datasetId = null) => {
+  const params = new URLSearchParams({ format });
+  Object.entries(filters).forEach(([key, value]) => {
+    if (value === null || value === undefined || value === '') return;
+    (Array.isArray(value) ? value : [value]).forEach(v => params.append(key, v));
+  });
+  if (gzip) params.append('gzip', 'true');
+  if (datasetId) params.append('dataset_id', datasetId);
+  return `${API_BASE_URL}/api/v1/events/export?${params.toString()}`;
+};
+
+/**
+ * Consulta ad-hoc de eventos (condiciones AND, rango temporal, group-by y top-k)
+ */
+export const queryEvents = async (query, datasetId = null) => {
+  try {
+    const params = {};
+    if (datasetId) params.dataset_id = datasetId;
+    const response = await apiClient.post('/api/v1/events/query', query, { params });
+    return response.data;
+  } catch (error) {
+    console.error('Error querying events:', error);
+    throw error;
+  }
+};
 
 export default apiClient;
\ No newline at end of file